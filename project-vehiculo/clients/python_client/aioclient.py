@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+aioclient.py - Cliente de telemetría sobre asyncio para muchos vehículos.
+Un AsyncTelemetryClient por servidor, todos en un único bucle de eventos
+(EventLoopThread). Mismo protocolo que TelemetryClient (AUTH, SUBSCRIBE,
+CMD ..., TELEMETRY); los mensajes se publican en un TelemetryBridge que la
+GUI o un consumidor headless vacía desde otro hilo.
+"""
+
+import asyncio
+import collections
+import threading
+
+from framing import LineFramer
+from recorder import EV_CMD_SENT, EV_STATUS
+from telemetry import parse_frame
+
+READ_SIZE = 16 * 1024
+FRAMER_CAPACITY = 16 * 1024   # por conexión: con cientos de vehículos importa
+FRAMER_MAX_LINE = 8 * 1024
+BRIDGE_CAPACITY = 100_000     # mensajes pendientes en TelemetryBridge antes de perder los más viejos
+
+
+class TelemetryBridge:
+    """Cola entre el bucle asyncio y el consumidor. deque.append/popleft son
+    atómicos en CPython, así que no hace falta lock en el camino caliente.
+    Acotada: si el consumidor se atasca, append() descarta el mensaje más viejo
+    (casi siempre una trama ya superada por otra del mismo vehículo)."""
+
+    def __init__(self, capacity=BRIDGE_CAPACITY):
+        self.q = collections.deque(maxlen=capacity)
+        self.overflowed = 0   # mensajes perdidos por la cola llena
+
+    def put(self, source, kind, payload):
+        q = self.q
+        if len(q) == q.maxlen:
+            self.overflowed += 1
+        q.append((source, kind, payload))
+
+    def drain(self, max_items=None):
+        """Devuelve hasta max_items mensajes (source, kind, payload)."""
+        q = self.q
+        out = []
+        n = len(q) if max_items is None else min(max_items, len(q))
+        for _ in range(n):
+            out.append(q.popleft())
+        return out
+
+    def get_message_nowait(self):
+        # Misma forma que TelemetryClient.get_message_nowait: (kind, payload)
+        try:
+            _, kind, payload = self.q.popleft()
+        except IndexError:
+            return None
+        return kind, payload
+
+    def __len__(self):
+        return len(self.q)
+
+
+class AsyncTelemetryClient:
+    def __init__(self, host, port, bridge, name=None, recorder=None, journal=None):
+        self.host = host
+        self.port = int(port)
+        self.bridge = bridge
+        self.name = name if name is not None else f"{host}:{port}"
+        self.reader = None
+        self.writer = None
+        self.token = None
+        self.connected = False
+        self.lines_in = 0
+        self.recorder = recorder
+        self.journal = journal   # journal.Journal opcional, compartido por la flota (vehículo = name)
+
+    async def connect(self, timeout=5.0):
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RuntimeError(f"Fallo al conectar: {e}")
+        self.connected = True
+
+    async def send_line(self, line):
+        if not self.writer:
+            raise RuntimeError("No conectado")
+        if not line.endswith("\n"):
+            line = line + "\n"
+        try:
+            self.writer.write(line.encode('utf-8'))
+            await self.writer.drain()
+        except (OSError, ConnectionError) as e:
+            raise RuntimeError(f"Transmit error: {e}")
+        if self.recorder and line.startswith("CMD"):
+            self.recorder.record_event(EV_CMD_SENT)
+        if self.journal: self.journal.record_out(line, self.name)
+
+    async def auth(self, user, password):
+        await self.send_line(f"AUTH {user} {password}")
+
+    async def subscribe(self, role="OBSERVER"):
+        await self.send_line(f"SUBSCRIBE {role}")
+
+    async def run(self):
+        """Bucle de lectura; termina al cerrarse la conexión."""
+        framer = LineFramer(FRAMER_CAPACITY, FRAMER_MAX_LINE)
+        put = self.bridge.put
+        name = self.name
+        rec = self.recorder
+        jr = self.journal
+        try:
+            while True:
+                data = await self.reader.read(READ_SIZE)
+                if not data:
+                    put(name, "status", "DESCONEXIÓN")
+                    if rec: rec.record_event(EV_STATUS)
+                    if jr: jr.record_status("DESCONEXIÓN", name)
+                    break
+                for txt in framer.feed(data):
+                    self.lines_in += 1
+                    if jr: jr.record_in(txt, name)
+                    frame = parse_frame(txt)
+                    if frame is not None:
+                        if rec: rec.record_frame(frame)
+                        put(name, "telemetry", frame)
+                    else:
+                        if rec: rec.record_line(txt)
+                        if txt.startswith("AUTH-OK token="):
+                            self.token = txt[len("AUTH-OK token="):]
+                        put(name, "line", txt)
+        except (OSError, ConnectionError) as e:
+            put(name, "status", f"ERROR: {e}")
+            if jr: jr.record_status(f"ERROR: {e}", name)
+        finally:
+            self.connected = False
+            await self.close()
+
+    async def close(self):
+        w, self.writer = self.writer, None
+        if w is not None:
+            w.close()
+            try:
+                await w.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+
+class EventLoopThread:
+    """Bucle asyncio en un hilo demonio, para usarlo desde código síncrono
+    (Tk o headless)."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, coro):
+        """Programa una corrutina en el bucle; devuelve un concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=2.0):
+        """Cancela las tareas pendientes (cerrando sus conexiones) y detiene el bucle."""
+        if not self.thread.is_alive():
+            return
+        try:
+            self.submit(_cancel_all()).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+
+async def _cancel_all():
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def watch(client, role="OBSERVER", user=None, password=None):
+    """Conecta, autentica (si hay credenciales), se suscribe y lee hasta EOF.
+    Cualquier fallo se publica como "status" para que la fila no se quede en
+    CONECTANDO."""
+    try:
+        await client.connect()
+        if user and password:
+            await client.auth(user, password)
+        await client.subscribe(role)
+        await client.run()
+    except RuntimeError as e:
+        client.bridge.put(client.name, "status", str(e))
+        client.connected = False
+        await client.close()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+battery.py - Análisis de descarga de batería con NumPy (dependencia opcional).
+Acumula, por vehículo y banda de velocidad, el tiempo transcurrido y los
+puntos de batería perdidos entre tramas consecutivas; de ahí salen la tasa
+de descarga por banda, el tiempo y la distancia estimados hasta el corte del
+10% (server.c rechaza comandos por debajo con CMD-ERR reason=battery_low) y
+avisos de consumo anómalo. add() sólo guarda la muestra; update() procesa lo
+pendiente de toda la flota en un único lote vectorizado.
+Sin numpy: DrainAnalytics() lanza RuntimeError y la GUI lo muestra como n/d.
+numpy se importa al crear el primer DrainAnalytics (ver _load_numpy), no al
+importar el módulo: el camino headless no lo necesita.
+"""
+
+import math
+
+np = None   # numpy, cargado bajo demanda por _load_numpy()
+
+CUTOFF = 10                                # % por debajo del cual el servidor rechaza comandos
+SPEED_EDGES = (0.01, 7.5, 15.0, 22.5)      # bandas: parado, <7.5, <15, <22.5, >=22.5 m/s
+BAND_NAMES = ("parado", "0-7.5", "7.5-15", "15-22.5", ">22.5")
+HALF_LIFE = 300.0    # s: vida media de la tasa "reciente"
+MIN_DT = 60.0        # s acumulados en una banda para fiarse de su tasa
+ANOMALY_RATIO = 1.5  # tasa reciente > 1.5x la histórica del propio vehículo
+ANOMALY_Z = 3.0      # o > 3 desviaciones sobre la media de la flota en esa banda
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:   # opcional: sólo hace falta para este módulo
+            return False
+    return True
+
+
+def available():
+    return _load_numpy()
+
+
+class DrainAnalytics:
+    def __init__(self, edges=SPEED_EDGES):
+        if not _load_numpy():
+            raise RuntimeError("El análisis de batería requiere numpy (pip install numpy)")
+        self.edges = np.asarray(edges, dtype=float)
+        self.bands = len(edges) + 1
+        self.index = {}          # nombre de vehículo -> fila
+        self.pending = ([], [], [], [])   # vid, t, speed, battery
+        self.decayed_at = None
+        self._alloc(0)
+
+    def _alloc(self, n):
+        B = self.bands
+        old = getattr(self, "dt", None)
+        fresh = {
+            "dt": np.zeros((n, B)), "db": np.zeros((n, B)),      # totales
+            "rdt": np.zeros((n, B)), "rdb": np.zeros((n, B)),    # con decaimiento (recientes)
+            "last_t": np.full(n, np.nan), "last_s": np.full(n, np.nan), "last_b": np.full(n, np.nan),
+        }
+        if old is not None:
+            m = len(old)
+            for k, arr in fresh.items():
+                arr[:m] = getattr(self, k)
+        for k, arr in fresh.items():
+            setattr(self, k, arr)
+
+    def _vid(self, vehicle):
+        vid = self.index.get(vehicle)
+        if vid is None:
+            vid = self.index[vehicle] = len(self.index)
+        return vid
+
+    def add(self, vehicle, t, speed, battery):
+        if speed is None or battery is None:
+            return
+        vid, ts, sp, bt = self.pending
+        vid.append(self._vid(vehicle)); ts.append(t); sp.append(speed); bt.append(battery)
+
+    def update(self, now=None):
+        """Incorpora lo pendiente (todas las flotas a la vez). Devuelve filas procesadas."""
+        vid_l, t_l, s_l, b_l = self.pending
+        n = len(vid_l)
+        if not n:
+            return 0
+        self.pending = ([], [], [], [])
+        if len(self.index) > len(self.dt):
+            self._alloc(max(len(self.index), 2 * len(self.dt)))
+        vid = np.asarray(vid_l, dtype=np.intp)
+        order = np.argsort(vid, kind="stable")   # por vehículo, conservando el orden temporal
+        vid = vid[order]
+        t = np.asarray(t_l, dtype=float)[order]
+        s = np.asarray(s_l, dtype=float)[order]
+        b = np.asarray(b_l, dtype=float)[order]
+
+        # Muestra anterior de cada fila: la previa del lote o la última conocida del vehículo
+        first = np.ones(n, dtype=bool); first[1:] = vid[1:] != vid[:-1]
+        prev_t = np.empty(n); prev_s = np.empty(n); prev_b = np.empty(n)
+        prev_t[1:], prev_s[1:], prev_b[1:] = t[:-1], s[:-1], b[:-1]
+        fv = vid[first]
+        prev_t[first], prev_s[first], prev_b[first] = self.last_t[fv], self.last_s[fv], self.last_b[fv]
+
+        dt = t - prev_t
+        db = prev_b - b
+        ok = (dt > 0) & (db >= 0)    # db < 0 = recarga: ese intervalo no cuenta
+        ok &= ~np.isnan(dt)
+        band = np.digitize(prev_s, self.edges)
+        V, B = self.dt.shape
+        idx = (vid * B + band)[ok]
+        dt, db = dt[ok], db[ok]
+        self.dt += np.bincount(idx, dt, minlength=V * B).reshape(V, B)
+        self.db += np.bincount(idx, db, minlength=V * B).reshape(V, B)
+
+        now = float(t.max()) if now is None else now
+        if self.decayed_at is not None:
+            f = 0.5 ** (max(0.0, now - self.decayed_at) / HALF_LIFE)
+            self.rdt *= f; self.rdb *= f
+        self.decayed_at = now
+        w = 0.5 ** (np.maximum(0.0, now - t[ok]) / HALF_LIFE)
+        self.rdt += np.bincount(idx, dt * w, minlength=V * B).reshape(V, B)
+        self.rdb += np.bincount(idx, db * w, minlength=V * B).reshape(V, B)
+
+        last = np.ones(n, dtype=bool); last[:-1] = vid[:-1] != vid[1:]
+        lv = vid[last]
+        self.last_t[lv], self.last_s[lv], self.last_b[lv] = t[last], s[last], b[last]
+        return n
+
+    # ---------------- resultados ----------------
+    def rates(self):
+        """(histórica, reciente) en %/s por vehículo y banda; NaN sin datos suficientes."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            hist = np.where(self.dt >= MIN_DT, self.db / self.dt, np.nan)
+            recent = np.where(self.rdt >= MIN_DT / 2, self.rdb / self.rdt, np.nan)
+        return hist, recent
+
+    def fleet_rates(self):
+        """Media y desviación de la tasa por banda entre los vehículos con datos."""
+        hist, _ = self.rates()
+        n = np.sum(~np.isnan(hist), axis=0)
+        with np.errstate(invalid="ignore"):
+            mean = np.where(n > 0, np.nansum(hist, axis=0) / np.maximum(n, 1), np.nan)
+            var = np.where(n > 1, np.nansum((hist - mean) ** 2, axis=0) / np.maximum(n - 1, 1), np.nan)
+        return mean, np.sqrt(var), n
+
+    def anomalies(self):
+        """Matriz booleana vehículo x banda con consumo anómalo."""
+        hist, recent = self.rates()
+        mean, std, n = self.fleet_rates()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            own = (recent > ANOMALY_RATIO * hist) & (self.dt >= 5 * MIN_DT)
+            fleet = (n >= 3) & (std > 0) & ((hist - mean) / std > ANOMALY_Z)
+        return own | fleet   # las comparaciones con NaN ya dan False
+
+    def estimate_all(self):
+        """Arrays por vehículo: tasa usada (%/s), segundos y metros hasta CUTOFF, anómalo."""
+        V = len(self.index)
+        hist, recent = self.rates()
+        mean, _, _ = self.fleet_rates()
+        rows = np.arange(V)
+        band = np.digitize(np.nan_to_num(self.last_s[:V]), self.edges)
+        # Preferencia: reciente del vehículo > histórica del vehículo > media de la flota
+        rate = recent[rows, band]
+        rate = np.where(np.isnan(rate), hist[rows, band], rate)
+        rate = np.where(np.isnan(rate), mean[band], rate)
+        left = np.maximum(0.0, self.last_b[:V] - CUTOFF)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            secs = np.where(left <= 0, 0.0, np.where(rate > 0, left / rate, np.inf))
+            meters = np.where(self.last_s[:V] > 0, secs * self.last_s[:V], np.inf)
+        meters = np.where(secs == 0, 0.0, meters)
+        return rate, secs, meters, self.anomalies()[:V].any(axis=1)
+
+    def estimate(self, vehicle):
+        """dict para un vehículo (None si aún no hay muestras suyas)."""
+        vid = self.index.get(vehicle)
+        if vid is None or vid >= len(self.dt) or math.isnan(self.last_b[vid]):
+            return None
+        rate, secs, meters, anom = self.estimate_all()
+        return {"rate": float(rate[vid]), "seconds": float(secs[vid]), "meters": float(meters[vid]),
+                "anomaly": bool(anom[vid]), "battery": float(self.last_b[vid])}
+
+
+def format_estimate(est):
+    """Texto corto para el panel de batería / la tabla de flota."""
+    if est is None:
+        return "autonomía: --"
+    secs = est["seconds"]
+    if secs == 0:
+        return "bajo el 10%"
+    if math.isinf(secs) or math.isnan(secs):
+        return "sin descarga"
+    t = f"{secs / 3600:.1f} h" if secs >= 3600 else f"{secs / 60:.0f} min"
+    d = "" if math.isinf(est["meters"]) else f" / {est['meters'] / 1000:.1f} km"
+    return f"≈{t}{d} al 10%"
@@ -0,0 +1,2 @@
+# Micro-benchmarks del cliente. Ejecutar desde clients/python_client:
+#   python3 -m bench.bench_framing
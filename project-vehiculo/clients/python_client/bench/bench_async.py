@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_async.py - N vehículos simulados sobre un único bucle asyncio.
+Un proceso aparte hace de servidor (para no contar su CPU); el cliente abre N
+conexiones AsyncTelemetryClient y mide RSS y CPU por conexión.
+Ejecutar: python3 -m bench.bench_async [n_vehiculos] [tramas/s por vehiculo] [segundos]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from aioclient import AsyncTelemetryClient, TelemetryBridge, watch
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * (os.sysconf("SC_PAGE_SIZE") // 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def fake_server(port, rate, ready):
+    async def handle(reader, writer):
+        await reader.readline()   # SUBSCRIBE ...
+        writer.write(b"SUBSCRIBE-OK role=OBSERVER\n")
+        period = 1.0 / rate
+        try:
+            while True:
+                ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                writer.write(f"TELEMETRY v=12.50 battery=87 dir=E timestamp={ts}\n".encode())
+                await writer.drain()
+                await asyncio.sleep(period)
+        except (OSError, ConnectionError):
+            pass
+
+    async def main():
+        srv = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+        ready.set()
+        async with srv:
+            await srv.serve_forever()
+
+    asyncio.run(main())
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+    port = 5601
+
+    ready = multiprocessing.Event()
+    srv = multiprocessing.Process(target=fake_server, args=(port, rate, ready), daemon=True)
+    srv.start()
+    ready.wait(10)
+
+    async def run():
+        bridge = TelemetryBridge()
+        rss0 = rss_kb()
+        clients = [AsyncTelemetryClient("127.0.0.1", port, bridge, name=f"veh{i}") for i in range(n)]
+        tasks = [asyncio.create_task(watch(c)) for c in clients]
+        while sum(c.connected for c in clients) < n:
+            await asyncio.sleep(0.05)
+        rss1 = rss_kb()
+
+        received = 0
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            await asyncio.sleep(0.1)
+            received += sum(1 for _, kind, _ in bridge.drain() if kind == "telemetry")
+        cpu = time.process_time() - cpu0
+        wall = time.perf_counter() - t0
+
+        for c in clients:
+            await c.close()
+        for t in tasks:
+            t.cancel()
+        return rss0, rss1, received, cpu, wall
+
+    rss0, rss1, received, cpu, wall = asyncio.run(run())
+    srv.terminate()
+
+    print(f"vehículos={n}  tramas/s por vehículo={rate}  duración={wall:.1f}s")
+    print(f"RSS: base {rss0 / 1024:.1f} MiB, con {n} conexiones {rss1 / 1024:.1f} MiB "
+          f"-> {(rss1 - rss0) / n:.1f} KiB/conexión")
+    print(f"tramas recibidas {received:,} ({received / wall:,.0f}/s)")
+    print(f"CPU {cpu:.2f}s = {100 * cpu / wall:.1f}% de un núcleo; "
+          f"{cpu / n / wall * 1e3:.3f} ms CPU/s por conexión; "
+          f"{cpu / max(1, received) * 1e6:.1f} µs por trama")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_framing.py - Líneas/seg del receptor antiguo (concatenar + split) frente a
+LineFramer (recv_into + memoryview) con ráfagas de 1 KB y 64 KB.
+Ejecutar: python3 -m bench.bench_framing
+"""
+
+import time
+
+from framing import LineFramer
+
+LINE = b"TELEMETRY v=12.50 battery=87 dir=E timestamp=2025-01-01T12:00:00Z\n"
+RECV_SIZE = 4096
+
+
+class BurstSocket:
+    """Socket falso que entrega la misma ráfaga `rounds` veces, como recv()."""
+
+    def __init__(self, burst, rounds, recv_size):
+        self.burst = memoryview(burst)
+        self.rounds = rounds
+        self.recv_size = recv_size
+        self.pos = 0
+
+    def _next(self, n):
+        if self.pos == len(self.burst):
+            if self.rounds <= 1:
+                return self.burst[:0]
+            self.rounds -= 1
+            self.pos = 0
+        chunk = self.burst[self.pos:self.pos + min(n, self.recv_size)]
+        self.pos += len(chunk)
+        return chunk
+
+    def recv(self, n):
+        return bytes(self._next(n))
+
+    def recv_into(self, view):
+        chunk = self._next(len(view))
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def old_receiver(sock):
+    # Copia literal del bucle original de TelemetryClient._receiver
+    buff = b""
+    count = 0
+    while True:
+        # El tamaño real de cada lectura lo fija BurstSocket.recv_size
+        data = sock.recv(64 * 1024)
+        if not data:
+            break
+        buff += data
+        while b"\n" in buff:
+            line, buff = buff.split(b"\n", 1)
+            try:
+                txt = line.decode('utf-8').strip()
+            except Exception:
+                continue
+            count += 1
+    return count
+
+
+def new_receiver(sock):
+    framer = LineFramer()
+    count = 0
+    while framer.recv_from(sock):
+        for _ in framer.lines():
+            count += 1
+    return count
+
+
+def run(burst_size, total_bytes, recv_size):
+    burst = (LINE * (burst_size // len(LINE) + 1))[:burst_size]
+    rounds = max(1, total_bytes // burst_size)
+    results = {}
+    for name, fn in (("antiguo", old_receiver), ("LineFramer", new_receiver)):
+        sock = BurstSocket(burst, rounds, recv_size)
+        t0 = time.perf_counter()
+        n = fn(sock)
+        dt = time.perf_counter() - t0
+        results[name] = n / dt
+    return results
+
+
+def main():
+    total = 32 * 1024 * 1024
+    for burst_size in (1024, 64 * 1024):
+        # recv_size = tamaño de la ráfaga: el kernel entrega todo lo acumulado de golpe
+        for recv_size in (RECV_SIZE, burst_size):
+            res = run(burst_size, total, recv_size)
+            print(f"ráfaga={burst_size // 1024:>3} KB recv={recv_size:>6}  "
+                  f"antiguo={res['antiguo']:>12,.0f} líneas/s  "
+                  f"LineFramer={res['LineFramer']:>12,.0f} líneas/s  "
+                  f"x{res['LineFramer'] / res['antiguo']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
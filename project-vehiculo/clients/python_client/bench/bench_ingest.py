@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_ingest.py - Ingesta de flota: un proceso asyncio frente a ShardedIngest.
+Unos procesos aparte hacen de servidores "a granel" (cada tick escriben un
+bloque de líneas TELEMETRY ya preparado por conexión, así el cuello de botella
+es el cliente). Se mide tramas/s procesadas:
+  - base: un único bucle asyncio con TelemetryBridge, drenado como FleetApp
+  - ShardedIngest con 1..N procesos, contando tabla.total_frames()
+Con un solo núcleo no hay escalado que medir: el número de procesos útil es
+como mucho os.cpu_count().
+Ejecutar: python3 -m bench.bench_ingest [vehiculos] [segundos] [max_procesos]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+from aioclient import AsyncTelemetryClient, TelemetryBridge, watch
+from ingest import ShardedIngest
+
+LINES_PER_TICK = 20   # líneas por conexión y tick
+TICK = 0.01
+
+
+def bulk_server(port, ready):
+    block = b"".join(f"TELEMETRY v={10 + i % 7}.50 battery={90 - i % 5} dir=E timestamp=2026-01-01T00:00:00Z\n"
+                     .encode() for i in range(LINES_PER_TICK))
+
+    async def handle(reader, writer):
+        await reader.readline()   # SUBSCRIBE ...
+        writer.write(b"SUBSCRIBE-OK role=OBSERVER\n")
+        try:
+            while True:
+                writer.write(block)
+                await writer.drain()   # si el cliente no da abasto, TCP frena aquí
+                await asyncio.sleep(TICK)
+        except (OSError, ConnectionError):
+            pass
+
+    async def main():
+        srv = await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024)
+        ready.set()
+        async with srv:
+            await srv.serve_forever()
+
+    asyncio.run(main())
+
+
+def start_servers(count, base_port):
+    procs = []
+    for k in range(count):
+        ready = multiprocessing.Event()
+        p = multiprocessing.Process(target=bulk_server, args=(base_port + k, ready), daemon=True)
+        p.start()
+        ready.wait(10)
+        procs.append(p)
+    return procs
+
+
+def baseline(endpoints, seconds):
+    async def run():
+        bridge = TelemetryBridge()
+        clients = [AsyncTelemetryClient(host, port, bridge, name=name) for name, host, port in endpoints]
+        tasks = [asyncio.create_task(watch(c)) for c in clients]
+        await asyncio.sleep(1.0)
+        bridge.drain()
+        frames = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            await asyncio.sleep(0.03)   # intervalo de fotograma de FleetApp
+            frames += sum(1 for _, kind, _ in bridge.drain() if kind == "telemetry")
+        wall = time.perf_counter() - t0
+        for c in clients:
+            await c.close()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return frames / wall
+
+    return asyncio.run(run())
+
+
+def sharded(endpoints, seconds, workers):
+    ingest = ShardedIngest(endpoints, workers)
+    ingest.start()
+    try:
+        time.sleep(1.5)   # arranque de los procesos (spawn) y conexión
+        table = ingest.table
+        f0, t0 = table.total_frames(), time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            time.sleep(0.03)
+            for i in table.changed():
+                table.snapshot(i)   # lo que haría la GUI por fila cambiada
+        return (table.total_frames() - f0) / (time.perf_counter() - t0)
+    finally:
+        ingest.stop()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    base_port = 5701
+    servers = start_servers(max(2, max_workers), base_port)
+    endpoints = [(f"veh{i}", "127.0.0.1", base_port + i % len(servers)) for i in range(n)]
+    try:
+        print(f"{n} vehículos, {LINES_PER_TICK / TICK:.0f} líneas/s ofrecidas por vehículo, "
+              f"{os.cpu_count()} CPU")
+        base = baseline(endpoints, seconds)
+        print(f"  {'un proceso asyncio':<24} {base:>12,.0f} tramas/s")
+        for w in range(1, max_workers + 1):
+            rate = sharded(endpoints, seconds, w)
+            print(f"  {f'ShardedIngest x{w}':<24} {rate:>12,.0f} tramas/s   ({rate / base:.2f}x)")
+    finally:
+        for p in servers:
+            p.terminate()
+            p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_recorder.py - Coste de Recorder en el camino de recepción, rendimiento
+del escritor, tamaño en disco de un día de flota y búsqueda por tiempo.
+Ejecutar: python3 -m bench.bench_recorder [n_tramas]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from recorder import ROW_BYTES, HEADER_SIZE, SEGMENT_ROWS, Recorder, RecordingReader
+from telemetry import TelemetryFrame
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    d = tempfile.mkdtemp(prefix="vtl-bench-")
+    try:
+        rec = Recorder(d)
+        frame = TelemetryFrame(12.5, 87, 90.0, "E", None, "")
+        t0 = 1_700_000_000.0
+
+        # Camino de recepción: sólo record_frame (el escritor corre en su hilo)
+        start = time.perf_counter()
+        for i in range(n):
+            rec.record_frame(frame)
+        dt = time.perf_counter() - start
+        print(f"record_frame: {dt / n * 1e6:.2f} µs/trama (camino de recepción, {n:,} tramas)")
+
+        start = time.perf_counter()
+        rec.close()
+        dt = time.perf_counter() - start
+        print(f"escritor: {n / dt:,.0f} filas/s al vaciar la cola")
+
+        # Un día de 100 vehículos al ritmo de server.c (1 trama / 10 s)
+        rows = 100 * 86400 // 10
+        segs = -(-rows // SEGMENT_ROWS)
+        print(f"día de 100 vehículos: {rows:,} filas x {ROW_BYTES} B = "
+              f"{(rows * ROW_BYTES + segs * HEADER_SIZE) / 1e6:.1f} MB "
+              f"(~{rows // 100 * ROW_BYTES / 1e3:.0f} KB por vehículo)")
+
+        # Búsqueda por tiempo sobre una grabación con timestamps conocidos
+        shutil.rmtree(d)
+        rec = Recorder(d)
+        for i in range(n):
+            rec.record_frame(frame, now=t0 + i * 10)
+        rec.close()
+        rd = RecordingReader(d)
+        size = sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d))
+        probes = 10_000
+        start = time.perf_counter()
+        for i in range(probes):
+            rd.seek(t0 + (i * 7919 % n) * 10)
+        dt = time.perf_counter() - start
+        print(f"seek: {dt / probes * 1e6:.2f} µs ({len(rd):,} filas, {len(rd.segments)} segmentos, {size / 1e6:.1f} MB)")
+        rd.close()
+    finally:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
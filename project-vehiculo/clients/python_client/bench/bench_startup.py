@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_startup.py - Arranque en frío y RSS del camino headless frente al GUI.
+Cada variante se lanza en un intérprete nuevo; se reporta la mediana.
+Ejecutar: python3 -m bench.bench_startup [repeticiones]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = """
+import resource, time
+t0 = time.perf_counter()
+{body}
+dt = time.perf_counter() - t0
+print(dt, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+VARIANTS = {
+    "headless (import client, headless)": "import client, headless, telemetry",
+    "GUI (import client + tkinter + fleet)": "import client; client._load_tk(); import fleet",
+}
+if os.environ.get("DISPLAY"):
+    VARIANTS["GUI (+ Tk() + FancyClientApp)"] = (
+        "import client; client._load_tk(); root = client.tk.Tk(); client.FancyClientApp(root); root.update()")
+
+
+def measure(body, reps):
+    wall, imports, rss = [], [], []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", PROBE.format(body=body)], capture_output=True,
+                             text=True, check=True).stdout.split()
+        wall.append(time.perf_counter() - t0)
+        imports.append(float(out[0]))
+        rss.append(int(out[1]))
+    return statistics.median(wall), statistics.median(imports), statistics.median(rss)
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    if not os.environ.get("DISPLAY"):
+        print("(sin DISPLAY: la variante GUI sólo mide imports, no la creación de ventanas)")
+    for name, body in VARIANTS.items():
+        wall, imp, rss = measure(body, reps)
+        print(f"{name:<40} proceso {wall * 1e3:7.1f} ms  imports {imp * 1e3:6.1f} ms  RSS máx {rss / 1024:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_telemetry.py - Coste de interpretar TELEMETRY: lógica original de
+FancyClientApp._handle_line (split + dict + try/except) frente a
+telemetry.parse_frame / parse_many, con 1M líneas sintéticas.
+Ejecutar: python3 -m bench.bench_telemetry [n_lineas]
+"""
+
+import random
+import sys
+import time
+
+from telemetry import parse_frame, parse_many
+
+
+def synthetic_lines(n, seed=1):
+    rnd = random.Random(seed)
+    dirs = ("N", "E", "S", "W", "N(15.2)", "E(92.5)")
+    out = []
+    sec = 0
+    for i in range(n):
+        if i % 10 == 0:
+            sec += 10
+        ts = f"2025-01-01T{(sec // 3600) % 24:02d}:{(sec // 60) % 60:02d}:{sec % 60:02d}Z"
+        out.append(f"TELEMETRY v={rnd.uniform(0, 30):.2f} battery={rnd.randint(0, 100)} "
+                   f"dir={rnd.choice(dirs)} timestamp={ts}")
+    return out
+
+
+def old_handle_line(line, state):
+    # Copia de la lógica original, sin las llamadas a Tk
+    if line.startswith("TELEMETRY"):
+        parts = line.split()
+        kv = {}
+        for p in parts[1:]:
+            if "=" in p:
+                k, v = p.split("=", 1)
+                kv[k] = v
+        v = kv.get("v")
+        b = kv.get("battery")
+        d = kv.get("dir")
+        if v is not None:
+            try: state["speed"] = float(v)
+            except: state["speed"] = 0.0
+        if b is not None:
+            try: state["battery"] = int(float(b))
+            except: state["battery"] = 0
+        if d is not None:
+            direction = d.upper()
+            try:
+                if '(' in d and ')' in d:
+                    state["heading"] = float(d.split('(')[1].split(')')[0])
+                else:
+                    if 'N' in direction: state["heading"] = 0
+                    elif 'E' in direction: state["heading"] = 90
+                    elif 'S' in direction: state["heading"] = 180
+                    elif 'W' in direction: state["heading"] = 270
+            except Exception:
+                state["heading"] = 0.0
+
+
+def timed(label, fn, n):
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<38} {dt:6.2f} s  {n / dt:>12,.0f} líneas/s  {dt / n * 1e9:7.0f} ns/línea")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lines = synthetic_lines(n)
+
+    def old():
+        state = {}
+        for line in lines:
+            old_handle_line(line, state)
+
+    def one_by_one():
+        for line in lines:
+            parse_frame(line)
+
+    print("(la versión original no convierte el timestamp; parse_frame sí)")
+    timed("original _handle_line", old, n)
+    timed("parse_frame (línea a línea)", one_by_one, n)
+    timed("parse_many (bloque)", lambda: parse_many(lines), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_wire.py - Bytes en el cable y CPU de interpretación por trama: texto, bin y delta.
+1) Sintético: una serie de tramas a 1 Hz (la velocidad cambia cada ~20 s, el
+   rumbo cada ~50 s, la batería cada ~100 s) codificada como la envía
+   server.c en cada modo y recorrida por el framer del cliente en bloques de
+   16 KiB (LineFramer + parse_frame en texto, WireFramer en bin/delta).
+2) En vivo (--standin RATE): TelemetryClient contra standin_server.py en
+   cada modo; bytes recibidos y CPU del proceso por trama.
+Ejecutar: python3 -m bench.bench_wire [--frames 200000] [--standin 5000 --duration 5]
+"""
+
+import argparse
+import random
+import time
+
+from bench.suite import PASSWORD, USER, Server
+from client import TelemetryClient
+from framing import LineFramer
+from metrics import client_metrics
+from telemetry import cardinal_of, parse_frame
+from wire import MODES, WireEncoder, WireFramer
+
+CHUNK = 16 * 1024
+
+
+def series(n, seed=1):
+    rng = random.Random(seed)
+    speed, battery, deg, ts = 0.0, 100, 0, int(time.time())
+    out = []
+    for _ in range(n):
+        if rng.random() < 1 / 20: speed = min(30.0, max(0.0, speed + rng.choice((-2.5, 2.5))))
+        if rng.random() < 1 / 50: deg = (deg + rng.choice((90, 270))) % 360
+        if rng.random() < 1 / 100: battery = max(0, battery - 1)
+        ts += 1
+        out.append((speed, battery, deg, ts))
+    return out
+
+
+def encode(frames, mode):
+    if mode == "text":
+        return b"".join(f"TELEMETRY v={v:.2f} battery={b} dir={cardinal_of(d)} timestamp="
+                        f"{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))}\n".encode()
+                        for v, b, d, ts in frames)
+    enc = WireEncoder(mode)
+    return b"".join(enc.encode(*f) for f in frames)
+
+
+def parse_cpu(data, mode):
+    """Segundos de CPU para recorrer `data` como lo hace el hilo receptor."""
+    framer = LineFramer() if mode == "text" else WireFramer()
+    frames = 0
+    t0 = time.process_time()
+    for i in range(0, len(data), CHUNK):
+        for item in framer.feed(data[i:i + CHUNK]):
+            if item.__class__ is str:
+                item = parse_frame(item)
+            if item is not None:
+                frames += 1
+    return time.process_time() - t0, frames
+
+
+def synthetic(n):
+    frames = series(n)
+    results = {}
+    for mode in MODES:
+        data = encode(frames, mode)
+        cpu, got = min((parse_cpu(data, mode) for _ in range(3)), key=lambda r: r[0])
+        if got != n:
+            raise RuntimeError(f"{mode}: {got} tramas de {n}")
+        results[mode] = (len(data) / n, cpu / n * 1e9)
+    return results
+
+
+def live(rate, duration):
+    results = {}
+    for mode in MODES:
+        with Server(rate) as srv:
+            c = TelemetryClient(wire=mode)
+            c.metrics = m = client_metrics(c, gui=False)
+            c.connect("127.0.0.1", srv.port)
+            c.send_line(f"AUTH {USER} {PASSWORD}")
+            c.send_line("SUBSCRIBE OBSERVER")
+            time.sleep(0.5)
+            c.q.drain()
+            b0, cpu0, frames = m.rx_bytes_total.value, time.process_time(), 0
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                frames += sum(1 for kind, _ in c.q.drain() if kind == "telemetry")
+                time.sleep(0.02)
+            cpu, nbytes = time.process_time() - cpu0, m.rx_bytes_total.value - b0
+            c.close()
+        results[mode] = (nbytes / max(frames, 1), cpu / max(frames, 1) * 1e9, frames / duration)
+    return results
+
+
+def main():
+    p = argparse.ArgumentParser(description="Formato de TELEMETRY: texto frente a bin/delta")
+    p.add_argument("--frames", type=int, default=200_000, help="tramas de la serie sintética")
+    p.add_argument("--standin", type=float, metavar="RATE", help="medir también en vivo contra standin_server.py")
+    p.add_argument("--duration", type=float, default=5.0, help="segundos por modo en vivo")
+    args = p.parse_args()
+
+    print(f"-- sintético: {args.frames} tramas a 1 Hz")
+    base = None
+    for mode, (nbytes, ns) in synthetic(args.frames).items():
+        base = base or (nbytes, ns)
+        print(f"   {mode:<6} {nbytes:>7.1f} B/trama ({nbytes / base[0]:5.1%})  {ns:>8,.0f} ns/trama "
+              f"({ns / base[1]:5.1%})")
+    if args.standin:
+        print(f"-- en vivo: standin_server a {args.standin:g} tramas/s")
+        for mode, (nbytes, ns, fps) in live(args.standin, args.duration).items():
+            print(f"   {mode:<6} {nbytes:>7.1f} B/trama  {ns:>8,.0f} ns CPU/trama  {fps:>9,.0f} tramas/s")
+
+
+if __name__ == "__main__":
+    main()
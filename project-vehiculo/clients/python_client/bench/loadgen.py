@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+loadgen.py - Generador de carga del protocolo contra server.c (o standin_server.py).
+Abre miles de sesiones AsyncTelemetryClient en un único bucle asyncio: los
+observadores hacen AUTH + SUBSCRIBE OBSERVER y sólo escuchan; los admins
+hacen SUBSCRIBE ADMIN y envían CMD según una mezcla ponderada a un ritmo
+Poisson. Mide:
+  - reparto (fan-out) de cada difusión TELEMETRY: tiempo de la primera a la
+    última sesión que la recibe, y proporción de sesiones que la reciben
+  - desfase por cliente: llegada a cada sesión menos la primera llegada
+  - latencia absoluta servidor -> cliente si las líneas traen sent=<epoch>
+    (standin_server.py --stamp)
+  - latencia CMD -> CMD-ACK/CMD-ERR, por acción y motivo de error
+  - fallos de conexión/AUTH y desconexiones inesperadas por sesión-minuto
+  - retraso del propio bucle del generador (si crece, las cifras de desfase
+    son del cliente y no del servidor)
+El informe se guarda como JSON (bench/results/loadgen-<fecha>-<commit>.json).
+Ejecutar:  python3 -m bench.loadgen HOST:PUERTO --observers 2000 --admins 20 --duration 120
+           python3 -m bench.loadgen --standin 1 --observers 500 --admins 5
+Comparar:  python3 -m bench.loadgen --compare antes.json despues.json
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import platform
+import random
+import resource
+import time
+
+from aioclient import AsyncTelemetryClient
+from bench.suite import HERE, PASSWORD, USER, Server, compare, git_commit, pct
+from commands import action_of, reply_action
+
+RESERVOIR = 100_000   # muestras retenidas por medida por entrega (percentiles exactos sobre ellas)
+DEFAULT_MIX = "SPEED UP=3,SLOW DOWN=3,TURN LEFT=1,TURN RIGHT=1"
+SETTLE_S = 3.0      # una difusión se da por cerrada tras este tiempo sin llegadas nuevas
+CMD_TIMEOUT = 10.0
+LAG_PERIOD = 0.1
+
+# métrica -> True si "más alto es mejor"
+HIGHER_IS_BETTER = {"sessions_ready": True, "delivery_ratio": True,
+                    "fanout_spread_p50_ms": False, "fanout_spread_p99_ms": False,
+                    "delivery_skew_p50_ms": False, "delivery_skew_p99_ms": False,
+                    "fanout_latency_p50_ms": False, "fanout_latency_p99_ms": False,
+                    "ack_latency_p50_ms": False, "ack_latency_p99_ms": False,
+                    "setup_p99_ms": False, "disconnects_per_session_min": False,
+                    "client_loop_lag_p99_ms": False}
+
+
+def parse_mix(text):
+    """"SPEED UP=3,TURN LEFT=1" -> ([líneas CMD], [pesos])."""
+    lines, weights = [], []
+    for item in text.split(","):
+        cmd, _, w = item.strip().rpartition("=")
+        if not cmd:
+            cmd, w = w, "1"
+        lines.append(cmd if cmd.startswith(("CMD ", "LIST_USERS")) else f"CMD {cmd}")
+        weights.append(float(w))
+    return lines, weights
+
+
+class Reservoir:
+    """Muestra uniforme acotada (algoritmo R): miles de sesiones x difusiones no
+    caben en una lista, y los cubos de un histograma son demasiado gruesos."""
+
+    def __init__(self, size=RESERVOIR):
+        self.size = size
+        self.samples = []
+        self.count = 0
+
+    def add(self, v):
+        self.count += 1
+        if len(self.samples) < self.size:
+            self.samples.append(v)
+        else:
+            i = random.randrange(self.count)
+            if i < self.size:
+                self.samples[i] = v
+
+
+class Session:
+    __slots__ = ("client", "role", "started", "ready_at", "last_raw", "occurrence", "pending", "closed")
+
+    def __init__(self, client, role):
+        self.client = client
+        self.role = role
+        self.started = None
+        self.ready_at = None      # perf_counter de SUBSCRIBE-OK
+        self.last_raw = None      # para distinguir difusiones idénticas consecutivas
+        self.occurrence = 0
+        self.pending = collections.deque()   # (acción, perf_counter de envío)
+        self.closed = False
+
+
+class LoadStats:
+    """Hace de TelemetryBridge para todas las sesiones: anota cada mensaje al llegar."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.ready = 0
+        self.stopping = False
+        self.broadcasts = {}                  # (línea, ocurrencia) -> [primera, última, n, listas]
+        self.spreads = []                     # s, de la primera a la última llegada
+        self.ratios = []                      # sesiones que la recibieron / listas
+        self.skew = Reservoir()               # s, llegada menos primera llegada de esa difusión
+        self.latency = Reservoir()            # s, llegada menos sent= del servidor
+        self.ack = []                         # s, CMD -> respuesta
+        self.ack_by_action = collections.defaultdict(list)
+        self.replies = collections.Counter()  # "ACK" / "ERR reason=..."
+        self.cmds_sent = 0
+        self.timeouts = 0
+        self.setup = []                       # s, connect -> SUBSCRIBE-OK
+        self.failures = collections.Counter() # connect / auth / protocol / disconnect
+        self.session_seconds = 0.0
+        self.loop_lag = Reservoir()
+
+    def put(self, source, kind, payload):
+        now = time.perf_counter()
+        s = self.sessions[source]
+        if kind == "telemetry":
+            self._delivery(s, payload.raw, now)
+        elif kind == "line":
+            if payload.startswith(("CMD-ACK", "CMD-ERR")):
+                self._reply(s, payload, now)
+            elif payload.startswith("SUBSCRIBE-OK") and s.ready_at is None:
+                s.ready_at = now
+                self.ready += 1
+                self.setup.append(now - s.started)
+            elif payload.startswith("AUTH-ERR"):
+                self.failures["auth"] += 1
+            elif payload.startswith("ERR"):
+                self.failures["protocol"] += 1
+        elif kind == "status":
+            self._closed(s, now, unexpected=not self.stopping)
+
+    def _delivery(self, s, raw, now):
+        s.occurrence = s.occurrence + 1 if raw == s.last_raw else 0
+        s.last_raw = raw
+        key = (raw, s.occurrence)
+        b = self.broadcasts.get(key)
+        if b is None:
+            self.broadcasts[key] = [now, now, 1, self.ready]
+        else:
+            b[1] = now; b[2] += 1
+            self.skew.add(now - b[0])
+        if " sent=" in raw:
+            self.latency.add(max(0.0, time.time() - float(raw.rsplit(" sent=", 1)[1])))
+
+    def _reply(self, s, line, now):
+        action = reply_action(line)
+        for i, (a, t) in enumerate(s.pending):
+            if a == action:
+                del s.pending[i]
+                self.ack.append(now - t)
+                self.ack_by_action[action].append(now - t)
+                break
+        if line.startswith("CMD-ACK"):
+            self.replies["ACK"] += 1
+        else:
+            reason = next((tok for tok in line.split()[1:] if tok.startswith("reason=")), "reason=?")
+            self.replies[f"ERR {reason}"] += 1
+
+    def _closed(self, s, now, unexpected):
+        if s.closed:
+            return
+        s.closed = True
+        if s.started is not None:
+            self.session_seconds += now - s.started
+        if s.ready_at is not None:
+            self.ready -= 1
+        if unexpected:
+            self.failures["disconnect"] += 1
+
+    def settle(self, now, force=False):
+        """Cierra las difusiones sin llegadas en SETTLE_S y expira comandos."""
+        for key in [k for k, b in self.broadcasts.items() if force or now - b[1] >= SETTLE_S]:
+            first, last, n, expected = self.broadcasts.pop(key)
+            self.spreads.append(last - first)
+            if expected:
+                self.ratios.append(min(1.0, n / expected))
+        for s in self.sessions.values():
+            while s.pending and (force or now - s.pending[0][1] > CMD_TIMEOUT):
+                s.pending.popleft()
+                self.timeouts += 1
+
+
+async def run_session(stats, args, name, role, delay, mix):
+    c = AsyncTelemetryClient(args.host, args.port, stats, name=name)
+    s = stats.sessions[name] = Session(c, role)
+    await asyncio.sleep(delay)
+    s.started = time.perf_counter()
+    try:
+        await c.connect(args.timeout)
+    except RuntimeError:
+        stats.failures["connect"] += 1
+        s.closed = True
+        return
+    reader = asyncio.ensure_future(c.run())
+    try:
+        await c.auth(args.user, args.password)
+        await c.subscribe(role)
+        if role == "ADMIN" and args.cmd_rate > 0:
+            lines, weights = mix
+            while not reader.done():
+                await asyncio.sleep(random.expovariate(args.cmd_rate))
+                if s.ready_at is None:
+                    continue
+                line = random.choices(lines, weights)[0]
+                if line.startswith("CMD "):
+                    s.pending.append((action_of(line), time.perf_counter()))
+                    stats.cmds_sent += 1
+                await c.send_line(line)
+        await reader
+    except RuntimeError:
+        pass   # envío sobre una conexión ya caída: lo cuenta run() como desconexión
+    finally:
+        reader.cancel()
+        stats._closed(s, time.perf_counter(), unexpected=False)
+
+
+async def loop_lag(stats):
+    while True:
+        t = time.perf_counter()
+        await asyncio.sleep(LAG_PERIOD)
+        stats.loop_lag.add(max(0.0, time.perf_counter() - t - LAG_PERIOD))
+
+
+async def settler(stats):
+    while True:
+        await asyncio.sleep(1.0)
+        stats.settle(time.perf_counter())
+
+
+async def progress(stats, total, t0):
+    while True:
+        await asyncio.sleep(5.0)
+        print(f"   t={time.perf_counter() - t0:5.0f}s  listas {stats.ready}/{total}  difusiones "
+              f"{len(stats.spreads)}  CMD {stats.cmds_sent}  fallos {dict(stats.failures)}", flush=True)
+
+
+async def run_load(args):
+    stats = LoadStats()
+    mix = parse_mix(args.mix)
+    total = args.observers + args.admins
+    roles = ["ADMIN"] * args.admins + ["OBSERVER"] * args.observers
+    t0 = time.perf_counter()
+    tasks = [asyncio.ensure_future(run_session(stats, args, f"{role[0].lower()}{i}", role,
+                                               args.ramp * i / max(1, total), mix))
+             for i, role in enumerate(roles)]
+    helpers = [asyncio.ensure_future(f) for f in (loop_lag(stats), settler(stats), progress(stats, total, t0))]
+    await asyncio.sleep(args.ramp + args.duration)
+    stats.stopping = True
+    wall = time.perf_counter() - t0
+    for s in stats.sessions.values():
+        stats._closed(s, time.perf_counter(), unexpected=False)
+    for t in tasks + helpers:
+        t.cancel()
+    await asyncio.gather(*tasks, *helpers, return_exceptions=True)
+    stats.settle(time.perf_counter(), force=True)
+    return stats, wall
+
+
+def report(stats, args, wall):
+    ms = lambda v: None if v is None else v * 1e3
+    hp = lambda r, p: ms(pct(r.samples, p))
+    session_min = stats.session_seconds / 60.0
+    disconnects = stats.failures["disconnect"]
+    r = {
+        "sessions_requested": args.observers + args.admins,
+        "sessions_ready": sum(1 for s in stats.sessions.values() if s.ready_at is not None),
+        "connect_failures": stats.failures["connect"],
+        "auth_failures": stats.failures["auth"],
+        "protocol_errors": stats.failures["protocol"],
+        "disconnects": disconnects,
+        "disconnects_per_session_min": disconnects / session_min if session_min else 0.0,
+        "setup_p50_ms": ms(pct(stats.setup, 50)), "setup_p99_ms": ms(pct(stats.setup, 99)),
+        "broadcasts": len(stats.spreads),
+        "delivery_ratio": sum(stats.ratios) / len(stats.ratios) if stats.ratios else None,
+        "fanout_spread_p50_ms": ms(pct(stats.spreads, 50)), "fanout_spread_p99_ms": ms(pct(stats.spreads, 99)),
+        "fanout_spread_max_ms": ms(max(stats.spreads)) if stats.spreads else None,
+        "delivery_skew_p50_ms": hp(stats.skew, 50), "delivery_skew_p99_ms": hp(stats.skew, 99),
+        "fanout_latency_p50_ms": hp(stats.latency, 50), "fanout_latency_p99_ms": hp(stats.latency, 99),
+        "cmds_sent": stats.cmds_sent, "cmd_timeouts": stats.timeouts,
+        "ack_latency_p50_ms": ms(pct(stats.ack, 50)), "ack_latency_p99_ms": ms(pct(stats.ack, 99)),
+        "client_loop_lag_p99_ms": hp(stats.loop_lag, 99),
+        "wall_s": wall,
+    }
+    detail = {
+        "replies": dict(stats.replies),
+        "ack_latency_by_action_ms": {a: {"n": len(v), "p50": ms(pct(v, 50)), "p99": ms(pct(v, 99))}
+                                     for a, v in sorted(stats.ack_by_action.items())},
+    }
+    return r, detail
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    want = needed + 64
+    if soft < want:
+        new = want if hard == resource.RLIM_INFINITY else min(hard, want)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (new, hard))
+        if new < want:
+            print(f"aviso: límite de descriptores {new} < {want}; habrá fallos de conexión")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generador de carga del protocolo de vehículos")
+    p.add_argument("endpoint", nargs="?", help="host:puerto del servidor bajo prueba")
+    p.add_argument("--standin", type=float, metavar="TRAMAS_S",
+                   help="arrancar standin_server.py --stamp con ese ritmo en vez de usar endpoint")
+    p.add_argument("--observers", type=int, default=200, help="sesiones SUBSCRIBE OBSERVER")
+    p.add_argument("--admins", type=int, default=5, help="sesiones SUBSCRIBE ADMIN que envían CMD")
+    p.add_argument("--cmd-rate", type=float, default=0.5, help="CMD/s por admin (llegadas de Poisson)")
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"comandos y pesos (por defecto {DEFAULT_MIX!r})")
+    p.add_argument("--user", default=USER)
+    p.add_argument("--password", default=os.environ.get("VEHICULO_PASSWORD", PASSWORD))
+    p.add_argument("--ramp", type=float, default=5.0, help="segundos para abrir todas las sesiones")
+    p.add_argument("--duration", type=float, default=60.0, help="segundos de medida tras la rampa")
+    p.add_argument("--timeout", type=float, default=10.0, help="timeout de conexión")
+    p.add_argument("--output", help="JSON del informe (por defecto bench/results/loadgen-<fecha>-<commit>.json)")
+    p.add_argument("--compare", nargs=2, metavar=("A", "B"), help="comparar dos informes")
+    args = p.parse_args()
+    if args.compare:
+        compare(*args.compare, keys=HIGHER_IS_BETTER)
+        return
+    if args.standin is None and not args.endpoint:
+        p.error("hace falta host:puerto o --standin")
+
+    raise_fd_limit(args.observers + args.admins)
+    server = Server(args.standin, stamp=True) if args.standin is not None else None
+    try:
+        if server:
+            args.host, args.port = "127.0.0.1", server.port
+        else:
+            args.host, _, port = args.endpoint.rpartition(":")
+            args.port = int(port)
+        print(f"-- {args.observers} observadores + {args.admins} admins contra {args.host}:{args.port} "
+              f"(rampa {args.ramp:g}s, medida {args.duration:g}s)", flush=True)
+        cpu0 = time.process_time()
+        stats, wall = asyncio.run(run_load(args))
+        cpu = time.process_time() - cpu0
+    finally:
+        if server:
+            server.__exit__(None, None, None)
+
+    results, detail = report(stats, args, wall)
+    results["client_cpu_pct"] = 100 * cpu / wall
+    for k, v in results.items():
+        print(f"   {k:<28} {v:.3f}" if isinstance(v, float) else f"   {k:<28} {v}")
+    for a, d in detail["ack_latency_by_action_ms"].items():
+        print(f"   ack {a:<24} n={d['n']:<6} p50={d['p50']:.2f} ms p99={d['p99']:.2f} ms")
+    print(f"   respuestas {detail['replies']}")
+
+    commit = git_commit()
+    meta = {"commit": commit, "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "target": "standin" if server else f"{args.host}:{args.port}",
+            "params": {k: getattr(args, k) for k in ("observers", "admins", "cmd_rate", "mix", "ramp", "duration")}}
+    out = args.output or os.path.join(HERE, "bench", "results",
+                                      f"loadgen-{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "results": results, "detail": detail}, f, indent=2)
+    print(f"informe en {out}")
+
+
+if __name__ == "__main__":
+    main()
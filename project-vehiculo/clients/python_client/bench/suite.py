@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+suite.py - Benchmarks de extremo a extremo contra standin_server.py.
+Mide rendimiento de recepción de TelemetryClient, coste de parse_frame,
+latencia socket -> _poll y RTT de comandos. Guarda un JSON con el commit
+para comparar entre versiones.
+Ejecutar:  python3 -m bench.suite [--duration 5] [--output fichero.json]
+Comparar:  python3 -m bench.suite --compare antes.json despues.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+from bench.bench_telemetry import synthetic_lines
+from channel import Channel
+from client import TelemetryClient
+from render import RenderScheduler
+from telemetry import parse_frame
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER, PASSWORD = "bench", "bench"
+
+# métrica -> True si "más alto es mejor"
+HIGHER_IS_BETTER = {"recv_lines_per_s": True, "parse_ns_per_line": False,
+                    "queue_latency_p50_ms": False, "queue_latency_p99_ms": False,
+                    "cmd_rtt_p50_ms": False, "cmd_rtt_p99_ms": False, "handoff_ns_per_msg": False}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """standin_server.py en un proceso aparte, para no mezclar su CPU con la del cliente."""
+
+    def __init__(self, rate, stamp=False):
+        self.port = free_port()
+        cmd = [sys.executable, os.path.join(HERE, "standin_server.py"), "--port", str(self.port),
+               "--rate", str(rate), "--user", USER, "--password", PASSWORD]
+        if stamp:
+            cmd.append("--stamp")
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.2).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("standin_server no arrancó")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def connected_client(port):
+    c = TelemetryClient()
+    c.connect("127.0.0.1", port)
+    c.send_line(f"AUTH {USER} {PASSWORD}")
+    c.send_line("SUBSCRIBE ADMIN")
+    return c
+
+
+def pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def bench_recv(duration):
+    with Server(rate=10_000) as srv:
+        c = connected_client(srv.port)
+        time.sleep(0.5)
+        while c.get_message_nowait():
+            pass
+        n = 0
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        while time.perf_counter() - t0 < duration:
+            msg = c.get_message_nowait()
+            if msg is None:
+                time.sleep(0.001)
+            elif msg[0] == "telemetry":
+                n += 1
+        wall = time.perf_counter() - t0
+        cpu = time.process_time() - cpu0
+        c.close()
+    return {"recv_lines_per_s": n / wall, "recv_cpu_pct": 100 * cpu / wall}
+
+
+def bench_parse(n=200_000):
+    lines = synthetic_lines(n)
+    t0 = time.perf_counter()
+    for line in lines:
+        parse_frame(line)
+    return {"parse_ns_per_line": (time.perf_counter() - t0) / n * 1e9}
+
+
+def bench_handoff(n=200_000, per_recv=50):
+    # Coste puro del paso receptor -> consumidor: put_batch por recv + get_nowait
+    msgs = [("telemetry", None)] * n
+    ch = Channel(capacity=n, hard_limit=n)
+    t0 = time.perf_counter()
+    for i in range(0, n, per_recv):
+        ch.put_batch(msgs[i:i + per_recv])
+    while ch.get_nowait():
+        pass
+    return {"handoff_ns_per_msg": (time.perf_counter() - t0) / n * 1e9}
+
+
+def bench_queue_latency(duration):
+    # Consumidor con el mismo periodo que _poll bajo carga (RenderScheduler.frame_ms)
+    tick = RenderScheduler().frame_ms / 1000.0
+    lat = []
+    with Server(rate=1000, stamp=True) as srv:
+        c = connected_client(srv.port)
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < duration:
+            time.sleep(tick)
+            now = time.time()
+            msg = c.get_message_nowait()
+            while msg:
+                if msg[0] == "telemetry" and " sent=" in msg[1].raw:
+                    lat.append(now - float(msg[1].raw.rsplit(" sent=", 1)[1]))
+                msg = c.get_message_nowait()
+        c.close()
+    lat = [x * 1e3 for x in lat[len(lat) // 10:]]   # descarta el arranque
+    return {"queue_latency_p50_ms": pct(lat, 50), "queue_latency_p99_ms": pct(lat, 99),
+            "queue_latency_max_ms": max(lat) if lat else None, "queue_latency_samples": len(lat),
+            "poll_tick_ms": tick * 1e3}
+
+
+def bench_cmd_rtt(count=300):
+    rtts = []
+    with Server(rate=100) as srv:
+        c = connected_client(srv.port)
+        time.sleep(0.3)
+        while c.get_message_nowait():
+            pass
+        for i in range(count):
+            cmd = "CMD SPEED UP" if i % 2 == 0 else "CMD SLOW DOWN"
+            t0 = time.perf_counter()
+            c.send_line(cmd)
+            deadline = t0 + 2.0
+            while time.perf_counter() < deadline:
+                msg = c.get_message_nowait()
+                if msg is None:
+                    time.sleep(0.0002)
+                elif msg[0] == "line" and msg[1].startswith(("CMD-ACK", "CMD-ERR")):
+                    rtts.append((time.perf_counter() - t0) * 1e3)
+                    break
+        c.close()
+    return {"cmd_rtt_p50_ms": pct(rtts, 50), "cmd_rtt_p99_ms": pct(rtts, 99), "cmd_rtt_samples": len(rtts)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def compare(a_path, b_path, keys=HIGHER_IS_BETTER):
+    with open(a_path) as f: a = json.load(f)
+    with open(b_path) as f: b = json.load(f)
+    print(f"{'métrica':<26} {a['meta']['commit']:>12} {b['meta']['commit']:>12}   cambio")
+    for k, hib in keys.items():
+        va, vb = a["results"].get(k), b["results"].get(k)
+        if va is None or vb is None:
+            continue
+        change = (vb - va) / va * 100 if va else 0.0
+        better = (change > 0) == hib
+        flag = "" if abs(change) < 5 else ("  mejor" if better else "  PEOR")
+        print(f"{k:<26} {va:>12.3f} {vb:>12.3f} {change:>+7.1f}%{flag}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Suite de benchmarks del cliente")
+    p.add_argument("--duration", type=float, default=5.0, help="segundos por escenario")
+    p.add_argument("--output", help="JSON de resultados (por defecto bench/results/<fecha>-<commit>.json)")
+    p.add_argument("--compare", nargs=2, metavar=("A", "B"), help="comparar dos ficheros de resultados")
+    args = p.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {}
+    for name, fn in (("recepción", lambda: bench_recv(args.duration)), ("parse", bench_parse),
+                     ("paso entre hilos", bench_handoff),
+                     ("latencia de cola", lambda: bench_queue_latency(args.duration)),
+                     ("RTT de comandos", bench_cmd_rtt)):
+        print(f"-- {name}...", flush=True)
+        r = fn()
+        for k, v in r.items():
+            print(f"   {k:<26} {v:.3f}" if isinstance(v, float) else f"   {k:<26} {v}")
+        results.update(r)
+
+    commit = git_commit()
+    meta = {"commit": commit, "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "duration": args.duration}
+    out = args.output or os.path.join(HERE, "bench", "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"resultados en {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+channel.py - Canal acotado entre el hilo receptor y el consumidor (GUI/headless).
+El productor entrega una lista por recv (put_batch: un lock por lote, no por
+línea) y el consumidor se lleva todo lo pendiente de una vez en su propio
+buffer, así get_nowait() normalmente es un popleft() sin lock.
+Si el consumidor se atasca y se supera `capacity`, se compacta según el tipo:
+  - TELEMETRY: sólo sobrevive la trama más reciente (las demás ya están superadas)
+  - todo lo demás (líneas de respuesta, "status", "cmd", "link") nunca se
+    descarta: es poco volumen y perder una respuesta confunde más que esperar
+Si aun así lo que no se puede descartar llena `hard_limit`, put_batch espera
+a que el consumidor vacíe (el control de flujo de TCP frena al servidor) en
+vez de crecer sin límite.
+"""
+
+import collections
+import threading
+import time
+
+CAPACITY = 10_000
+HARD_LIMIT = 4 * CAPACITY
+
+
+class Channel:
+    def __init__(self, capacity=CAPACITY, hard_limit=HARD_LIMIT):
+        self.capacity, self.hard_limit = capacity, max(hard_limit, capacity)
+        self.pending = collections.deque()   # lado productor (bajo self.cond)
+        self.out = collections.deque()       # lado consumidor (sólo su hilo)
+        self.cond = threading.Condition(threading.Lock())
+        self.generation = 0                  # release() lo incrementa: suelta al productor
+        # Contadores
+        self.batches = 0
+        self.messages = 0
+        self.high_water = 0
+        self.collapsed = 0                   # tramas TELEMETRY superadas y descartadas
+        self.compactions = 0
+        self.blocked_s = 0.0                 # tiempo del productor esperando sitio
+
+    def __len__(self):
+        return len(self.pending) + len(self.out)
+
+    def qsize(self):
+        return len(self)
+
+    # ---------------- productor ----------------
+    def put(self, msg):
+        self.put_batch((msg,))
+
+    def put_batch(self, msgs):
+        if not msgs:
+            return
+        with self.cond:
+            self.pending.extend(msgs)
+            self.batches += 1
+            self.messages += len(msgs)
+            if len(self.pending) > self.capacity:
+                self._compact()
+                if len(self.pending) > self.hard_limit:
+                    t0, gen = time.monotonic(), self.generation
+                    while len(self.pending) > self.capacity and gen == self.generation:
+                        self.cond.wait(0.5)
+                    self.blocked_s += time.monotonic() - t0
+            depth = len(self.pending) + len(self.out)
+            if depth > self.high_water:
+                self.high_water = depth
+            self.cond.notify_all()
+
+    def _compact(self):
+        # Sólo en el camino lento: se recorre la cola una vez y se conserva todo
+        # lo que no es TELEMETRY más la última TELEMETRY, en su posición.
+        q = self.pending
+        last_tel = None
+        for i in range(len(q) - 1, -1, -1):
+            if q[i][0] == "telemetry":
+                last_tel = i
+                break
+        kept = collections.deque()
+        for i, msg in enumerate(q):
+            if i == last_tel or msg[0] != "telemetry":
+                kept.append(msg)
+            else:
+                self.collapsed += 1
+        self.pending = kept
+        self.compactions += 1
+
+    def release(self):
+        """Suelta a un productor bloqueado (al cerrar su conexión) y a get()."""
+        with self.cond:
+            self.generation += 1
+            self.cond.notify_all()
+
+    # ---------------- consumidor ----------------
+    def drain(self):
+        """Todos los mensajes pendientes, en orden (un lock por llamada)."""
+        with self.cond:
+            batch, self.pending = self.pending, collections.deque()
+            self.cond.notify_all()
+        if self.out:
+            self.out.extend(batch)
+            batch, self.out = self.out, collections.deque()
+        return batch
+
+    def get_nowait(self):
+        if not self.out:
+            if not self.pending:
+                return None
+            with self.cond:
+                self.out, self.pending = self.pending, self.out
+                self.cond.notify_all()
+            if not self.out:
+                return None
+        return self.out.popleft()
+
+    def get(self, timeout=None):
+        """Como get_nowait() pero esperando hasta `timeout` s; None si no llega nada."""
+        msg = self.get_nowait()
+        if msg is None:
+            with self.cond:
+                if not self.pending:
+                    self.cond.wait(timeout)
+            msg = self.get_nowait()
+        return msg
+
+    def stats(self):
+        return {"depth": len(self), "high_water": self.high_water, "batches": self.batches,
+                "messages": self.messages, "collapsed": self.collapsed,
+                "compactions": self.compactions, "blocked_s": self.blocked_s}
@@ -4,43 +4,90 @@
 client.py - Cliente GUI de Centro de Control Táctico (Nivel Alfa).
 Mejoras: Volante Táctico corregido, Dashboard modularizado, Brújula funcional.
 Usa solo tkinter. Ejecutar: python3 client.py
+Sin pantalla: python3 -m client --headless host:puerto (no importa tkinter).
 """
 
+import argparse
+import os
 import socket
+import sys
 import threading
 import time
-import tkinter as tk
-from tkinter import ttk, messagebox
-import queue
 import math
+import zlib
 
-BUFFER = 4096
+from battery import DrainAnalytics, format_estimate
+from channel import Channel
+from commands import CommandPipeline
+from framing import LineFramer
+from gauges import Cell, FrameClock, Needle, dial_ticks
+from journal import Journal, JournalReader, format_entry, parse_query
+from logpanel import LogPanel
+from metrics import HttpExporter, TextfileExporter, client_metrics
+from predict import DeadReckoner
+from recorder import EV_CMD_SENT, EV_STATUS, Recorder
+from render import RenderScheduler
+from session import Backoff, SessionState
+from telemetry import TelemetryFrame, format_frame, parse_frame
+from timeseries import Sparkline, TimeSeriesStore
+from wire import MODES as WIRE_MODES, WireFramer
+
+# tkinter se importa sólo en modo GUI (ver _load_tk); TelemetryClient y el modo
+# headless funcionan sin él.
+tk = ttk = messagebox = filedialog = None
+
+
+def _load_tk():
+    global tk, ttk, messagebox, filedialog
+    if tk is None:
+        import tkinter as tk
+        from tkinter import ttk, messagebox, filedialog
 
 # --------------------- Telemetry / Networking ---------------------
+STABLE_LINK = 5.0   # s: un enlace que dura menos no reinicia la espera exponencial
+DRAIN_REFRESH = 2.0 # s entre recálculos de la estimación de batería
+GAUGE_LEN = 102     # px: longitud de la aguja del velocímetro
+PREDICT_REFRESH = 0.25  # s entre extrapolaciones de la batería sin tramas nuevas
+SEARCH_LIMIT = 500      # resultados mostrados por búsqueda en el registro
+
 class TelemetryClient:
-    def __init__(self):
+    def __init__(self, recorder=None, journal=None, wire="text"):
         self.sock = None
         self.receiver_thread = None
         self.running = False
-        self.q = queue.Queue()
+        self.q = Channel()         # acotado, por lotes; ver channel.py
+        self.recorder = recorder   # recorder.Recorder opcional: graba tramas y eventos
+        self.journal = journal     # journal.Journal opcional: diario de todo lo enviado y recibido
+        self.commands = None       # CommandPipeline: envío sin bloquear + correlación ACK/ERR
+        self.wire = wire           # "text", "bin" o "delta": se pide en SUBSCRIBE (ver wire.py)
+        self.session = SessionState(wire=wire)
+        self.supervisor = None     # hilo de connect_async (conexión + reconexión)
+        self._stop = threading.Event()
+        self._link_lock = threading.Lock()   # close() frente a un _attach del supervisor
+        self.link_lost_at = None   # monotonic de la última caída aún sin telemetría
+        self.recoveries = []       # segundos desde la caída hasta la primera TELEMETRY
+        self.metrics = None        # metrics.Metrics opcional (None = sin coste)
 
-    def connect(self, host, port, timeout=5.0):
-        if self.sock:
-            self.close()
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.settimeout(timeout)
+    @staticmethod
+    def _open(host, port, timeout):
+        # create_connection resuelve el nombre (getaddrinfo) y prueba cada dirección
         try:
-            self.sock.connect((host, int(port)))
+            sock = socket.create_connection((host, int(port)), timeout=timeout)
         except Exception as e:
-            self.sock = None
             raise RuntimeError(f"Fallo al conectar: {e}")
-        self.sock.settimeout(None)
+        sock.settimeout(None)
+        return sock
+
+    def _attach(self, sock):
+        self.sock = sock
         self.running = True
-        self.receiver_thread = threading.Thread(target=self._receiver, daemon=True)
-        self.receiver_thread.start()
+        self.commands = CommandPipeline(sock.sendall, lambda cmd: self.q.put(("cmd", cmd)))
 
-    def close(self):
+    def _detach(self, reason=None):
         self.running = False
+        self.q.release()
+        if self.commands:
+            self.commands.stop(reason); self.commands = None
         try:
             if self.sock:
                 self.sock.shutdown(socket.SHUT_RDWR)
@@ -49,46 +96,169 @@ class TelemetryClient:
             pass
         self.sock = None
 
+    def connect(self, host, port, timeout=5.0):
+        """Conexión bloqueante sin reconexión (modo headless, benchmarks)."""
+        if self.sock or self.supervisor:
+            self.close()
+        self._attach(self._open(host, port, timeout))
+        self.receiver_thread = threading.Thread(target=self._receiver, daemon=True)
+        self.receiver_thread.start()
+
+    def connect_async(self, host, port, timeout=5.0, role="OBSERVER", reconnect=True):
+        """Conecta en segundo plano y vuelve enseguida. El progreso llega por la
+        cola como ("link", texto). Con reconnect, al caer el enlace reintenta con
+        espera exponencial y reanuda la sesión (AUTH token=..., último SUBSCRIBE)."""
+        if self.sock or self.supervisor:
+            self.close()
+        self._stop = threading.Event()
+        self.session = SessionState(role, self.wire)
+        self.supervisor = threading.Thread(target=self._supervise, args=(host, port, timeout, reconnect, self._stop),
+                                           daemon=True)
+        self.supervisor.start()
+
+    def _supervise(self, host, port, timeout, reconnect, stop):
+        backoff = Backoff()
+        while not stop.is_set():
+            self.q.put(("link", f"CONECTANDO a {host}:{port}..."))
+            try:
+                sock = self._open(host, port, timeout)
+            except RuntimeError as e:
+                if not reconnect:
+                    self.q.put(("status", str(e))); break
+                delay = backoff.next()
+                self.q.put(("link", f"{e} — reintento {backoff.attempt} en {delay:.1f} s"))
+                if stop.wait(delay): break
+                continue
+            with self._link_lock:
+                if stop.is_set():
+                    sock.close(); break
+                self._attach(sock)
+                commands = self.commands   # close() puede dejar self.commands a None
+            attached_at = time.monotonic()
+            self.q.put(("link", f"CONECTADO a {host}:{port}"))
+            for line in self.session.resume_lines():
+                commands.submit(line)
+                if self.journal: self.journal.record_out(line)
+            self._receiver()
+            if stop.is_set() or not reconnect:
+                break
+            with self._link_lock:
+                if stop.is_set():
+                    break   # close() ya soltó el enlace
+                self._detach("enlace perdido")
+            if self.link_lost_at is None:
+                self.link_lost_at = time.monotonic()
+            self.q.put(("link", "ENLACE PERDIDO — reconectando"))
+            # Un enlace estable reintenta en el acto; uno que cae nada más abrirse
+            # sigue la espera exponencial para no martillear al servidor
+            if time.monotonic() - attached_at >= STABLE_LINK:
+                backoff.reset()
+            elif stop.wait(backoff.next()):
+                break
+
+    def close(self):
+        with self._link_lock:
+            self._stop.set()
+            self._detach()
+        self.supervisor = None
+        self.link_lost_at = None
+
     def send_line(self, line):
         if not self.sock:
             raise RuntimeError("No conectado")
+        line = self.session.with_wire(line)
         if not line.endswith("\n"):
             line = line + "\n"
         try:
             self.sock.sendall(line.encode('utf-8'))
         except Exception as e:
             raise RuntimeError(f"Transmit error: {e}")
+        self.session.note_sent(line)
+        if self.recorder and line.startswith("CMD"):
+            self.recorder.record_event(EV_CMD_SENT)
+        if self.journal: self.journal.record_out(line)
+
+    def send_async(self, line):
+        """Encola la línea para el hilo escritor y vuelve enseguida. El resultado
+        de un CMD llega por la cola como ("cmd", commands.Command)."""
+        commands = self.commands
+        if not commands:
+            raise RuntimeError("No conectado")
+        line = self.session.with_wire(line)
+        self.session.note_sent(line)
+        if self.recorder and line.startswith("CMD"):
+            self.recorder.record_event(EV_CMD_SENT)
+        if self.journal: self.journal.record_out(line)
+        return commands.submit(line)
 
     def _receiver(self):
-        buff = b""
+        # Con wire= el framer también decodifica tramas binarias; un servidor
+        # que no lo admita sigue mandando texto y se trata igual
+        framer = LineFramer() if self.wire == "text" else WireFramer()
+        rec = self.recorder
+        jr = self.journal
+        session = self.session
+        commands = self.commands   # el de este enlace, aunque close() lo suelte antes
         while self.running:
+            oversized = framer.oversized
             try:
-                data = self.sock.recv(BUFFER)
-                if not data:
+                nbytes = framer.recv_from(self.sock)
+                if not nbytes:
                     self.q.put(("status", "DESCONEXIÓN"))
+                    if rec: rec.record_event(EV_STATUS)
+                    if jr: jr.record_status("DESCONEXIÓN")
                     break
-                buff += data
-                while b"\n" in buff:
-                    line, buff = buff.split(b"\n", 1)
-                    try:
-                        txt = line.decode('utf-8').strip()
-                    except Exception:
-                        continue
-                    self.q.put(("line", txt))
+                m = self.metrics
+                if m: t0 = time.perf_counter()
+                lines = framer.lines()
+                batch = []   # un único put_batch por recv
+                for txt in lines:
+                    if txt.__class__ is TelemetryFrame:   # trama binaria ya decodificada
+                        frame = txt
+                        if jr: jr.record_in(format_frame(frame))
+                    else:
+                        if jr: jr.record_in(txt)
+                        frame = parse_frame(txt)
+                    if frame is not None:
+                        if rec: rec.record_frame(frame)
+                        batch.append(("telemetry", frame))
+                        if self.link_lost_at is not None:
+                            dt = time.monotonic() - self.link_lost_at
+                            self.link_lost_at = None
+                            self.recoveries.append(dt)
+                            if m: m.link_recovery_seconds.observe(dt)
+                            batch.append(("link", f"TELEMETRÍA RECUPERADA {dt:.2f} s tras la caída"))
+                    else:
+                        if rec: rec.record_line(txt)
+                        batch.append(("line", txt))
+                        # Un "ERR ..." sin acción (p. ej. "ERR not_authorized") cierra el CMD
+                        # más antiguo en vuelo: el servidor contesta en orden
+                        if txt.startswith(("CMD-ACK", "CMD-ERR", "ERR ")) and commands:
+                            commands.on_reply(txt)
+                        elif txt.startswith("AUTH") and commands:
+                            for line in session.note_reply(txt):
+                                commands.submit(line)
+                                if jr: jr.record_out(line)
+                self.q.put_batch(batch)
+                if m:
+                    m.rx_batch_seconds.observe(time.perf_counter() - t0)
+                    m.rx_bytes_total.inc(nbytes); m.rx_lines_total.inc(len(lines))
+                if framer.oversized != oversized:
+                    self.q.put(("status", f"Línea > {framer.max_line} bytes descartada"))
             except Exception as e:
-                self.q.put(("status", f"ERROR: {e}"))
+                if self.running:
+                    self.q.put(("status", f"ERROR: {e}"))
+                    if jr: jr.record_status(f"ERROR: {e}")
                 break
         self.running = False
 
     def get_message_nowait(self):
-        try:
-            return self.q.get_nowait()
-        except queue.Empty:
-            return None
+        return self.q.get_nowait()
 
 # --------------------- GUI ---------------------
 class FancyClientApp:
-    def __init__(self, root):
+    def __init__(self, root, client=None):
+        _load_tk()
         self.root = root
         root.title("Centro de Control Táctico — Vehículo Autónomo")
         root.geometry("1200x750")
@@ -109,7 +279,9 @@ class FancyClientApp:
         self.font_label = ("Segoe UI", 10)
         self.font_mono = ("Consolas", 10)
 
-        self.client = TelemetryClient()
+        # client: TelemetryClient propio, o un feed compartido (modo flota)
+        self.client = client or TelemetryClient()
+        self.closed = False
 
         # State Variables
         self.speed_val = 0.0
@@ -117,10 +289,29 @@ class FancyClientApp:
         self.direction = "N"
         self.connected = False
         self.current_heading_deg = 0.0 # Nuevo para rotación de aguja
+        self.render = RenderScheduler()
+        self._batt_drawn = None     # (píxel superior, color) dibujados en la batería
+        self.estimator = DeadReckoner()   # predicción entre tramas a partir de los CMD-ACK
+        self._predicted = frozenset()     # campos mostrados ahora como predichos
+        self._predict_at = 0.0
+        self.metrics = None            # metrics.Metrics; None = sin medir (F3 lo activa)
+        self.metrics_exported = False  # con exportador las métricas siguen al ocultar el overlay
+        self.metrics_overlay = None
+        self._poll_due = None
+        self.history = TimeSeriesStore()
+        self.history_window = 600.0   # s visibles en las sparklines
+        self._history_drawn = None     # (version, ventana) del último dibujo
+        self._history_at = 0.0
+        try:
+            self.drain = DrainAnalytics()   # numpy opcional: sin él no hay estimación
+        except RuntimeError:
+            self.drain = None
+        self._drain_at = 0.0
 
         self._configure_styles()
         self._build_ui()
-        self.root.after(120, self._poll)
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(self.render.frame_ms, self._poll)
 
     def _configure_styles(self):
         self.root.configure(bg=self.bg)
@@ -175,6 +366,13 @@ class FancyClientApp:
         ttk.Button(frm_sub, text="OBSERVER", command=lambda: self._send_cmd_text("SUBSCRIBE OBSERVER")).pack(fill=tk.X, pady=4)
         ttk.Button(frm_sub, text="ADMIN", command=lambda: self._send_cmd_text("SUBSCRIBE ADMIN")).pack(fill=tk.X, pady=4)
 
+        # Latencia de comandos (histograma por acción, ms)
+        frm_rtt = tk.Frame(left, bg=self.panel); frm_rtt.pack(padx=15, pady=10, fill=tk.X)
+        tk.Label(frm_rtt, text="Latencia CMD (ms):", bg=self.panel, fg=self.accent2).pack(anchor="w")
+        self.rtt_var = tk.StringVar(value="sin comandos")
+        tk.Label(frm_rtt, textvariable=self.rtt_var, bg=self.panel, fg=self.text, font=self.font_mono,
+                 justify=tk.LEFT, anchor="w").pack(fill=tk.X)
+
         # ------------------- PANEL CENTRAL: DASHBOARD -------------------
         center = tk.Frame(container, bg=self.panel, bd=1, relief=tk.SOLID, highlightbackground=self.accent, highlightthickness=2)
         center.grid(row=0, column=1, sticky="nsew")
@@ -212,6 +410,9 @@ class FancyClientApp:
         self.batt_fill = self.batt_canvas.create_rectangle(22, 160, 48, 160, fill=self.accent, width=0)
         self.batt_label = tk.Label(batt_frame, text="--%", bg=self.panel, fg=self.accent, font=("Consolas", 14, "bold"))
         self.batt_label.pack(anchor="center")
+        self.batt_info = tk.Label(batt_frame, text="autonomía: --", bg=self.panel, fg=self.dim, font=("Consolas", 9),
+                                  wraplength=150, justify=tk.CENTER)
+        self.batt_info.pack(anchor="center", pady=(4, 0))
         
         # Steering wheel (Center Bottom)
         steer_frame = tk.Frame(mid, bg=self.panel); steer_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=5)
@@ -227,15 +428,45 @@ class FancyClientApp:
         self._draw_compass()
         self.dir_label = tk.Label(dir_frame, text="--", bg=self.panel, fg=self.accent, font=("Consolas", 14, "bold"))
         self.dir_label.pack(anchor="center")
+        self.dir_text = Cell(self.dir_label)
+
+        # Histórico (Bottom): sparklines de velocidad y batería
+        hist = tk.Frame(center, bg=self.panel); hist.pack(fill=tk.X, padx=20, pady=(0, 12))
+        hdr = tk.Frame(hist, bg=self.panel); hdr.pack(fill=tk.X)
+        tk.Label(hdr, text="HISTÓRICO", bg=self.panel, fg=self.accent2, font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT)
+        for label, secs in (("24 h", 86400), ("1 h", 3600), ("10 min", 600), ("1 min", 60)):
+            tk.Button(hdr, text=label, bg=self.panel, fg=self.text, bd=0, font=self.font_label,
+                      activebackground=self._shade(self.panel, 20),
+                      command=lambda s=secs: self._set_history_window(s)).pack(side=tk.RIGHT, padx=2)
+        spark = {}
+        for field, color, vmax, unit in (("speed", self.accent, 30.0, " m/s"), ("battery", self.accent2, 100.0, "%")):
+            cv = tk.Canvas(hist, width=560, height=44, bg="#041118", highlightthickness=0)
+            cv.pack(fill=tk.X, pady=(4, 0))
+            spark[field] = Sparkline(cv, color, 0.0, vmax, unit)
+        self.sparklines = spark
 
         # ------------------- PANEL DERECHO: REGISTRO -------------------
         right = tk.Frame(container, bg=self.panel, bd=1, relief=tk.SOLID, highlightbackground=self._shade(self.panel, 15), highlightthickness=1)
         right.grid(row=0, column=2, sticky="nsew", padx=(15,0))
         tk.Label(right, text="[ REGISTRO DE EVENTOS ]", bg=self.panel, fg=self.accent2, font=self.font_title).pack(pady=10)
-        
+        search = tk.Frame(right, bg=self.panel)
+        search.pack(fill=tk.X, padx=10)
+        self.search_var = tk.StringVar()
+        ent = tk.Entry(search, textvariable=self.search_var, bg="#041118", fg=self.accent, insertbackground=self.accent,
+                       font=self.font_mono, bd=0)
+        ent.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=3)
+        ent.bind("<Return>", self._search)
+        ent.bind("<Escape>", self._clear_search)
+        ttk.Button(search, text="BUSCAR", command=self._search).pack(side=tk.RIGHT, padx=(6, 0))
+
         self.log_text = tk.Text(right, bg="#041118", fg=self.accent, font=self.font_mono, height=30, width=45, bd=0)
         self.log_text.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
+        self.log_text.tag_configure("info", foreground=self.accent)
+        self.log_text.tag_configure("send", foreground=self.accent2)
+        self.log_text.tag_configure("error", foreground=self.warning)
+        self.log_panel = LogPanel(self.log_text)
+        ttk.Button(right, text="EXPORTAR REGISTRO", command=self._export_log).pack(fill=tk.X, padx=10, pady=(0, 10))
 
         # ------------------- BARRA DE ESTADO -------------------
         self.status_var = tk.StringVar(value="ESTADO: INICIALIZANDO...")
@@ -244,6 +475,10 @@ class FancyClientApp:
 
         # Bindings
         self.steering_canvas.bind("<Button-1>", self._steer_click)
+        self.clock = FrameClock(self.root, [self.gauge, self.compass])
+        self.speed_text = Cell(self.lbl_speed_big)
+        self.batt_text = Cell(self.batt_label)
+        self.root.bind("<F3>", self.toggle_metrics_overlay)
 
     # --------------- drawing helpers ---------------
     def _draw_gauge_base(self):
@@ -256,27 +491,16 @@ class FancyClientApp:
         c.create_arc(center_x - radius, center_y - radius, center_x + radius, center_y + radius,
                      start=0, extent=180, style=tk.ARC, outline=self.dim, width=16)
         
-        # Ticks and Labels
-        for i in range(0, 31, 5): # Speed 0 to 30
-            angle_deg = (i / 30.0) * 180.0
-            ang_rad = math.radians(180 - angle_deg) # 180=0 deg, 0=180 deg
-            
-            r_outer = radius - 8
-            r_inner = radius - 18
-            
-            x1 = center_x + math.cos(ang_rad) * r_inner
-            y1 = center_y - math.sin(ang_rad) * r_inner
-            x2 = center_x + math.cos(ang_rad) * r_outer
-            y2 = center_y - math.sin(ang_rad) * r_outer
+        # Ticks and Labels (geometría precalculada y compartida entre dashboards)
+        for x1, y1, x2, y2, x_text, y_text, i in dial_ticks(center_x, center_y, radius, 30, 5): # Speed 0 to 30
             c.create_line(x1, y1, x2, y2, fill=self.text, width=2)
-            
-            # Labels
-            x_text = center_x + math.cos(ang_rad) * (radius - 30)
-            y_text = center_y - math.sin(ang_rad) * (radius - 30)
             c.create_text(x_text, y_text, text=str(i), fill=self.text, font=("Consolas", 8))
             
-        # Pointer initial position (0 speed)
-        self.gauge_pointer = c.create_line(center_x, center_y, center_x + radius - 18, center_y, fill=self.accent, width=6, capstyle=tk.ROUND, tags="pointer")
+        # Pointer: 0 = izquierda (ángulo matemático 180), crece en sentido horario
+        self.gauge_pointer = c.create_line(center_x, center_y, center_x - GAUGE_LEN, center_y, fill=self.accent, width=6, capstyle=tk.ROUND, tags="pointer")
+        self.gauge = Needle(c, self.gauge_pointer, center_x, center_y, GAUGE_LEN, 180, 180, True)
+        self.gauge_mark = c.create_text(center_x, center_y - 40, text="≈ PREDICCIÓN", fill=self.accent2,
+                                        font=("Consolas", 9, "bold"), state=tk.HIDDEN)
         c.create_oval(center_x - 8, center_y - 8, center_x + 8, center_y + 8, fill=self.accent, outline=self.bg, width=2)
 
 
@@ -351,8 +575,9 @@ class FancyClientApp:
             color = self.warning if label == "N" else self.text # North is always critical
             c.create_text(x, y, text=label, fill=color, font=("Consolas", 10, "bold"))
             
-        # Needle (Redraw position on update)
+        # Needle: rumbo 0 = norte (ángulo matemático 90), crece en sentido horario
         self.needle = c.create_line(cx, cy, cx, cy - r + 16, fill=self.accent, width=4, capstyle=tk.ROUND, tags="needle")
+        self.compass = Needle(c, self.needle, cx, cy, r - 16, 360, 90, True, wrap=True)
         c.create_oval(cx - 4, cy - 4, cx + 4, cy + 4, fill=self.dim, outline="")
 
 
@@ -398,93 +623,209 @@ class FancyClientApp:
         self.root.after(180, lambda: c.itemconfig(aid, outline=original_color))
         
     def _rotate_needle(self, direction):
-        # Maps cardinal points to angle degrees (0=N, 90=E, 180=S, 270=W)
+        # Rumbo numérico si la trama lo trae; si no, el del punto cardinal (0=N, 90=E, 180=S, 270=W)
         mapdir = {"N":0, "E":90, "S":180, "W":270}
-        
-        # Try to find the closest main direction or use current heading
-        target_deg = self.current_heading_deg 
-        for k, v in mapdir.items():
-            if k in direction.upper():
-                target_deg = v
-                break
-        
-        # Animate simple rotation to target_deg
-        cx, cy = 80, 80
-        r = 44 # Needle length
-        
-        # Convert bearing (0=N, 90=E) to canvas angle (90=N, 0=E)
-        # Canvas angle is 90 - Bearing
-        ang = math.radians(90 - target_deg)
-        
-        x2 = cx + math.cos(ang) * r
-        y2 = cy - math.sin(ang) * r
-        
-        self.dir_canvas.coords(self.needle, cx, cy, x2, y2)
+        target_deg = self.current_heading_deg
+        if target_deg is None:
+            target_deg = next((v for k, v in mapdir.items() if k in (direction or "").upper()), 0)
+        # La aguja gira por el camino más corto en los ticks del FrameClock
+        moving = self.compass.set_target(target_deg)
+        self.clock.wake()
+        return moving
 
 
     # ---------------- handle server messages ----------------
     def _handle_line(self, line):
-        if line.startswith("TELEMETRY"):
-            parts = line.split()
-            kv = {}
-            for p in parts[1:]:
-                if "=" in p:
-                    k, v = p.split("=", 1)
-                    kv[k] = v
-            
-            v = kv.get("v")
-            b = kv.get("battery")
-            d = kv.get("dir")
-            
-            if v is not None:
-                try: self.speed_val = float(v)
-                except: self.speed_val = 0.0
-            
-            if b is not None:
-                try: self.battery = int(float(b))
-                except: self.battery = 0
-                self._update_battery_canvas()
-            
-            if d is not None:
-                # Update text label
-                self.direction = d.upper()
-                self.dir_label.config(text=self.direction)
-                
-                # Simple parsing for heading/degree if available (e.g., dir=N(15.2))
-                try:
-                    if '(' in d and ')' in d:
-                        heading_str = d.split('(')[1].split(')')[0]
-                        self.current_heading_deg = float(heading_str)
-                    else:
-                        # Fallback: estimate degree from cardinal direction if no number is present
-                        if 'N' in self.direction: self.current_heading_deg = 0
-                        elif 'E' in self.direction: self.current_heading_deg = 90
-                        elif 'S' in self.direction: self.current_heading_deg = 180
-                        elif 'W' in self.direction: self.current_heading_deg = 270
-                        
-                except Exception:
-                    self.current_heading_deg = 0.0
-                    
-                self._rotate_needle(self.direction)
-                
+        # La interpretación se mide por lote en el receptor (rx_batch_seconds)
+        frame = parse_frame(line)
+        if frame is not None:
+            self._apply_frame(frame)
+
+    def _apply_frame(self, frame):
+        # La trama ya viene interpretada desde el hilo receptor; el dibujo se
+        # aplaza al próximo tick de _poll (sólo el último valor de cada campo).
+        self.render.offer(frame)
+
+    def _render(self):
+        r = self.render
+        dirty = r.take_dirty()
+        if "battery" in dirty:
+            self.battery = r.battery
+            self._update_battery_canvas()
+        if "label" in dirty:
+            self.direction = r.cardinal
+            self.dir_text.set(text=self.direction)
+        if "compass" in dirty:
+            self.current_heading_deg = r.heading
+            self._rotate_needle(self.direction)
+        if "gauge" in dirty:
+            self.speed_val = r.speed
+            self._update_gauge()
+        # La animación de las agujas corre aparte, en self.clock
+        return bool(dirty)
+
     # ---------------- polling and animation ----------------
     def _poll(self):
+        if self.closed:
+            return
+        m = self.metrics
+        if m:
+            t0 = time.perf_counter()
+            if self._poll_due: m.tk_lag_seconds.observe(max(0.0, t0 - self._poll_due))
         # Network Polling
+        busy = False
         msg = self.client.get_message_nowait()
         while msg:
+            busy = True
             kind, payload = msg
-            if kind == "line":
+            if kind == "telemetry":
+                self._log(payload.raw or format_frame(payload))
+                self._apply_frame(payload)
+                self._snap_prediction(payload)
+                now = time.time()
+                self.history.add_frame(payload, now)
+                if self.drain: self.drain.add("local", payload.timestamp or now, payload.speed, payload.battery)
+            elif kind == "line":
                 self._log(payload)
                 self._handle_line(payload)
+                if payload.startswith("CMD-ACK") and self.estimator.on_ack(payload):
+                    self._apply_prediction()
             elif kind == "status":
                 self._log(payload, error=True)
                 self.status_var.set(f"ESTADO: {payload}")
+            elif kind == "cmd":
+                self._on_cmd_done(payload)
+            elif kind == "link":
+                self._log(payload)
+                self.status_var.set(f"ESTADO: {payload}")
             msg = self.client.get_message_nowait()
+        if m: t1 = time.perf_counter(); m.poll_drain_seconds.observe(t1 - t0)
             
         # UI Animation Update
-        self._update_gauge()
-        
-        self.root.after(120, self._poll)
+        if self._render():
+            busy = True
+        if m: t2 = time.perf_counter(); m.poll_draw_seconds.observe(t2 - t1)
+        if self.log_panel.flush():
+            busy = True
+        if m: m.poll_log_seconds.observe(time.perf_counter() - t2)
+        self._draw_history()
+        self._update_drain()
+        if self.estimator.active and time.monotonic() - self._predict_at >= PREDICT_REFRESH:
+            self._apply_prediction()
+
+        # Tkinter no permite despertar el bucle desde el hilo receptor, así
+        # que en reposo el tick no se detiene del todo: se espacia hasta idle_ms.
+        interval = self.render.next_interval(busy)
+        if m: self._poll_due = time.perf_counter() + interval / 1000.0
+        self.root.after(interval, self._poll)
+
+    # ---------------- predicción entre tramas ----------------
+    def _snap_prediction(self, frame):
+        # Trama real: vuelta a la verdad y registro del error de lo que se predijo
+        errors = self.estimator.on_frame(frame)
+        if errors:
+            units = {"speed": " m/s", "heading": "°", "battery": "%"}
+            self._log("Predicción corregida: " + ", ".join(f"{k} Δ{v:.1f}{units[k]}" for k, v in errors.items()))
+        self._set_predicted(frozenset())
+
+    def _apply_prediction(self):
+        self._predict_at = time.monotonic()
+        p = self.estimator.predict(self._predict_at)
+        if not p.predicted and not self._predicted:
+            return   # nada que extrapolar: no se ensucia el RenderScheduler
+        # Mismo marcado de widgets que una trama, sin contar como trama recibida
+        self.render.offer_predicted(TelemetryFrame(p.speed, p.battery, p.heading, p.cardinal, None, ""))
+        self._set_predicted(frozenset(p.predicted))
+
+    def _set_predicted(self, fields):
+        # Valores predichos en púrpura y con "≈"; confirmados en el color normal
+        if fields == self._predicted:
+            return
+        self._predicted = fields
+        speed_color = self.accent2 if "speed" in fields else self.accent
+        self.gauge_canvas.itemconfig(self.gauge_pointer, fill=speed_color)
+        self.gauge_canvas.itemconfig(self.gauge_mark, state=tk.NORMAL if fields else tk.HIDDEN)
+        self.speed_text.set(fg=speed_color)
+        heading_color = self.accent2 if "heading" in fields else self.accent
+        self.dir_canvas.itemconfig(self.needle, fill=heading_color)
+        self.dir_text.set(fg=heading_color)
+        self._update_battery_canvas()
+
+    def _set_history_window(self, seconds):
+        self.history_window = float(seconds)
+        self._draw_history(force=True)
+
+    def _draw_history(self, force=False):
+        # Como mucho una vez por segundo y sólo si hay muestras nuevas: el coste
+        # de una consulta está acotado por MAX_POINTS, no por lo que abarque la ventana
+        now = time.monotonic()
+        key = (self.history.version, self.history_window)
+        if not force and (key == self._history_drawn or now - self._history_at < 1.0):
+            return
+        self._history_drawn, self._history_at = key, now
+        for field, sp in self.sparklines.items():
+            sp.draw(self.history.window(field, self.history_window, sp.width), self.history.series[field].last)
+
+    # ---------------- métricas ----------------
+    def enable_metrics(self, metrics=None):
+        """Activa la medición en la app y en su client (queda activa hasta disable_metrics)."""
+        if metrics is None:
+            metrics = self.metrics or client_metrics(self.client if hasattr(self.client, "q") else None,
+                                                     render=self.render)
+        self.metrics = metrics
+        if hasattr(self.client, "metrics"):
+            self.client.metrics = metrics
+        return metrics
+
+    def disable_metrics(self):
+        self.metrics = self._poll_due = None
+        if hasattr(self.client, "metrics"):
+            self.client.metrics = None
+
+    def toggle_metrics_overlay(self, event=None):
+        if self.metrics_overlay is not None:
+            self.metrics_overlay.destroy(); self.metrics_overlay = None
+            if not self.metrics_exported:
+                self.disable_metrics()   # sin exportador: apagado vuelve a coste cero
+            return
+        self.enable_metrics()
+        self.metrics_overlay = tk.Label(self.root, bg=self.shadow, fg=self.accent, font=self.font_mono,
+                                        justify=tk.LEFT, anchor="nw", padx=8, pady=6)
+        self.metrics_overlay.place(relx=1.0, rely=0.0, x=-20, y=20, anchor="ne")
+        self._overlay_prev = (time.monotonic(), self.metrics.rx_lines_total.value, self.metrics.rx_bytes_total.value)
+        self._refresh_overlay()
+
+    def _refresh_overlay(self):
+        if self.metrics_overlay is None or self.closed:
+            return
+        m = self.metrics
+        now = time.monotonic()
+        t_prev, lines_prev, bytes_prev = self._overlay_prev
+        dt = max(1e-6, now - t_prev)
+        lines, nbytes = m.rx_lines_total.value, m.rx_bytes_total.value
+        self._overlay_prev = (now, lines, nbytes)
+        ms = lambda h, p: h.percentile(p) * 1e3
+        rows = [
+            "[ MÉTRICAS ]  F3 oculta",
+            f"rx     {(lines - lines_prev) / dt:>9,.0f} lín/s {(nbytes - bytes_prev) / dt / 1024:>8,.1f} KiB/s",
+            f"total  {lines:>9,} lín   {nbytes / 1048576:>8,.1f} MiB",
+            f"lote rx      p50<={ms(m.rx_batch_seconds, 50):.3f} p99<={ms(m.rx_batch_seconds, 99):.3f} ms",
+            f"cola         {m.queue_depth.get()} (máx {m.queue_high_water.get()}) colapsadas {m.queue_collapsed.get()}" if "queue_collapsed" in m.items
+            else f"cola         {m.queue_depth.get()}" if "queue_depth" in m.items else "cola         -",
+            f"enlace       {m.link_recovery_seconds.count} recuperaciones, última {m.link_recovery_seconds.last:.2f} s "
+            f"p99<={m.link_recovery_seconds.percentile(99):g} s",
+            f"render       {m.render_frames_in.get()} tramas, coalescidas {m.render_frames_coalesced.get()}, "
+            f"redibujados evitados {m.render_redraws_skipped.get()}" if "render_frames_in" in m.items
+            else "render       -",
+            f"_poll drain  p50<={ms(m.poll_drain_seconds, 50):.3f} p99<={ms(m.poll_drain_seconds, 99):.3f} ms",
+            f"_poll log    p50<={ms(m.poll_log_seconds, 50):.3f} p99<={ms(m.poll_log_seconds, 99):.3f} ms",
+            f"_poll draw   p50<={ms(m.poll_draw_seconds, 50):.3f} p99<={ms(m.poll_draw_seconds, 99):.3f} ms",
+            f"lag Tk       p50<={ms(m.tk_lag_seconds, 50):.3f} p99<={ms(m.tk_lag_seconds, 99):.3f} ms",
+        ]
+        err = self.estimator.report()
+        rows.append("predicción   " + "  ".join(f"{k[:3]} n={e['n']} media={e['mean']:.1f}" for k, e in err.items()))
+        self.metrics_overlay.config(text="\n".join(rows))
+        self.root.after(1000, self._refresh_overlay)
 
 
     # (Rest of helper methods: toggle_connect, _disconnect, _do_auth, _send_cmd_text, _log, _update_battery_canvas, _update_gauge, _shade)
@@ -497,14 +838,28 @@ class FancyClientApp:
         else:
             host = self.ent_host.get().strip(); port = self.ent_port.get().strip()
             if not host or not port.isdigit(): messagebox.showerror("Conexión", "Host o puerto inválido"); return
-            self._log(f"Conectando a {host}:{port}...")
-            try:
-                self.client.connect(host, int(port))
-            except Exception as e:
-                self._log(f"Error conexión: {e}", error=True); messagebox.showerror("Conexión", f"No se pudo conectar: {e}"); return
+            # Conexión, DNS y reconexiones en segundo plano: la ventana no se congela
+            # con un host inalcanzable. SUBSCRIBE OBSERVER sale en cuanto hay enlace.
+            if hasattr(self.client, "connect_async"):
+                self.client.connect_async(host, int(port), role="OBSERVER")
+            else:
+                self.client.connect(host, int(port))   # feeds de flota/replay: ya no bloquean
             self.connected = True
-            self.status_var.set("ESTADO: CONECTADO"); self.btn_connect.config(text="DESCONECTAR")
-            self._send_cmd_text("SUBSCRIBE OBSERVER"); self._log("Suscrito como OBSERVER")
+            self.btn_connect.config(text="DESCONECTAR")
+
+    def attach(self, host, port):
+        """Marca como conectado un dashboard cuyo client ya tiene enlace (flota)."""
+        self.ent_host.delete(0, tk.END); self.ent_host.insert(0, host)
+        self.ent_port.delete(0, tk.END); self.ent_port.insert(0, str(port))
+        self.connected = True
+        self.status_var.set(f"ESTADO: CONECTADO ({host}:{port})"); self.btn_connect.config(text="DESCONECTAR")
+        return self
+
+    def _on_close(self):
+        self.closed = True
+        self.clock.stop()
+        self.client.close()
+        self.root.destroy()
 
     def _disconnect(self):
         self.client.close(); self.connected = False
@@ -518,49 +873,122 @@ class FancyClientApp:
         except Exception as e: self._log(f"Error AUTH: {e}", error=True)
 
     def _send_cmd_text(self, txt):
+        # send_async no bloquea el hilo de Tk; los feeds sin él (flota, replay) ya no bloquean
+        send = getattr(self.client, "send_async", None) or self.client.send_line
         try:
-            self.client.send_line(txt); self._log(f"> {txt}", send=True)
+            send(txt); self._log(f"> {txt}", send=True)
         except Exception as e:
             self._log(f"Fallo enviar: {e}", error=True)
 
+    def _on_cmd_done(self, cmd):
+        if cmd.status == "SEND_ERROR":
+            self._log(f"Fallo enviar: {cmd.reason}", error=True); return
+        if cmd.status == "OK":
+            self._log(f"{cmd.action} OK en {cmd.rtt * 1e3:.1f} ms")
+        elif cmd.status == "ERR":
+            self._log(f"{cmd.action} rechazado ({cmd.reason}) en {cmd.rtt * 1e3:.1f} ms", error=True)
+        else:
+            self._log(f"{cmd.action} sin respuesta (TIMEOUT)", error=True)
+        self._update_rtt()
+
+    def _update_rtt(self):
+        pipe = self.client.commands
+        if not pipe: return
+        rows = []
+        for action, h in sorted(pipe.histograms.items()):
+            rows.append(f"{action[:10]:<10} n={h.n:<4} p50<={h.percentile(50):g} p99<={h.percentile(99):g}")
+        rows.append(f"pendientes: {len(pipe.pending)}")
+        self.rtt_var.set("\n".join(rows))
+
     def _log(self, text, send=False, error=False):
-        self.log_text.config(state=tk.NORMAL)
+        # Se acumula en el LogPanel; el volcado al widget ocurre una vez por tick
         prefix = "CMD " if send else "[SYS]"
-        color = self.accent if not error else self.warning
-        self.log_text.insert("end", f"{prefix} {text}\n")
-        self.log_text.see("end")
-        self.log_text.config(state=tk.DISABLED)
+        tag = "error" if error else ("send" if send else "info")
+        self.log_panel.append(f"{prefix} {text}", tag)
+
+    # ---------------- búsqueda en el registro ----------------
+    def _search(self, event=None):
+        # "CMD-ERR battery_low 7d": con diario se consulta su índice; sin él,
+        # el historial en memoria del LogPanel
+        q = self.search_var.get().strip()
+        if not q:
+            self._clear_search(); return
+        t0 = time.perf_counter()
+        jr = getattr(self.client, "journal", None)
+        if jr is not None:
+            kw = parse_query(q)
+            vehicle = getattr(self.client, "name", None)   # dashboard de flota: sólo su vehículo
+            if vehicle is not None and "vehicle" not in kw:
+                kw["vehicle"] = vehicle
+            jr.flush()   # que entre también lo de los últimos 0.5 s
+            reader = JournalReader(jr.directory)
+            try:
+                found = reader.query(limit=SEARCH_LIMIT, **kw)
+            except (OSError, ValueError, zlib.error) as e:
+                self.status_var.set(f"ESTADO: búsqueda fallida: {e}"); return
+            rows = []
+            for e in found:
+                tag = "send" if e[1] == "out" else ("error" if e[2] in ("CMD-ERR", "AUTH-ERR", "STATUS") else "info")
+                rows.append((format_entry(e), tag))
+            info = f"{len(rows)} registros del diario ({reader.blocks_read} bloques leídos, {reader.blocks_skipped} saltados)"
+        else:
+            found = self.log_panel.search(q.split(), SEARCH_LIMIT)
+            rows = [(time.strftime("%H:%M:%S ", time.localtime(ts)) + text, tag) for ts, tag, text in found]
+            info = f"{len(rows)} entradas en memoria (sin --journal)"
+        self.log_panel.show(rows or [("(sin resultados)", "info")])
+        self.status_var.set(f"ESTADO: «{q}»: {info} en {(time.perf_counter() - t0) * 1e3:.0f} ms — Esc vuelve al vivo")
+
+    def _clear_search(self, event=None):
+        self.search_var.set("")
+        self.log_panel.resume()
+
+    def _export_log(self):
+        path = filedialog.asksaveasfilename(defaultextension=".log", filetypes=[("Log", "*.log"), ("Texto", "*.txt")])
+        if not path: return
+        try:
+            n = self.log_panel.export(path)
+        except OSError as e:
+            messagebox.showerror("Registro", f"No se pudo exportar: {e}"); return
+        self.status_var.set(f"ESTADO: {n} entradas exportadas a {path}")
 
     def _update_battery_canvas(self):
         level = max(0, min(100, self.battery))
-        top = 12 + (1 - level/100.0) * (160 - 12)
-        self.batt_canvas.coords(self.batt_fill, 22, top, 48, 158)
+        top = round(12 + (1 - level/100.0) * (160 - 12))
         if level < 20: color = self.warning
         elif level < 50: color = self.accent2
         else: color = self.accent
-        self.batt_canvas.itemconfig(self.batt_fill, fill=color)
-        self.batt_label.config(text=f"{level}%", fg=color)
+        # Sólo se toca el Canvas si cambia un píxel o el color
+        if (top, color) != self._batt_drawn:
+            if top != (self._batt_drawn or (None,))[0]:
+                self.batt_canvas.coords(self.batt_fill, 22, top, 48, 158)
+            self.batt_canvas.itemconfig(self.batt_fill, fill=color)
+            self._batt_drawn = (top, color)
+        self.batt_text.set(text=f"≈{level}%" if "battery" in self._predicted else f"{level}%", fg=color)
+
+    def _update_drain(self):
+        # Lote incremental cada DRAIN_REFRESH s; sólo se tocan los widgets si cambió el texto
+        now = time.monotonic()
+        if self.drain is None:
+            if not self._drain_at:
+                self._drain_at = now; self.batt_info.config(text="autonomía: n/d (sin numpy)")
+            return
+        if now - self._drain_at < DRAIN_REFRESH or not self.drain.update():
+            return
+        self._drain_at = now
+        est = self.drain.estimate("local")
+        text = format_estimate(est)
+        anomaly = bool(est and est["anomaly"])
+        if anomaly:
+            text += "\n⚠ consumo anómalo"
+        self.batt_info.config(text=text, fg=self.warning if anomaly or (est and est["seconds"] == 0) else self.dim)
 
     def _update_gauge(self):
+        # Fija el objetivo de la aguja (la anima self.clock); True mientras se mueva
         target = max(0.0, min(30.0, self.speed_val))
-        target_ang = (target / 30.0) * 180.0
-        coords = self.gauge_canvas.coords(self.gauge_pointer)
-        cx, cy = 190, 180; r = 120
-        if coords and len(coords) >= 4:
-            x2, y2 = coords[2], coords[3]
-            dx, dy = x2 - cx, cy - y2
-            cur_ang = math.degrees(math.atan2(dy, dx))
-            cur_ang = max(0.0, min(180.0, cur_ang))
-        else: cur_ang = 0.0
-        
-        new_ang = cur_ang + (target_ang - cur_ang) * 0.15
-        
-        # Map 0-180 (left-to-right) to 180-0 (math angle)
-        ang_rad = math.radians(180 - new_ang)
-        x2 = cx + math.cos(ang_rad) * (r - 18)
-        y2 = cy - math.sin(ang_rad) * (r - 18)
-        self.gauge_canvas.coords(self.gauge_pointer, cx, cy, x2, y2)
-        self.lbl_speed_big.config(text=str(int(self.speed_val)))
+        moving = self.gauge.set_target((target / 30.0) * 180.0)
+        self.clock.wake()
+        self.speed_text.set(text=str(int(self.speed_val)))
+        return moving
 
     def _shade(self, hexcol, delta):
         hexcol = hexcol.lstrip('#')
@@ -568,7 +996,120 @@ class FancyClientApp:
         r = min(255, max(0, r + delta)); g = min(255, max(0, g + delta)); b = min(255, max(0, b + delta))
         return f"#{r:02x}{g:02x}{b:02x}"
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Centro de Control Táctico — cliente de telemetría")
+    parser.add_argument("endpoint", nargs="?", help="host:puerto (GUI: rellena el formulario)")
+    parser.add_argument("--fleet", metavar="FICHERO", help="modo flota: lista de endpoints host:puerto [nombre]")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="procesos de ingesta en modo flota (0 = un solo proceso asyncio)")
+    parser.add_argument("--headless", action="store_true", help="sin GUI: vuelca la telemetría a stdout/fichero")
+    parser.add_argument("--user", help="usuario para AUTH (headless)")
+    parser.add_argument("--password", default=os.environ.get("VEHICULO_PASSWORD"),
+                        help="contraseña para AUTH (por defecto $VEHICULO_PASSWORD)")
+    parser.add_argument("--role", default="OBSERVER", choices=("OBSERVER", "ADMIN"), help="rol de SUBSCRIBE")
+    parser.add_argument("--wire", default="text", choices=WIRE_MODES,
+                        help="formato de TELEMETRY pedido en SUBSCRIBE (bin/delta: binario compacto, ver wire.py)")
+    parser.add_argument("--format", default="json", choices=("json", "csv"), help="formato de salida headless")
+    parser.add_argument("--output", metavar="FICHERO", help="fichero de salida (por defecto stdout)")
+    parser.add_argument("--count", type=int, help="terminar tras N tramas")
+    parser.add_argument("--duration", type=float, help="terminar tras N segundos")
+    parser.add_argument("--record", metavar="DIR", help="grabar telemetría y eventos en segmentos binarios")
+    parser.add_argument("--journal", metavar="DIR",
+                        help="diario comprimido e indexado de todo lo enviado y recibido (búsqueda en el registro)")
+    parser.add_argument("--replay", metavar="DIR", help="reproducir una grabación en el dashboard")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="1, 10, 100... (0 = lo más rápido posible)")
+    parser.add_argument("--bench-render", action="store_true",
+                        help="con --replay: medir tramas/s del camino de dibujo y salir")
+    parser.add_argument("--metrics-file", metavar="FICHERO",
+                        help="escribir métricas en formato Prometheus cada 5 s (GUI y headless)")
+    parser.add_argument("--metrics-port", type=int, metavar="PUERTO",
+                        help="servir métricas Prometheus en http://127.0.0.1:PUERTO/metrics")
+    args = parser.parse_args(argv)
+    exporters = []
+
+    def export_metrics(metrics):
+        if args.metrics_file:
+            exporters.append(TextfileExporter(metrics, args.metrics_file))
+        if args.metrics_port:
+            exporters.append(HttpExporter(metrics, args.metrics_port))
+        return metrics
+
+    def stop_exporters():
+        for e in exporters:
+            e.stop()
+
+    if args.headless and args.fleet:
+        import headless
+        from fleet import load_endpoints
+        from ingest import ShardedIngest
+        ingest = ShardedIngest(load_endpoints(args.fleet), args.workers or None,
+                               args.user, args.password, args.role)
+        return headless.run_fleet(ingest, fmt=args.format, output=args.output,
+                                  count=args.count, duration=args.duration)
+
+    if args.headless:
+        import headless
+        host, _, port = (args.endpoint or "").rpartition(":")
+        if not host or not port.isdigit():
+            parser.error("--headless requiere host:puerto")
+        recorder = Recorder(args.record) if args.record else None
+        journal = Journal(args.journal) if args.journal else None
+        client = TelemetryClient(recorder, journal, args.wire)
+        if args.metrics_file or args.metrics_port:
+            client.metrics = export_metrics(client_metrics(client, gui=False))
+        try:
+            return headless.run(client, host, int(port), user=args.user, password=args.password,
+                                role=args.role, fmt=args.format, output=args.output,
+                                count=args.count, duration=args.duration)
+        finally:
+            if recorder: recorder.close()
+            if journal: journal.close()
+            stop_exporters()
+
+    _load_tk()
     root = tk.Tk()
-    app = FancyClientApp(root)
+    recorder = None
+    journal = Journal(args.journal) if args.journal and not args.replay else None
+    if args.fleet:
+        from fleet import FleetApp, load_endpoints
+        endpoints = load_endpoints(args.fleet)
+        FleetApp(root, endpoints,
+                 lambda top, feed, host, port: FancyClientApp(top, feed).attach(host, port),
+                 record_dir=args.record, journal=journal, workers=args.workers,
+                 user=args.user, password=args.password)
+    elif args.replay:
+        from replay import ReplayClient, ReplayControls, benchmark_render
+        if args.bench_render:
+            app = FancyClientApp(root)
+            root.update()
+            res = benchmark_render(app, args.replay)
+            print(f"{res.pop('frames')} tramas reproducidas")
+            for name, fps in res.items():
+                print(f"  {name:<24} {fps:>12,.0f} tramas/s")
+            root.destroy()
+            return 0
+        replay = ReplayClient(args.replay, args.replay_speed)
+        app = FancyClientApp(root, replay)
+        app.connected = True
+        app.status_var.set(f"ESTADO: REPRODUCIENDO {args.replay}"); app.btn_connect.config(text="DESCONECTAR")
+        ReplayControls(root, replay)
+        replay.connect()
+    else:
+        recorder = Recorder(args.record) if args.record else None
+        app = FancyClientApp(root, TelemetryClient(recorder, journal, args.wire))
+        if args.metrics_file or args.metrics_port:
+            export_metrics(app.enable_metrics())
+            app.metrics_exported = True
+        if args.endpoint:
+            host, _, port = args.endpoint.rpartition(":")
+            app.ent_host.delete(0, tk.END); app.ent_host.insert(0, host)
+            app.ent_port.delete(0, tk.END); app.ent_port.insert(0, port)
     root.mainloop()
+    if recorder: recorder.close()
+    if journal: journal.close()
+    stop_exporters()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
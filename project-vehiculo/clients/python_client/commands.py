@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+commands.py - Envío de comandos sin bloquear y correlación con sus respuestas.
+Las líneas salientes van a una cola que vacía un hilo escritor (varias por
+sendall). Cada "CMD ..." queda pendiente hasta su CMD-ACK / CMD-ERR (o un ERR
+sin acción), que se empareja por acción y en orden de envío; si no llega a
+tiempo expira. Los
+RTT se acumulan en un histograma por acción.
+"""
+
+import bisect
+import collections
+import queue
+import threading
+import time
+
+DEFAULT_TIMEOUT = 5.0
+# Límites superiores de los buckets del histograma (ms); el último es +inf
+RTT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def action_of(line):
+    """"CMD SPEED UP" -> "SPEED_UP" (misma normalización que process_cmd en server.c)."""
+    return "_".join(line.split()[1:]).upper()
+
+
+def reply_action(line):
+    """Acción de un "CMD-ACK action=X ..." / "CMD-ERR action=X ..."; None si no la trae."""
+    for tok in line.split()[1:]:
+        if tok.startswith("action="):
+            return tok[7:]
+    return None
+
+
+class Command:
+    __slots__ = ("line", "action", "submitted", "sent", "deadline", "status", "reason", "rtt")
+
+    def __init__(self, line, timeout):
+        self.line = line
+        self.action = action_of(line) if line.startswith("CMD") else None
+        self.submitted = time.monotonic()
+        self.sent = None
+        self.deadline = self.submitted + timeout
+        self.status = "PENDIENTE"   # OK | ERR | TIMEOUT | SEND_ERROR
+        self.reason = None
+        self.rtt = None             # segundos desde que se escribió en el socket
+
+
+class RttHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(RTT_BUCKETS_MS) + 1)
+        self.n = 0
+        self.total = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(RTT_BUCKETS_MS, ms)] += 1
+        self.n += 1
+        self.total += ms
+
+    def percentile(self, p):
+        """Límite superior del bucket que contiene el percentil p (None si vacío)."""
+        if not self.n:
+            return None
+        target = self.n * p / 100.0
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return RTT_BUCKETS_MS[i] if i < len(RTT_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def mean(self):
+        return self.total / self.n if self.n else None
+
+
+class CommandPipeline:
+    """send_fn(bytes) es el envío bloqueante real (sock.sendall); notify(cmd) se
+    llama desde el hilo escritor/receptor cuando un comando termina."""
+
+    def __init__(self, send_fn, notify, timeout=DEFAULT_TIMEOUT):
+        self.send_fn = send_fn
+        self.notify = notify
+        self.timeout = timeout
+        self.outbox = queue.Queue()
+        self.pending = collections.OrderedDict()   # id(cmd) -> cmd, en orden de envío
+        self.lock = threading.Lock()
+        self.histograms = collections.defaultdict(RttHistogram)
+        self.running = True
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def submit(self, line):
+        """Encola una línea; nunca bloquea. Devuelve el Command (seguible si es CMD)."""
+        cmd = Command(line, self.timeout)
+        self.outbox.put(cmd)
+        return cmd
+
+    def stop(self, reason=None):
+        """Detiene el escritor; con `reason`, los CMD aún sin respuesta se dan por fallidos."""
+        self.running = False
+        self.outbox.put(None)
+        if reason is None:
+            return
+        with self.lock:
+            lost = list(self.pending.values())
+            self.pending.clear()
+        for cmd in lost:
+            cmd.status = "SEND_ERROR"
+            cmd.reason = reason
+            self.notify(cmd)
+
+    def on_reply(self, line):
+        """Llamado por el receptor con cada CMD-ACK / CMD-ERR / ERR. Devuelve el
+        Command emparejado o None."""
+        action = reply_action(line)
+        now = time.monotonic()
+        with self.lock:
+            match = None
+            for key, cmd in self.pending.items():
+                if cmd.sent is not None and (action is None or cmd.action == action):
+                    match = key
+                    break
+            if match is None:
+                return None
+            cmd = self.pending.pop(match)
+        cmd.rtt = now - cmd.sent
+        if line.startswith("CMD-ACK"):
+            cmd.status = "OK"
+        else:
+            cmd.status = "ERR"
+            for tok in line.split()[1:]:
+                if tok.startswith("reason="):
+                    cmd.reason = tok[7:]
+            if cmd.reason is None:
+                cmd.reason = line
+        self.histograms[cmd.action].add(cmd.rtt * 1e3)
+        self.notify(cmd)
+        return cmd
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            for key, cmd in list(self.pending.items()):
+                if cmd.deadline <= now:
+                    expired.append(self.pending.pop(key))
+        for cmd in expired:
+            cmd.status = "TIMEOUT"
+            self.notify(cmd)
+
+    def _writer(self):
+        while self.running:
+            try:
+                first = self.outbox.get(timeout=0.1)
+            except queue.Empty:
+                self._expire()
+                continue
+            if first is None:
+                break
+            batch = [first]
+            # Pipelining: todo lo que ya esté en cola sale en un único sendall
+            while True:
+                try:
+                    nxt = self.outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self.running = False
+                    break
+                batch.append(nxt)
+            tracked = [c for c in batch if c.action]
+            now = time.monotonic()
+            with self.lock:
+                for c in tracked:
+                    c.sent = now
+                    c.deadline = now + self.timeout
+                    self.pending[id(c)] = c
+            data = "".join(c.line if c.line.endswith("\n") else c.line + "\n" for c in batch)
+            try:
+                self.send_fn(data.encode("utf-8"))
+            except Exception as e:
+                with self.lock:
+                    for c in tracked:
+                        self.pending.pop(id(c), None)
+                for c in batch:
+                    c.status = "SEND_ERROR"
+                    c.reason = str(e)
+                    self.notify(c)
+            self._expire()
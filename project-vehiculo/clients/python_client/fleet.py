@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fleet.py - Modo flota: una tabla con una fila por vehículo.
+Carga una lista de endpoints, mantiene una conexión AsyncTelemetryClient por
+servidor en un único bucle asyncio y actualiza sólo las filas que cambiaron.
+Doble clic en una fila abre el dashboard detallado de ese vehículo, alimentado
+por la misma conexión. Ejecutar: python3 client.py --fleet endpoints.txt
+tkinter se importa al crear FleetApp: load_endpoints y FleetPool sirven sin Tk
+(modo headless --fleet).
+"""
+
+import os
+import time
+
+from aioclient import AsyncTelemetryClient, EventLoopThread, TelemetryBridge, watch
+from battery import DrainAnalytics, format_estimate
+from channel import Channel
+from recorder import BackgroundWriter, Recorder
+from render import RenderScheduler
+
+MAX_DRAIN = 20_000      # mensajes máximos procesados por tick
+AGE_REFRESH_S = 1.0     # la columna "visto hace" se refresca una vez por segundo
+
+tk = ttk = None   # ver _load_tk
+
+
+def _load_tk():
+    global tk, ttk
+    if tk is None:
+        import tkinter as tk
+        from tkinter import ttk
+
+
+def load_endpoints(path):
+    """Lee "host:puerto [nombre]" por línea; admite comentarios con #."""
+    endpoints = []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            host, _, port = parts[0].rpartition(":")
+            if not host or not port.isdigit():
+                raise ValueError(f"Endpoint inválido: {parts[0]!r}")
+            name = parts[1] if len(parts) > 1 else parts[0]
+            endpoints.append((name, host, int(port)))
+    return endpoints
+
+
+class VehicleRow:
+    __slots__ = ("speed", "battery", "heading", "cardinal", "last_seen", "status", "autonomy")
+
+    def __init__(self):
+        self.speed = None
+        self.battery = None
+        self.heading = None
+        self.cardinal = None
+        self.last_seen = None   # time.monotonic() de la última trama
+        self.status = "CONECTANDO"
+        self.autonomy = "--"
+
+
+class VehicleFeed:
+    """Adaptador con la interfaz de TelemetryClient que el dashboard detallado
+    usa (get_message_nowait, send_line, close) sobre la conexión de la flota."""
+
+    def __init__(self, pool, name):
+        self.pool = pool
+        self.name = name
+        self.q = Channel()   # acotado: sólo colapsa TELEMETRY (antes un deque con maxlen)
+
+    @property
+    def journal(self):
+        return self.pool.journal
+
+    def get_message_nowait(self):
+        return self.q.get_nowait()
+
+    def send_line(self, line):
+        client = self.pool.clients[self.name]
+        if not client.connected:
+            raise RuntimeError("No conectado")
+        self.pool.loop.submit(client.send_line(line))
+
+    def connect(self, host, port, timeout=5.0):
+        # La conexión ya la mantiene el pool; basta con volver a escuchar
+        self.pool.feeds[self.name] = self
+
+    def close(self):
+        self.pool.feeds.pop(self.name, None)
+
+
+class FleetPool:
+    """Conexiones de la flota sobre un EventLoopThread compartido."""
+
+    def __init__(self, endpoints, record_dir=None, journal=None, user=None, password=None):
+        self.endpoints = {name: (host, port) for name, host, port in endpoints}
+        self.bridge = TelemetryBridge()
+        self.loop = EventLoopThread()
+        self.clients = {}
+        self.feeds = {}   # nombre -> VehicleFeed de dashboards abiertos
+        self.record_dir = record_dir
+        self.rec_writer = BackgroundWriter() if record_dir else None   # un hilo para toda la flota
+        self.recorders = []
+        self.journal = journal   # journal.Journal único para toda la flota
+        self.user, self.password = user, password
+
+    def start(self):
+        self.loop.start()
+        for name, (host, port) in self.endpoints.items():
+            rec = None
+            if self.record_dir:
+                rec = Recorder(os.path.join(self.record_dir, name), writer=self.rec_writer)
+                self.recorders.append(rec)
+            c = AsyncTelemetryClient(host, port, self.bridge, name=name, recorder=rec, journal=self.journal)
+            self.clients[name] = c
+            self.loop.submit(watch(c, "OBSERVER", self.user, self.password))
+
+    def stop(self):
+        # Cancelar las tareas watch() cierra cada conexión en su finally
+        self.loop.stop()
+        for rec in self.recorders:
+            rec.close()
+        if self.rec_writer:
+            self.rec_writer.stop()
+
+    def open_feed(self, name):
+        feed = VehicleFeed(self, name)
+        self.feeds[name] = feed
+        return feed
+
+
+class FleetApp:
+    COLUMNS = (("speed", "VEL (m/s)", 90), ("battery", "BATERÍA", 80),
+               ("heading", "RUMBO", 90), ("autonomy", "AUTONOMÍA", 170), ("age", "VISTO HACE", 100),
+               ("status", "ESTADO", 140))
+
+    def __init__(self, root, endpoints, dashboard_factory, record_dir=None, journal=None,
+                 workers=0, user=None, password=None):
+        _load_tk()
+        self.root = root
+        self.dashboard_factory = dashboard_factory   # (toplevel, feed, host, port) -> app
+        root.title(f"Centro de Control Táctico — Flota ({len(endpoints)} vehículos)")
+        root.geometry("930x600")
+
+        if workers:
+            from ingest import ShardedIngest   # N procesos + tabla compartida (sin grabación ni diario)
+            self.pool = ShardedIngest(endpoints, workers, user, password)
+            root.title(f"Centro de Control Táctico — Flota ({len(endpoints)} vehículos, "
+                       f"{self.pool.workers} procesos de ingesta)")
+        else:
+            self.pool = FleetPool(endpoints, record_dir, journal, user, password)
+        self.rows = {name: VehicleRow() for name, _, _ in endpoints}
+        self.dirty = set(self.rows)
+        self.render = RenderScheduler(target_fps=10, idle_ms=int(AGE_REFRESH_S * 1000))
+        self._last_age_refresh = 0.0
+        self.messages_in = 0
+        try:
+            self.drain = DrainAnalytics()   # una sola instancia: la flota entera por lote
+        except RuntimeError:
+            self.drain = None
+            for row in self.rows.values(): row.autonomy = "n/d (sin numpy)"
+
+        self._build_ui()
+        self.pool.start()
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(self.render.frame_ms, self._poll)
+
+    def _build_ui(self):
+        frame = tk.Frame(self.root, bg="#071018")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        cols = [c for c, _, _ in self.COLUMNS]
+        self.tree = ttk.Treeview(frame, columns=cols, show="tree headings")
+        self.tree.heading("#0", text="VEHÍCULO")
+        self.tree.column("#0", width=160)
+        for col, title, width in self.COLUMNS:
+            self.tree.heading(col, text=title)
+            self.tree.column(col, width=width, anchor="center")
+        sb = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=sb.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        sb.pack(side=tk.RIGHT, fill=tk.Y)
+        for name in self.rows:
+            self.tree.insert("", "end", iid=name, text=name, values=("--", "--", "--", "--", "--", "CONECTANDO"))
+        self.tree.bind("<Double-1>", self._open_detail)
+
+        self.status_var = tk.StringVar(value="FLOTA: conectando...")
+        tk.Label(self.root, textvariable=self.status_var, anchor="w", bg="#021017", fg="#E6EEF6",
+                 font=("Segoe UI", 9)).pack(side=tk.BOTTOM, fill=tk.X)
+
+    def _apply(self, name, kind, payload):
+        row = self.rows.get(name)
+        if row is None:
+            return
+        if kind == "telemetry":
+            if payload.speed is not None: row.speed = payload.speed
+            if payload.battery is not None: row.battery = payload.battery
+            if payload.heading is not None: row.heading = payload.heading
+            if payload.cardinal is not None: row.cardinal = payload.cardinal
+            row.last_seen = time.monotonic()
+            row.status = "OK"
+            if self.drain: self.drain.add(name, payload.timestamp or time.time(), row.speed, row.battery)
+        elif kind == "status":
+            row.status = payload
+        elif payload.startswith("SUBSCRIBE-OK"):
+            row.status = "SUSCRITO"
+        self.dirty.add(name)
+        feed = self.pool.feeds.get(name)
+        if feed is not None:
+            feed.q.put((kind, payload))
+
+    def _row_values(self, row, now):
+        age = "--" if row.last_seen is None else f"{int(now - row.last_seen)} s"
+        return (
+            "--" if row.speed is None else f"{row.speed:.1f}",
+            "--" if row.battery is None else f"{row.battery}%",
+            "--" if row.heading is None else f"{row.cardinal or ''} {row.heading:.0f}°".strip(),
+            row.autonomy,
+            age,
+            row.status,
+        )
+
+    def _poll(self):
+        msgs = self.pool.bridge.drain(MAX_DRAIN)
+        for name, kind, payload in msgs:
+            self._apply(name, kind, payload)
+        self.messages_in += len(msgs)
+
+        now = time.monotonic()
+        if now - self._last_age_refresh >= AGE_REFRESH_S:
+            # Todas las edades cambian a la vez: un refresco completo por segundo
+            self._last_age_refresh = now
+            self.dirty.update(self.rows)
+            self._refresh_drain()
+            online = sum(1 for r in self.rows.values() if r.status == "OK")
+            self.status_var.set(f"FLOTA: {online}/{len(self.rows)} con telemetría — "
+                                f"{self.messages_in} mensajes")
+        for name in self.dirty:
+            self.tree.item(name, values=self._row_values(self.rows[name], now))
+        busy = bool(self.dirty) or len(self.pool.bridge) > 0
+        self.dirty.clear()
+        self.root.after(self.render.next_interval(busy), self._poll)
+
+    def _refresh_drain(self):
+        if not self.drain or not self.drain.update():
+            return
+        _, secs, meters, anomaly = self.drain.estimate_all()
+        for name, vid in self.drain.index.items():
+            text = format_estimate({"seconds": secs[vid], "meters": meters[vid]})
+            self.rows[name].autonomy = text + (" ⚠" if anomaly[vid] else "")
+
+    def _open_detail(self, event):
+        name = self.tree.identify_row(event.y)
+        if not name:
+            return
+        host, port = self.pool.endpoints[name]
+        feed = self.pool.open_feed(name)
+        self.dashboard_factory(tk.Toplevel(self.root), feed, host, port)
+
+    def _on_close(self):
+        self.pool.stop()
+        self.root.destroy()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+framing.py - Separación de líneas sin copias para el protocolo de texto.
+Un bytearray preasignado se llena con recv_into; las líneas se localizan con
+un offset de búsqueda y se decodifican directamente desde un memoryview, de
+modo que cada byte recibido se copia como mucho una vez.
+"""
+
+CAPACITY = 128 * 1024   # tamaño del buffer preasignado
+MAX_LINE = 64 * 1024    # línea más larga aceptada (debe ser < CAPACITY)
+
+
+class LineFramer:
+    def __init__(self, capacity=CAPACITY, max_line=MAX_LINE):
+        if max_line >= capacity:
+            raise ValueError("max_line debe ser menor que capacity")
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+        self.max_line = max_line
+        self.start = 0        # inicio de la línea pendiente
+        self.end = 0          # fin de los datos válidos
+        self.scan = 0         # hasta dónde ya se buscó '\n'
+        self.discarding = False
+        self.oversized = 0    # líneas descartadas por exceder max_line
+
+    def recv_from(self, sock):
+        """Lee del socket directamente al buffer. Devuelve bytes leídos (0 = EOF)."""
+        if self.end == len(self.buf):
+            self._compact()
+        n = sock.recv_into(self.view[self.end:])
+        self.end += n
+        return n
+
+    def feed(self, data):
+        """Copia bytes ya recibidos (p. ej. desde asyncio) y devuelve las líneas completas."""
+        data = memoryview(data)
+        out = []
+        while data:
+            if self.end == len(self.buf):
+                self._compact()
+            n = min(len(data), len(self.buf) - self.end)
+            self.view[self.end:self.end + n] = data[:n]
+            self.end += n
+            data = data[n:]
+            if data:
+                out.extend(self.lines())
+        out.extend(self.lines())
+        return out
+
+    def lines(self):
+        """Devuelve la lista de líneas completas del buffer (str, sin espacios extremos)."""
+        buf, view, end = self.buf, self.view, self.end
+        start, scan = self.start, self.scan
+        out = []
+        while True:
+            nl = buf.find(b"\n", scan, end)
+            if nl < 0:
+                break
+            if self.discarding:
+                self.discarding = False
+            else:
+                try:
+                    out.append(str(view[start:nl], "utf-8").strip())
+                except UnicodeDecodeError:
+                    pass
+            start = scan = nl + 1
+        if start == end:
+            start = end = 0
+        elif end - start > self.max_line:
+            # Línea demasiado larga: se descarta hasta el próximo '\n'
+            if not self.discarding:
+                self.oversized += 1
+            self.discarding = True
+            start = end = 0
+        self.start, self.end = start, end
+        self.scan = end
+        return out
+
+    def _compact(self):
+        # Mueve la línea parcial al inicio; como mucho max_line bytes.
+        pending = self.end - self.start
+        if pending > self.max_line:
+            if not self.discarding:
+                self.oversized += 1
+            self.discarding = True
+            self.start = self.scan = self.end = 0
+            return
+        self.view[:pending] = self.view[self.start:self.end]
+        self.scan -= self.start
+        self.start, self.end = 0, pending
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gauges.py - Capa de dibujo con estado retenido para las agujas del dashboard.
+El ángulo mostrado y el objetivo viven en Python (nunca se leen coords() del
+Canvas). Los extremos de cada aguja salen de una tabla precalculada en
+pasos de 1/ANGLE_STEPS grados, redondeados a píxel, y sólo se llama a
+coords() cuando el píxel cambia. La animación la mueve un FrameClock a 60 FPS
+que sólo está programado mientras alguna aguja se mueve.
+"""
+
+import functools
+import math
+import time
+
+ANGLE_STEPS = 4      # entradas de tabla por grado
+EASE_TAU = 0.25      # s: constante de tiempo del acercamiento exponencial al objetivo
+SETTLE_DEG = 0.1     # por debajo de esta distancia la aguja se da por llegada
+FPS = 60
+
+
+@functools.lru_cache(maxsize=None)
+def needle_table(cx, cy, length, span, origin, clockwise):
+    """Extremos (x, y) en píxeles para 0..span grados. `origin` es el ángulo
+    matemático del valor 0 y `clockwise` el sentido en que crece el valor."""
+    sign = -1 if clockwise else 1
+    pts = []
+    for i in range(span * ANGLE_STEPS + 1):
+        a = math.radians(origin + sign * i / ANGLE_STEPS)
+        pts.append((round(cx + math.cos(a) * length), round(cy - math.sin(a) * length)))
+    return tuple(pts)
+
+
+@functools.lru_cache(maxsize=None)
+def dial_ticks(cx, cy, radius, max_value, step):
+    """Marcas y etiquetas del velocímetro: [(x1, y1, x2, y2, xt, yt, valor)]."""
+    out = []
+    for v in range(0, max_value + 1, step):
+        a = math.radians(180 - v / max_value * 180.0)
+        c, s = math.cos(a), math.sin(a)
+        out.append((cx + c * (radius - 18), cy - s * (radius - 18), cx + c * (radius - 8), cy - s * (radius - 8),
+                    cx + c * (radius - 30), cy - s * (radius - 30), v))
+    return tuple(out)
+
+
+class Needle:
+    """Aguja de un Canvas. wrap=True para brújula (camino más corto, módulo 360)."""
+
+    def __init__(self, canvas, item, cx, cy, length, span, origin, clockwise, wrap=False, tau=EASE_TAU):
+        self.canvas, self.item = canvas, item
+        self.cx, self.cy = cx, cy
+        self.table = needle_table(cx, cy, length, span, origin, clockwise)
+        self.span, self.wrap, self.tau = span, wrap, tau
+        self.value = self.target = 0.0
+        self.last_tick = None
+        self.drawn = None
+        self.coords_calls = 0
+        self.draw()
+
+    @property
+    def moving(self):
+        return self.value != self.target
+
+    def set_target(self, deg):
+        if self.wrap:
+            # Objetivo equivalente más cercano al valor actual (p. ej. 350° -> 10° gira 20°)
+            deg = self.value + ((deg - self.value + 180.0) % 360.0 - 180.0)
+        else:
+            deg = min(float(self.span), max(0.0, deg))
+        if deg != self.target:
+            if not self.moving:
+                self.last_tick = time.monotonic()
+            self.target = deg
+        return self.moving
+
+    def tick(self, now):
+        """Avanza la animación según el tiempo real transcurrido; True si sigue moviéndose."""
+        if not self.moving:
+            return False
+        dt = now - (self.last_tick or now)
+        self.last_tick = now
+        self.value += (self.target - self.value) * (1.0 - math.exp(-dt / self.tau))
+        if abs(self.target - self.value) < SETTLE_DEG:
+            self.value = self.target
+        self.draw()
+        return self.moving
+
+    def draw(self):
+        i = int(round(self.value * ANGLE_STEPS))
+        i = i % (self.span * ANGLE_STEPS) if self.wrap else min(len(self.table) - 1, max(0, i))
+        pt = self.table[i]
+        if pt != self.drawn:
+            self.canvas.coords(self.item, self.cx, self.cy, *pt)
+            self.drawn = pt
+            self.coords_calls += 1
+
+
+class Cell:
+    """Un widget Tk al que sólo se le hace config() con las opciones que cambian."""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.state = {}
+        self.config_calls = 0
+
+    def set(self, **options):
+        changed = {k: v for k, v in options.items() if self.state.get(k, self) != v}
+        if changed:
+            self.widget.config(**changed)
+            self.state.update(changed)
+            self.config_calls += 1
+
+
+class FrameClock:
+    """Temporizador after() a `fps` que sólo corre mientras haya agujas en movimiento."""
+
+    def __init__(self, root, needles, fps=FPS):
+        self.root = root
+        self.needles = needles
+        self.frame_ms = max(1, int(round(1000 / fps)))
+        self.scheduled = None
+        self.ticks = 0
+
+    def wake(self):
+        if self.scheduled is None and any(n.moving for n in self.needles):
+            self.scheduled = self.root.after(self.frame_ms, self._tick)
+
+    def _tick(self):
+        self.scheduled = None
+        self.ticks += 1
+        now = time.monotonic()
+        moving = False
+        for n in self.needles:
+            moving |= n.tick(now)
+        if moving:
+            self.scheduled = self.root.after(self.frame_ms, self._tick)
+
+    def stop(self):
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+            self.scheduled = None
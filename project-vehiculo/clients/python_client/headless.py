@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+headless.py - Modo sin GUI: autentica, se suscribe y vuelca la telemetría
+interpretada como JSON lines o CSV a stdout o a un fichero. No importa tkinter.
+Ejecutar: python3 -m client --headless host:puerto [--format csv] [--output f]
+Flota:    python3 -m client --headless --fleet endpoints.txt [--workers N]
+          (una línea por vehículo que cambió, leída de la tabla compartida)
+"""
+
+import csv
+import json
+import sys
+import time
+
+FIELDS = ("timestamp", "speed", "battery", "heading", "cardinal")
+FLEET_FIELDS = ("vehicle",) + FIELDS + ("status", "frames", "roll_avg", "roll_min", "roll_max")
+FLEET_POLL = 0.5   # s entre lecturas de la tabla compartida
+
+
+class JsonWriter:
+    def __init__(self, out, fields=FIELDS):
+        self.out = out
+        self.fields = fields
+
+    def write(self, frame):
+        self.out.write(json.dumps({k: getattr(frame, k) for k in self.fields}, separators=(",", ":")))
+        self.out.write("\n")
+
+
+class CsvWriter:
+    def __init__(self, out, fields=FIELDS):
+        self.out = out
+        self.fields = fields
+        self.w = csv.writer(out)
+        self.w.writerow(fields)
+
+    def write(self, frame):
+        self.w.writerow([getattr(frame, k) for k in self.fields])
+
+
+WRITERS = {"json": JsonWriter, "csv": CsvWriter}
+
+
+def log(msg):
+    print(msg, file=sys.stderr, flush=True)
+
+
+def run(client, host, port, user=None, password=None, role="OBSERVER", fmt="json",
+        output=None, count=None, duration=None):
+    """Bucle principal headless. Devuelve el código de salida del proceso."""
+    try:
+        client.connect(host, port)
+    except RuntimeError as e:
+        log(str(e))
+        return 2
+    log(f"Conectado a {host}:{port}")
+    if user and password:
+        client.send_line(f"AUTH {user} {password}")
+    client.send_line(f"SUBSCRIBE {role}")
+
+    out = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    writer = WRITERS[fmt](out)
+    written = 0
+    deadline = time.monotonic() + duration if duration else None
+    code = 0
+    try:
+        while count is None or written < count:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            msg = client.q.get(timeout=0.5)
+            if msg is None:
+                out.flush()
+                continue
+            kind, payload = msg
+            if kind == "telemetry":
+                writer.write(payload)
+                written += 1
+            elif kind == "line":
+                log(payload)
+                if payload.startswith("AUTH-ERR"):
+                    code = 3
+                    break
+            elif kind == "status":
+                log(payload)
+                code = 1
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+        out.flush()
+        if output:
+            out.close()
+    log(f"{written} tramas escritas")
+    if client.q.collapsed:
+        log(f"cola: {client.q.collapsed} tramas superadas (máximo {client.q.high_water} pendientes)")
+    return code
+
+
+def run_fleet(ingest, fmt="json", output=None, count=None, duration=None):
+    """Modo flota con ShardedIngest: vuelca cada FLEET_POLL s las filas que cambiaron."""
+    out = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    writer = WRITERS[fmt](out, FLEET_FIELDS)
+    table = ingest.table
+    written = 0
+    deadline = time.monotonic() + duration if duration else None
+    ingest.start()
+    log(f"{len(ingest.endpoints)} vehículos en {ingest.workers} procesos de ingesta")
+    try:
+        while count is None or written < count:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(FLEET_POLL)
+            for i in table.changed():
+                writer.write(table.snapshot(i))
+                written += 1
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        frames = table.total_frames()
+        ingest.stop()
+        out.flush()
+        if output:
+            out.close()
+    log(f"{written} filas escritas; {frames} tramas recibidas por los procesos de ingesta")
+    return 0
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ingest.py - Ingesta de flota repartida en procesos con tabla en memoria compartida.
+Con miles de vehículos un solo proceso queda limitado por el GIL aunque use
+asyncio. ShardedIngest reparte las conexiones entre N procesos (spawn); cada
+uno corre su propio bucle de AsyncTelemetryClient, interpreta TELEMETRY y
+escribe el último estado y un resumen por minuto en la fila fija de cada
+vehículo de una multiprocessing.shared_memory. La GUI o el modo headless
+leen las filas con struct.unpack_from directamente sobre el buffer (con
+numpy, como vista estructurada sin copia): nada de pickle ni colas.
+
+Bloque compartido (little-endian):
+    cabecera 64 B: magic "VFLT", versión, bytes por fila, filas
+    nombres  filas x 48 B (UTF-8, relleno con ceros)
+    filas    filas x 96 B:
+        seq     uint32  seqlock: impar mientras el proceso de ingesta escribe
+        status  uint8   índice en STATUS
+        card    uint8   índice en CARDINALS (0 = desconocido)
+        frames  uint64  tramas recibidas
+        ts, speed, heading, battery   float64 (NaN = ausente)
+        roll_n  uint32  tramas en el minuto en curso
+        roll_t0, roll_sum, roll_min, roll_max, roll_batt0   float64
+Cada fila tiene un único escritor (el proceso que posee esa conexión).
+"""
+
+import asyncio
+import collections
+import math
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+from aioclient import AsyncTelemetryClient, watch
+from channel import Channel
+from telemetry import TelemetryFrame
+
+try:
+    import numpy as np
+except ImportError:   # opcional: sólo acelera la detección de filas cambiadas
+    np = None
+
+MAGIC = b"VFLT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+HEADER_SIZE = 64
+NAME_SIZE = 48
+SEQ = struct.Struct("<I")
+DATA = struct.Struct("<BBxxqddddI4xddddd")   # la fila sin seq
+ROW_SIZE = SEQ.size + DATA.size              # 96
+ROLLUP_S = 60.0
+STATUS = ("CONECTANDO", "SUSCRITO", "OK", "DESCONEXIÓN", "ERROR")
+ST_CONNECTING, ST_SUBSCRIBED, ST_OK, ST_DISCONNECTED, ST_ERROR = range(len(STATUS))
+CARDINALS = ("", "N", "E", "S", "W")
+_CARD_INDEX = {c: i for i, c in enumerate(CARDINALS)}
+NAN = float("nan")
+STOP_POLL = 0.2
+SPIN_LIMIT = 10_000   # lecturas de una fila a medio escribir antes de aceptarla tal cual
+
+
+def _layout(rows):
+    names = HEADER_SIZE
+    data = names + rows * NAME_SIZE
+    data += -data % 64
+    return names, data, data + rows * ROW_SIZE
+
+
+def _attach(name):
+    # Sólo quien crea el bloque lo libera: los demás procesos no deben
+    # registrarlo en el resource_tracker (lo borraría al salir el primero).
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:   # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if multiprocessing.parent_process() is None:
+            # Un hijo de spawn comparte el tracker del padre: ahí el registro es
+            # el mismo y quitarlo dejaría al padre sin él al hacer unlink().
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class RowSnapshot:
+    __slots__ = ("vehicle", "seq", "status", "cardinal", "frames", "timestamp", "speed", "heading", "battery",
+                 "roll_n", "roll_t0", "roll_avg", "roll_min", "roll_max", "roll_drop")
+
+    def __init__(self, vehicle, seq, data):
+        st, card, self.frames, ts, speed, heading, batt, n, t0, total, lo, hi, batt0 = data
+        self.vehicle, self.seq = vehicle, seq
+        self.status = STATUS[st]
+        self.cardinal = CARDINALS[card] or None
+        self.timestamp = None if math.isnan(ts) else ts
+        self.speed = None if math.isnan(speed) else speed
+        self.heading = None if math.isnan(heading) else heading
+        self.battery = None if math.isnan(batt) else int(batt)
+        self.roll_n, self.roll_t0 = n, t0
+        self.roll_avg = total / n if n else None
+        self.roll_min = lo if n else None
+        self.roll_max = hi if n else None
+        self.roll_drop = None if math.isnan(batt0) or math.isnan(batt) else batt0 - batt
+
+
+class FleetTable:
+    """Tabla por vehículo en memoria compartida. create() en el proceso que la
+    posee (y la libera con unlink()); attach() en el resto."""
+
+    def __init__(self, shm, owner):
+        self.shm, self.owner = shm, owner
+        self.buf = shm.buf
+        magic, version, row_size, self.rows = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION or row_size != ROW_SIZE:
+            raise ValueError(f"{shm.name}: no es una tabla VFLT v{VERSION}")
+        self.names_off, self.data_off, _ = _layout(self.rows)
+        self.names = [bytes(self.buf[self.names_off + i * NAME_SIZE:self.names_off + (i + 1) * NAME_SIZE])
+                      .rstrip(b"\0").decode("utf-8") for i in range(self.rows)]
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self._seen = [0] * self.rows   # seq leído por última vez (changed())
+        self._seq_view = None
+        if np is not None and self.rows:
+            # Columna seq como vista con paso ROW_SIZE: comparar miles de filas es una operación
+            self._seq_view = np.ndarray((self.rows,), dtype="<u4", buffer=self.buf, offset=self.data_off,
+                                        strides=(ROW_SIZE,))
+            self._seen = np.zeros(self.rows, dtype="<u4")
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, names):
+        rows = len(names)
+        names_off, data_off, size = _layout(rows)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        buf = shm.buf
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, ROW_SIZE, rows)
+        empty = DATA.pack(ST_CONNECTING, 0, 0, NAN, NAN, NAN, NAN, 0, 0.0, 0.0, 0.0, 0.0, NAN)
+        for i, n in enumerate(names):
+            raw = n.encode("utf-8")[:NAME_SIZE]
+            buf[names_off + i * NAME_SIZE:names_off + i * NAME_SIZE + len(raw)] = raw
+            off = data_off + i * ROW_SIZE
+            SEQ.pack_into(buf, off, 0)
+            buf[off + SEQ.size:off + ROW_SIZE] = empty
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_attach(name), owner=False)
+
+    def read(self, i):
+        """(seq, campos) de la fila i, consistentes (seqlock)."""
+        off = self.data_off + i * ROW_SIZE
+        buf = self.buf
+        for _ in range(SPIN_LIMIT):
+            s1 = SEQ.unpack_from(buf, off)[0]
+            if s1 & 1:
+                continue
+            data = DATA.unpack_from(buf, off + SEQ.size)
+            if SEQ.unpack_from(buf, off)[0] == s1:
+                return s1, data
+        # Escritor muerto a mitad de fila: mejor un dato quizá mezclado que colgarse
+        return SEQ.unpack_from(buf, off)[0], DATA.unpack_from(buf, off + SEQ.size)
+
+    def snapshot(self, i):
+        seq, data = self.read(i)
+        return RowSnapshot(self.names[i], seq, data)
+
+    def changed(self):
+        """Índices de las filas escritas desde la llamada anterior."""
+        if self._seq_view is not None:
+            cur = self._seq_view.copy()   # 4 B por fila
+            idx = np.flatnonzero(cur != self._seen)
+            self._seen = cur
+            return idx.tolist()
+        out = []
+        buf, off, seen = self.buf, self.data_off, self._seen
+        for i in range(self.rows):
+            s = SEQ.unpack_from(buf, off + i * ROW_SIZE)[0]
+            if s != seen[i]:
+                seen[i] = s
+                out.append(i)
+        return out
+
+    def as_array(self):
+        """Vista estructurada numpy de todas las filas (sin copia; sin seqlock)."""
+        if np is None:
+            raise RuntimeError("as_array() requiere numpy")
+        dt = np.dtype({"names": ["seq", "status", "card", "frames", "ts", "speed", "heading", "battery",
+                                 "roll_n", "roll_t0", "roll_sum", "roll_min", "roll_max", "roll_batt0"],
+                       "formats": ["<u4", "u1", "u1", "<u8", "<f8", "<f8", "<f8", "<f8",
+                                   "<u4", "<f8", "<f8", "<f8", "<f8", "<f8"],
+                       "offsets": [0, 4, 5, 8, 16, 24, 32, 40, 48, 56, 64, 72, 80, 88],
+                       "itemsize": ROW_SIZE})
+        return np.ndarray((self.rows,), dtype=dt, buffer=self.buf, offset=self.data_off)
+
+    def total_frames(self):
+        return sum(self.read(i)[1][2] for i in range(self.rows))
+
+    def close(self):
+        self._seq_view = None
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+class RowWriter:
+    """Lado de los procesos de ingesta: hace de TelemetryBridge para sus
+    AsyncTelemetryClient y escribe la fila del vehículo en cada mensaje."""
+
+    def __init__(self, table):
+        self.table = table
+        self.state = {}   # fila -> lista mutable con los campos de DATA + seq
+
+    def _row(self, i):
+        st = self.state.get(i)
+        if st is None:
+            seq, data = self.table.read(i)
+            st = self.state[i] = [seq] + list(data)
+        return st
+
+    def _publish(self, i, st):
+        buf, off = self.table.buf, self.table.data_off + i * ROW_SIZE
+        st[0] += 1
+        SEQ.pack_into(buf, off, st[0])                 # impar: escritura en curso
+        DATA.pack_into(buf, off + SEQ.size, *st[1:])
+        st[0] += 1
+        SEQ.pack_into(buf, off, st[0])
+
+    def put(self, source, kind, payload):
+        i = source   # el name de cada cliente es su índice de fila
+        st = self._row(i)
+        if kind == "telemetry":
+            f = payload
+            ts = f.timestamp if f.timestamp is not None else time.time()
+            st[1] = ST_OK
+            if f.cardinal is not None: st[2] = _CARD_INDEX.get(f.cardinal, 0)
+            st[3] += 1
+            st[4] = ts
+            if f.speed is not None: st[5] = f.speed
+            if f.heading is not None: st[6] = f.heading
+            if f.battery is not None: st[7] = float(f.battery)
+            b = ts - ts % ROLLUP_S
+            if b != st[9]:
+                st[8], st[9], st[10], st[11], st[12], st[13] = 0, b, 0.0, math.inf, -math.inf, st[7]
+            v = st[5]
+            if not math.isnan(v):
+                st[8] += 1; st[10] += v
+                if v < st[11]: st[11] = v
+                if v > st[12]: st[12] = v
+        elif kind == "status":
+            st[1] = ST_DISCONNECTED if payload == "DESCONEXIÓN" else ST_ERROR
+        elif payload.startswith("SUBSCRIBE-OK"):
+            st[1] = ST_SUBSCRIBED
+        else:
+            return
+        self._publish(i, st)
+
+
+def _worker(table_name, shard, user, password, role, stop_event):
+    table = FleetTable.attach(table_name)
+    writer = RowWriter(table)
+
+    async def main():
+        tasks = [asyncio.ensure_future(watch(AsyncTelemetryClient(host, port, writer, name=i), role, user, password))
+                 for i, host, port in shard]
+        while not stop_event.is_set():
+            await asyncio.sleep(STOP_POLL)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.state.clear()
+        table.close()
+
+
+class ShardedIngest:
+    """Misma interfaz que fleet.FleetPool (endpoints, bridge, feeds, start,
+    stop, open_feed) sobre N procesos de ingesta y una FleetTable."""
+
+    def __init__(self, endpoints, workers=None, user=None, password=None, role="OBSERVER"):
+        self.endpoints = {name: (host, port) for name, host, port in endpoints}
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(endpoints) or 1))
+        self.table = FleetTable.create([name for name, _, _ in endpoints])
+        self.bridge = TableBridge(self.table)
+        self.feeds = {}
+        self.journal = None
+        ctx = multiprocessing.get_context("spawn")   # sin fork: el padre puede tener Tk e hilos
+        self.stop_event = ctx.Event()
+        shards = [[] for _ in range(self.workers)]
+        for i, (name, host, port) in enumerate(endpoints):
+            shards[i % self.workers].append((i, host, port))
+        self.procs = [ctx.Process(target=_worker, args=(self.table.name, shard, user, password, role, self.stop_event),
+                                  name=f"ingest-{k}", daemon=True) for k, shard in enumerate(shards)]
+
+    def start(self):
+        for p in self.procs:
+            p.start()
+
+    def stop(self, timeout=3.0):
+        self.stop_event.set()
+        for p in self.procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.bridge = None
+        self.table.close()
+        self.table.unlink()
+
+    def open_feed(self, name):
+        feed = TableFeed(self, name)
+        self.feeds[name] = feed
+        return feed
+
+
+class TableBridge:
+    """drain() al estilo de TelemetryBridge a partir de las filas cambiadas: una
+    TelemetryFrame por vehículo y tick (las tramas intermedias ya están
+    resumidas en la fila) y un mensaje por cambio de estado. Con max_items, las
+    filas cambiadas que no caben quedan para la siguiente llamada."""
+
+    def __init__(self, table):
+        self.table = table
+        self.status = [ST_CONNECTING] * table.rows
+        self.frames = [0] * table.rows
+        self.backlog = collections.deque()   # filas cambiadas aún sin leer
+        self.queued = set()
+        self.carry = []                      # mensajes que no cupieron en el último drain()
+
+    def drain(self, max_items=None):
+        """Devuelve hasta max_items mensajes (source, kind, payload)."""
+        t = self.table
+        for i in t.changed():
+            if i not in self.queued:
+                self.queued.add(i)
+                self.backlog.append(i)
+        out, self.carry = self.carry, []
+        while self.backlog and (max_items is None or len(out) < max_items):
+            i = self.backlog.popleft()
+            self.queued.discard(i)
+            s = t.snapshot(i)
+            st = STATUS.index(s.status)
+            if st != self.status[i]:
+                self.status[i] = st
+                if st == ST_SUBSCRIBED:
+                    out.append((s.vehicle, "line", "SUBSCRIBE-OK"))
+                elif st in (ST_DISCONNECTED, ST_ERROR):
+                    out.append((s.vehicle, "status", s.status))
+            if s.frames != self.frames[i]:
+                self.frames[i] = s.frames
+                raw = (f"TELEMETRY v={s.speed if s.speed is not None else 0:.2f} battery={s.battery} "
+                       f"dir={s.cardinal or '?'}")
+                out.append((s.vehicle, "telemetry",
+                            TelemetryFrame(s.speed, s.battery, s.heading, s.cardinal, s.timestamp, raw)))
+        if max_items is not None and len(out) > max_items:
+            out, self.carry = out[:max_items], out[max_items:]
+        return out
+
+    def __len__(self):
+        # Lo ya detectado y pendiente; las filas que cambien después se ven en drain()
+        return len(self.carry) + len(self.backlog)
+
+
+class TableFeed:
+    """Alimenta un dashboard detallado desde la tabla; en modo repartido la
+    conexión es de un proceso de ingesta, así que no se pueden enviar comandos."""
+
+    def __init__(self, pool, name):
+        self.pool = pool
+        self.name = name
+        self.journal = None
+        self.q = Channel()
+
+    def get_message_nowait(self):
+        return self.q.get_nowait()
+
+    def send_line(self, line):
+        raise RuntimeError("Modo de ingesta repartida: el dashboard es de sólo lectura")
+
+    send_async = send_line
+
+    def connect(self, host, port, timeout=5.0):
+        self.pool.feeds[self.name] = self
+
+    def close(self):
+        self.pool.feeds.pop(self.name, None)
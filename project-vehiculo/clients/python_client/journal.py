@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+journal.py - Diario estructurado de la sesión con índice para búsquedas.
+Cada línea recibida y cada comando enviado se guarda como registro
+(hora, dirección, tipo de mensaje, vehículo, texto). El hilo de red sólo
+añade una tupla a una deque; el BackgroundWriter de recorder.py la vuelca
+cada medio segundo.
+
+En disco, por segmento (se rota al superar `segment_bytes` comprimidos):
+    jrn-<ms>.jz   bloques zlib independientes, uno tras otro. El bloque
+                  abierto se escribe con Z_SYNC_FLUSH, así que lo ya volcado
+                  se puede leer aunque el proceso muera.
+    jrn-<ms>.idx  una entrada de 36 B por bloque cerrado: t0, t1, offset,
+                  longitud, registros y máscara de tipos presentes.
+Una consulta lee sólo los .idx y descomprime únicamente los bloques cuyo
+rango de tiempo y máscara de tipos pueden contener resultados.
+
+Registro dentro de un bloque (texto UTF-8):
+    ms<TAB>dirección<TAB>tipo<TAB>vehículo<TAB>texto<LF>
+dirección: "in" (del servidor), "out" (enviado) o "sys" (estado local).
+Las contraseñas de AUTH y los tokens de sesión se guardan enmascarados.
+
+Consulta desde la línea de órdenes:
+    python3 journal.py DIR CMD-ERR battery_low 7d
+"""
+
+import collections
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from recorder import BackgroundWriter
+
+SEGMENT_BYTES = 8 * 1024 * 1024    # comprimidos, por segmento
+BLOCK_BYTES = 256 * 1024           # sin comprimir, por bloque
+BLOCK_SECONDS = 60.0               # o cuando el bloque abierto tenga este tiempo
+INDEX = struct.Struct("<qqQIII")   # t0_ms, t1_ms, offset, longitud, registros, tipos
+TYPES = ("TELEMETRY", "CMD-ACK", "CMD-ERR", "AUTH-OK", "AUTH-ERR", "SUBSCRIBE-OK", "SUBSCRIBE-ERR",
+         "CMD", "AUTH", "SUBSCRIBE", "STATUS", "OTHER")
+TYPE_BIT = {t: 1 << i for i, t in enumerate(TYPES)}
+DIRECTIONS = ("in", "out", "sys")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_AGE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+
+
+def type_of(direction, text):
+    if direction == "sys":
+        return "STATUS"
+    head = text.split(" ", 1)[0]
+    return head if head in TYPE_BIT else "OTHER"
+
+
+def redact(text):
+    # Nada de secretos en disco: "AUTH user pw" y "AUTH-OK token=..."
+    if text.startswith("AUTH "):
+        parts = text.split()
+        if len(parts) >= 3 and not parts[1].startswith("token="):
+            return f"AUTH {parts[1]} ***"
+        return "AUTH token=***"
+    if text.startswith("AUTH-OK token="):
+        return "AUTH-OK token=***"
+    return text
+
+
+class Journal:
+    """Punto de entrada desde los hilos de red. record_* sólo encola."""
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, keep=None, writer=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.keep = keep   # segmentos conservados (None = todos)
+        os.makedirs(directory, exist_ok=True)
+        self.pending = collections.deque()
+        self.records_written = 0
+        self.segment = None
+        self.lock = threading.Lock()
+        self._own_writer = writer is None
+        self.writer = writer or BackgroundWriter()
+        self.writer.add(self)
+
+    def record_in(self, line, vehicle=""):
+        self.pending.append((time.time(), "in", line, vehicle))
+
+    def record_out(self, line, vehicle=""):
+        self.pending.append((time.time(), "out", line.rstrip("\n"), vehicle))
+
+    def record_status(self, text, vehicle=""):
+        self.pending.append((time.time(), "sys", text, vehicle))
+
+    def flush(self):
+        """Codifica y escribe lo pendiente (lo llama el hilo escritor)."""
+        with self.lock:
+            pending = self.pending
+            if not pending:
+                if self.segment is not None and self.segment.block_due(time.time()):
+                    self.segment.close_block()
+                return
+            if self.segment is None:
+                self.segment = SegmentWriter(self.directory, pending[0][0])
+            seg = self.segment
+            out, raw, total = [], 0, 0
+            while pending:
+                ts, direction, text, vehicle = pending.popleft()
+                kind = type_of(direction, text)
+                ms = int(ts * 1000)
+                text = redact(text).replace("\n", " ")   # un registro por línea
+                rec = f"{ms}\t{direction}\t{kind}\t{vehicle}\t{text}\n"
+                out.append(rec)
+                raw += len(rec)
+                seg.note(ms, kind)
+                # Un lote grande (p. ej. tras un atasco) se reparte en varios bloques
+                if seg.block_raw + raw >= BLOCK_BYTES or seg.t1 - seg.t0 >= BLOCK_SECONDS * 1000:
+                    seg.write("".join(out).encode("utf-8")); seg.close_block()
+                    total += len(out); out, raw = [], 0
+            if out:
+                seg.write("".join(out).encode("utf-8"))
+                total += len(out)
+            self.records_written += total
+            if seg.size >= self.segment_bytes:
+                seg.close()
+                self.segment = None
+                self._prune()
+            elif seg.block_due(time.time()):
+                seg.close_block()
+
+    def _prune(self):
+        if not self.keep:
+            return
+        for name in segment_names(self.directory)[:-self.keep]:
+            for ext in (".jz", ".idx"):
+                try:
+                    os.remove(os.path.join(self.directory, name + ext))
+                except OSError:
+                    pass
+
+    def close(self):
+        self.writer.remove(self)
+        if self._own_writer:
+            self.writer.stop()
+        self.flush()
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+
+class SegmentWriter:
+    def __init__(self, directory, first_ts):
+        self.name = f"jrn-{int(first_ts * 1000)}"
+        base = os.path.join(directory, self.name)
+        self.data = open(base + ".jz", "ab")
+        self.index = open(base + ".idx", "ab")
+        self.size = self.data.tell()
+        self._new_block()
+
+    def _new_block(self):
+        self.zc = zlib.compressobj(6)
+        self.block_off = self.size
+        self.block_raw = 0
+        self.block_n = 0
+        self.block_types = 0
+        self.t0 = self.t1 = None
+        self.opened = time.time()
+
+    def note(self, ms, kind):
+        if self.t0 is None:
+            self.t0 = ms
+        self.t1 = ms if self.t1 is None else max(self.t1, ms)
+        self.block_n += 1
+        self.block_types |= TYPE_BIT[kind]
+
+    def block_due(self, now):
+        return self.block_n and (self.block_raw >= BLOCK_BYTES or now - self.opened >= BLOCK_SECONDS
+                                 or self.t1 - self.t0 >= BLOCK_SECONDS * 1000)
+
+    def write(self, raw):
+        self.block_raw += len(raw)
+        chunk = self.zc.compress(raw) + self.zc.flush(zlib.Z_SYNC_FLUSH)
+        self.data.write(chunk)
+        self.data.flush()
+        self.size += len(chunk)
+
+    def close_block(self):
+        if not self.block_n:
+            return
+        chunk = self.zc.flush(zlib.Z_FINISH)
+        self.data.write(chunk)
+        self.data.flush()
+        self.size += len(chunk)
+        # El índice se escribe después de los datos: una entrada siempre apunta a un bloque completo
+        self.index.write(INDEX.pack(self.t0, self.t1, self.block_off, self.size - self.block_off,
+                                    self.block_n, self.block_types))
+        self.index.flush()
+        self._new_block()
+
+    def close(self):
+        self.close_block()
+        self.data.close()
+        self.index.close()
+
+
+def segment_names(directory):
+    names = (n[:-3] for n in os.listdir(directory) if n.startswith("jrn-") and n.endswith(".jz"))
+    return sorted(names, key=lambda n: int(n[4:]))
+
+
+class JournalReader:
+    """Consultas sobre un directorio de diario (también mientras se escribe)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+        self.malformed = 0       # registros ilegibles saltados por query()
+
+    def _blocks(self, name):
+        """[(t0, t1, offset, longitud, registros, tipos)] de un segmento, más el
+        tramo final aún sin indexar como (None, None, offset, -1, 0, ~0)."""
+        base = os.path.join(self.directory, name)
+        try:
+            with open(base + ".idx", "rb") as f:
+                raw = f.read()
+        except OSError:
+            raw = b""
+        raw = raw[:len(raw) - len(raw) % INDEX.size]
+        blocks = list(INDEX.iter_unpack(raw))
+        end = blocks[-1][2] + blocks[-1][3] if blocks else 0
+        if os.path.getsize(base + ".jz") > end:
+            blocks.append((None, None, end, -1, 0, ~0))
+        return blocks
+
+    def _decode(self, f, offset, length):
+        f.seek(offset)
+        if length >= 0:
+            data = zlib.decompress(f.read(length))
+        else:
+            # Bloque abierto: flujo sin terminar; la última línea puede estar a medias
+            data = zlib.decompressobj().decompress(f.read())
+            data = data[:data.rfind(b"\n") + 1]
+        # Sólo b"\n" separa registros: splitlines() también corta en \x1c, \x85,
+        # \u2028..., que pueden venir dentro de una línea recibida
+        return [line.decode("utf-8", "replace") for line in data.split(b"\n")[:-1]]
+
+    def query(self, types=None, since=None, until=None, text=None, direction=None, vehicle=None, limit=None):
+        """Registros (ts, dirección, tipo, vehículo, texto) en orden temporal. `text`
+        es una lista de términos (todos deben aparecer, sin distinguir mayúsculas);
+        con `limit` se devuelven los `limit` más recientes."""
+        mask = 0
+        for t in types or ():
+            mask |= TYPE_BIT[t]
+        types = set(types or ())
+        ms0 = None if since is None else int(since * 1000)
+        ms1 = None if until is None else int(until * 1000)
+        terms = [t.lower() for t in (text or ())]
+        out = []
+        # Del segmento más nuevo al más viejo, para cortar en cuanto haya `limit`
+        for name in reversed(segment_names(self.directory)):
+            matches_seg = []
+            blocks = self._blocks(name)
+            with open(os.path.join(self.directory, name + ".jz"), "rb") as f:
+                for t0, t1, off, length, _, bits in reversed(blocks):
+                    if t0 is not None and ((ms0 is not None and t1 < ms0) or (ms1 is not None and t0 >= ms1)
+                                           or (mask and not bits & mask)):
+                        self.blocks_skipped += 1
+                        continue
+                    self.blocks_read += 1
+                    found = []
+                    for line in self._decode(f, off, length):
+                        rec = line.split("\t", 4)
+                        if len(rec) != 5 or not rec[0].isdigit():
+                            self.malformed += 1
+                            continue
+                        ms, d, kind, veh, msg = rec
+                        ms = int(ms)
+                        if ((ms0 is not None and ms < ms0) or (ms1 is not None and ms >= ms1)
+                                or (types and kind not in types) or (direction and d != direction)
+                                or (vehicle is not None and veh != vehicle)):
+                            continue
+                        if terms:
+                            low = msg.lower()
+                            if not all(t in low for t in terms):
+                                continue
+                        found.append((ms / 1000.0, d, kind, veh, msg))
+                    matches_seg[:0] = found
+                    if limit and len(out) + len(matches_seg) >= limit:
+                        break
+            out[:0] = matches_seg
+            if limit and len(out) >= limit:
+                break
+            if ms0 is not None and blocks and blocks[0][0] is not None and blocks[0][0] < ms0:
+                break   # los segmentos anteriores son aún más viejos
+        return out[-limit:] if limit else out
+
+
+def parse_query(q, now=None):
+    """"CMD-ERR battery_low 7d" -> kwargs de JournalReader.query.
+    Tipos en mayúsculas (TYPES), edad N[smhd], in/out/sys, veh=NOMBRE; el
+    resto son términos de texto."""
+    now = time.time() if now is None else now
+    kw = {"types": [], "text": []}
+    for tok in q.split():
+        up = tok.upper()
+        age = _AGE.match(tok)
+        if up in TYPE_BIT:
+            kw["types"].append(up)
+        elif age:
+            kw["since"] = now - float(age.group(1)) * _UNITS[age.group(2)]
+        elif tok.lower() in DIRECTIONS:
+            kw["direction"] = tok.lower()
+        elif tok.startswith("veh="):
+            kw["vehicle"] = tok[4:]
+        else:
+            kw["text"].append(tok)
+    return kw
+
+
+def format_entry(entry):
+    ts, direction, kind, vehicle, text = entry
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    arrow = {"in": "<", "out": ">", "sys": "!"}.get(direction, "?")
+    return f"{stamp} {arrow} {vehicle + ' ' if vehicle else ''}{text}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("uso: journal.py DIR [TIPO] [N(s|m|h|d)] [in|out|sys] [veh=NOMBRE] [texto...]", file=sys.stderr)
+        return 2
+    reader = JournalReader(argv[0])
+    t0 = time.perf_counter()
+    rows = reader.query(**parse_query(" ".join(argv[1:])))
+    for e in rows:
+        print(format_entry(e))
+    print(f"{len(rows)} registros en {(time.perf_counter() - t0) * 1e3:.1f} ms "
+          f"({reader.blocks_read} bloques leídos, {reader.blocks_skipped} saltados)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
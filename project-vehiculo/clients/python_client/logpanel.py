@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+logpanel.py - Registro de eventos acotado para el panel derecho.
+Las entradas van a un buffer circular de capacidad fija (historial exportable)
+y se vuelcan al tk.Text en un único insert por tick; el widget sólo conserva
+las últimas `visible` líneas, de modo que memoria y latencia no crecen con la
+duración de la sesión.
+Con show() el widget pasa a mostrar resultados de búsqueda (el registro en
+vivo sigue acumulándose en history) hasta que resume() lo restaura.
+"""
+
+import collections
+import time
+
+VISIBLE_LINES = 500        # líneas que viven en el widget
+HISTORY_LINES = 100_000    # entradas retenidas para exportar
+
+
+class LogPanel:
+    def __init__(self, widget, visible=VISIBLE_LINES, history=HISTORY_LINES):
+        self.widget = widget
+        self.visible = visible
+        self.history = collections.deque(maxlen=history)   # (epoch, tag, texto)
+        self.pending = collections.deque(maxlen=visible)   # sólo importa lo último
+        self.widget_lines = 0
+        self.dropped = 0   # líneas que nunca llegaron al widget (siguen en history)
+        self.frozen = False   # True mientras se muestran resultados de búsqueda
+
+    def append(self, text, tag="info"):
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.history.append((time.time(), tag, text))
+        self.pending.append((text, tag))
+
+    def flush(self):
+        """Vuelca lo pendiente en un solo insert y recorta por arriba. Devuelve
+        True si había algo que dibujar."""
+        if not self.pending or self.frozen:
+            return False
+        args = []
+        for text, tag in self.pending:
+            args.append(text + "\n")
+            args.append(tag)
+        n = len(self.pending)
+        self.pending.clear()
+
+        w = self.widget
+        w.config(state="normal")
+        w.insert("end", *args)
+        self.widget_lines += n
+        excess = self.widget_lines - self.visible
+        if excess > 0:
+            w.delete("1.0", f"{excess + 1}.0")
+            self.widget_lines -= excess
+        w.see("end")
+        w.config(state="disabled")
+        return True
+
+    def _replace(self, rows):
+        w = self.widget
+        w.config(state="normal")
+        w.delete("1.0", "end")
+        args = []
+        for text, tag in rows:
+            args.append(text + "\n")
+            args.append(tag)
+        if args:
+            w.insert("end", *args)
+        w.see("end")
+        w.config(state="disabled")
+        self.widget_lines = len(rows)
+
+    def show(self, rows):
+        """Sustituye el contenido por `rows` [(texto, tag)] y congela el vivo."""
+        self.frozen = True
+        self._replace(rows[-self.visible:] if len(rows) > self.visible else rows)
+
+    def resume(self):
+        """Vuelve al registro en vivo con las últimas `visible` entradas."""
+        if not self.frozen:
+            return
+        self.frozen = False
+        self.pending.clear()
+        n = len(self.history)
+        tail = [self.history[i] for i in range(max(0, n - self.visible), n)]
+        self._replace([(text, tag) for _, tag, text in tail])
+
+    def search(self, terms, limit=VISIBLE_LINES):
+        """Últimas entradas del historial en memoria que contienen todos los términos."""
+        terms = [t.lower() for t in terms]
+        out = []
+        for ts, tag, text in reversed(self.history):
+            low = text.lower()
+            if all(t in low for t in terms):
+                out.append((ts, tag, text))
+                if len(out) >= limit:
+                    break
+        out.reverse()
+        return out
+
+    def export(self, path):
+        """Escribe todo el historial retenido (no sólo lo visible)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for ts, tag, text in list(self.history):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+                f.write(f"{stamp} {text}\n")
+        return len(self.history)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+metrics.py - Contadores e histogramas de los caminos calientes del cliente.
+Desactivado no cuesta nada: TelemetryClient.metrics y FancyClientApp.metrics
+valen None y cada punto de medida es un `if m:`. Activado se mide por lote
+(un recv, un tick de _poll), no por línea. Se exporta en formato de texto de
+Prometheus a un fichero (textfile collector) o por HTTP en /metrics.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from channel import Channel
+
+# Límites (s) por defecto: de 10 µs a 1 s
+TIME_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Caída del enlace hasta la primera TELEMETRY (reconexión incluida)
+RECOVERY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "vehiculo_"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name, self.help = name, help
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def samples(self):
+        yield self.name, "", self.value
+
+
+class Gauge:
+    """Valor puntual; con `fn` se evalúa sólo al exportar (p. ej. tamaño de cola)."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn=None):
+        self.name, self.help = name, help
+        self.value = 0
+        self.fn = fn
+
+    def set(self, v):
+        self.value = v
+
+    def get(self):
+        return self.fn() if self.fn else self.value
+
+    def samples(self):
+        yield self.name, "", self.get()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=TIME_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.last = 0.0
+
+    def observe(self, v):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+        self.last = v
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target, acc = self.count * p / 100.0, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def samples(self):
+        acc = 0
+        for le, c in zip(self.buckets, self.counts):
+            acc += c
+            yield self.name + "_bucket", f'{{le="{le:g}"}}', acc
+        yield self.name + "_bucket", '{le="+Inf"}', self.count
+        yield self.name + "_sum", "", self.sum
+        yield self.name + "_count", "", self.count
+
+
+class Metrics:
+    """Registro de métricas. Las mismas claves (sin prefijo) sirven de atributo:
+    m.rx_bytes_total.inc(n)."""
+
+    def __init__(self):
+        self.items = {}
+        self.started = time.time()
+
+    def _add(self, metric):
+        key = metric.name
+        metric.name = PREFIX + key
+        self.items[key] = metric
+        setattr(self, key, metric)
+        return metric
+
+    def counter(self, name, help):
+        return self._add(Counter(name, help))
+
+    def gauge(self, name, help, fn=None):
+        return self._add(Gauge(name, help, fn))
+
+    def histogram(self, name, help, buckets=TIME_BUCKETS):
+        return self._add(Histogram(name, help, buckets))
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus (0.0.4)."""
+        out = []
+        for m in self.items.values():
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            for name, labels, value in m.samples():
+                out.append(f"{name}{labels} {value:g}" if isinstance(value, float) else f"{name}{labels} {value}")
+        return "\n".join(out) + "\n"
+
+
+def client_metrics(client=None, gui=True, render=None):
+    """Métricas del cliente de telemetría (receptor y cola; con gui, también FancyClientApp
+    y, si se pasa, su RenderScheduler)."""
+    m = Metrics()
+    m.counter("rx_bytes_total", "Bytes recibidos del servidor")
+    m.counter("rx_lines_total", "Líneas completas recibidas")
+    m.histogram("rx_batch_seconds", "Interpretar y encolar las líneas de un recv")
+    m.histogram("link_recovery_seconds", "Desde la caída del enlace hasta la primera TELEMETRY",
+                RECOVERY_BUCKETS)
+    if client is not None:
+        q = client.q
+        m.gauge("queue_depth", "Mensajes pendientes en TelemetryClient.q", q.qsize)
+        if isinstance(q, Channel):   # ReplayClient usa queue.Queue: sólo la profundidad
+            m.gauge("queue_high_water", "Máximo de mensajes pendientes observado", lambda: q.high_water)
+            m.gauge("queue_collapsed", "Tramas TELEMETRY superadas descartadas por la cola", lambda: q.collapsed)
+            m.gauge("queue_blocked_seconds", "Tiempo del receptor esperando sitio en la cola", lambda: q.blocked_s)
+    if not gui:
+        return m
+    m.histogram("poll_drain_seconds", "Tick de _poll: vaciado de la cola de red")
+    m.histogram("poll_log_seconds", "Tick de _poll: volcado del registro")
+    m.histogram("poll_draw_seconds", "Tick de _poll: dibujo de widgets")
+    m.histogram("tk_lag_seconds", "Retraso del bucle de eventos de Tk sobre el after() programado")
+    if render is not None:
+        m.gauge("render_frames_in", "Tramas entregadas al RenderScheduler", lambda: render.frames_in)
+        m.gauge("render_frames_coalesced", "Tramas superadas por otra antes de dibujarse",
+                lambda: render.frames_coalesced)
+        m.gauge("render_redraws_skipped", "Redibujados evitados porque la entrada no cambió",
+                lambda: render.redraws_skipped)
+    return m
+
+
+def write_textfile(metrics, path):
+    """Escritura atómica (para el textfile collector de node_exporter)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(metrics.render())
+    os.replace(tmp, path)
+
+
+class TextfileExporter:
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics, self.path, self.interval = metrics, path, interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                write_textfile(self.metrics, self.path)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.stop_event.set()
+        write_textfile(self.metrics, self.path)
+
+
+class HttpExporter:
+    """Sirve GET /metrics en un hilo demonio."""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        import http.server   # aquí y no arriba: ~30 ms que el arranque sin exportador no paga
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404); return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+predict.py - Estimación por navegación a estima entre tramas de telemetría.
+server.c sólo emite TELEMETRY cada 10 s, pero cada CMD-ACK confirma un paso
+exacto del vehículo (SPEED_UP/SLOW_DOWN = ±2.5 m/s con tope en 0..30,
+TURN_LEFT/TURN_RIGHT = ∓/±90°) y la batería baja a ritmo casi constante en
+movimiento. DeadReckoner parte de la última trama, aplica los ACK llegados
+desde entonces y extrapola la batería; con la trama siguiente se vuelve a la
+verdad y se anota el error de la predicción.
+"""
+
+import time
+
+SPEED_STEP = 2.5
+SPEED_MAX = 30.0
+TURN_STEP = 90.0
+DEFAULT_DRAIN = 0.1   # %/s: server.c baja 1% por difusión (cada 10 s) en movimiento
+DRAIN_ALPHA = 0.3     # peso de cada medida nueva en la tasa de descarga aprendida
+STEPS = {"SPEED_UP": ("speed", SPEED_STEP), "SLOW_DOWN": ("speed", -SPEED_STEP),
+         "TURN_LEFT": ("heading", -TURN_STEP), "TURN_RIGHT": ("heading", TURN_STEP)}
+
+
+def angle_diff(a, b):
+    return abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+class Prediction:
+    __slots__ = ("speed", "heading", "battery", "cardinal", "predicted")
+
+    def __init__(self, speed, heading, battery, predicted):
+        self.speed, self.heading, self.battery = speed, heading, battery
+        self.cardinal = None if heading is None else cardinal_of(heading)
+        self.predicted = predicted   # conjunto de campos que no vienen de una trama
+
+
+class ErrorStats:
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = None
+
+    def add(self, err):
+        self.n += 1
+        self.total += err
+        self.max = max(self.max, err)
+        self.last = err
+
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+
+class DeadReckoner:
+    def __init__(self):
+        self.speed = self.heading = self.battery = None   # última trama confirmada
+        self.base_t = None
+        self.speed_delta = 0.0
+        self.heading_delta = 0.0
+        self.acks = 0                   # ACK aplicados desde la última trama
+        self.moving_s = 0.0             # segundos en movimiento (según lo predicho) desde la trama
+        self._seg_t = None
+        self.drain_rate = DEFAULT_DRAIN
+        self.errors = {"speed": ErrorStats(), "heading": ErrorStats(), "battery": ErrorStats()}
+        self.snaps = 0
+
+    @property
+    def active(self):
+        return self.base_t is not None
+
+    def _cur_speed(self):
+        return None if self.speed is None else min(SPEED_MAX, max(0.0, self.speed + self.speed_delta))
+
+    def _close_segment(self, now):
+        if self._seg_t is not None and (self._cur_speed() or 0) > 0:
+            self.moving_s += now - self._seg_t
+        self._seg_t = now
+
+    def on_frame(self, frame, now=None):
+        """Vuelve a la verdad con una trama. Devuelve {campo: error} si había predicción."""
+        now = time.monotonic() if now is None else now
+        errors = {}
+        if self.active:
+            pred = self.predict(now)
+            if frame.speed is not None and pred.speed is not None and "speed" in pred.predicted:
+                errors["speed"] = abs(pred.speed - frame.speed)
+            if frame.heading is not None and pred.heading is not None and "heading" in pred.predicted:
+                errors["heading"] = angle_diff(pred.heading, frame.heading)
+            if frame.battery is not None and pred.battery is not None and "battery" in pred.predicted:
+                errors["battery"] = abs(pred.battery - frame.battery)
+            # Aprende la descarga real si el intervalo fue en movimiento y sin recarga
+            self._close_segment(now)
+            if frame.battery is not None and self.battery is not None and self.moving_s > 0:
+                drop = self.battery - frame.battery
+                if drop >= 0:
+                    self.drain_rate += DRAIN_ALPHA * (drop / self.moving_s - self.drain_rate)
+            for k, v in errors.items():
+                self.errors[k].add(v)
+            if errors:
+                self.snaps += 1
+        if frame.speed is not None: self.speed = frame.speed
+        if frame.heading is not None: self.heading = frame.heading
+        if frame.battery is not None: self.battery = frame.battery
+        self.base_t = self._seg_t = now
+        self.speed_delta = self.heading_delta = 0.0
+        self.acks = 0
+        self.moving_s = 0.0
+        return errors
+
+    def on_ack(self, line, now=None):
+        """Aplica un "CMD-ACK action=X ..."; True si cambia la predicción."""
+        if not self.active:
+            return False
+        action = next((t[7:] for t in line.split()[1:] if t.startswith("action=")), None)
+        step = STEPS.get(action)
+        if step is None:
+            return False
+        now = time.monotonic() if now is None else now
+        self._close_segment(now)
+        field, delta = step
+        if field == "speed":
+            cur = self._cur_speed() or 0.0
+            self.speed_delta += min(SPEED_MAX, max(0.0, cur + delta)) - cur
+        else:
+            self.heading_delta += delta
+        self.acks += 1
+        return True
+
+    def predict(self, now=None):
+        now = time.monotonic() if now is None else now
+        predicted = set()
+        speed = self._cur_speed()
+        if self.speed_delta and speed is not None: predicted.add("speed")
+        heading = None if self.heading is None else (self.heading + self.heading_delta) % 360.0
+        if self.heading_delta % 360.0: predicted.add("heading")
+        battery = self.battery
+        if battery is not None:
+            moving = self.moving_s + (now - self._seg_t if (speed or 0) > 0 and self._seg_t is not None else 0.0)
+            drop = self.drain_rate * moving
+            if drop >= 0.5:
+                battery = max(0, int(round(self.battery - drop)))
+                predicted.add("battery")
+        return Prediction(speed, heading, battery, predicted)
+
+    def report(self):
+        """Resumen del error de predicción por campo."""
+        return {k: {"n": e.n, "mean": e.mean(), "max": e.max, "last": e.last} for k, e in self.errors.items()}
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+recorder.py - Grabación binaria columnar de telemetría y lectura por mmap.
+El hilo receptor sólo añade una tupla a una deque (Recorder.record_*); un
+hilo escritor en segundo plano codifica y escribe por columnas en segmentos
+de tamaño fijo. SegmentReader/RecordingReader mapean los ficheros en memoria
+para buscar por tiempo y acceder a columnas sin copiar.
+
+Segmento (little-endian), capacidad N filas, 10 bytes por fila:
+    cabecera 64 B: magic "VTLM", versión, N, filas escritas, base_ms, last_ms
+    ts      uint32[N]  ms desde base_ms
+    speed   uint16[N]  cm/s            (0xFFFF = ausente)
+    heading uint16[N]  décimas de grado (0xFFFF = ausente)
+    battery uint8[N]   %               (0xFF = ausente)
+    event   uint8[N]   EV_*
+"""
+
+import array
+import bisect
+import collections
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"VTLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIqq")
+HEADER_SIZE = 64
+SEGMENT_ROWS = 64 * 1024
+FLUSH_INTERVAL = 0.5
+
+# (nombre, typecode de array, bytes por fila)
+COLUMNS = (("ts", "I", 4), ("speed", "H", 2), ("heading", "H", 2), ("battery", "B", 1), ("event", "B", 1))
+ROW_BYTES = sum(size for _, _, size in COLUMNS)
+NA16, NA8 = 0xFFFF, 0xFF
+
+# Tipos de evento
+EV_TELEMETRY, EV_CMD_ACK, EV_CMD_ERR, EV_AUTH_OK, EV_AUTH_ERR, EV_STATUS, EV_CMD_SENT = range(7)
+EVENT_NAMES = ("TELEMETRY", "CMD-ACK", "CMD-ERR", "AUTH-OK", "AUTH-ERR", "STATUS", "CMD")
+_LINE_EVENTS = (("CMD-ACK", EV_CMD_ACK), ("CMD-ERR", EV_CMD_ERR), ("AUTH-OK", EV_AUTH_OK), ("AUTH-ERR", EV_AUTH_ERR))
+
+
+def column_offsets(capacity):
+    offsets, pos = {}, HEADER_SIZE
+    for name, _, size in COLUMNS:
+        offsets[name] = pos
+        pos += size * capacity
+    return offsets, pos
+
+
+def event_of_line(line):
+    for prefix, ev in _LINE_EVENTS:
+        if line.startswith(prefix):
+            return ev
+    return None
+
+
+class Recorder:
+    """Punto de entrada desde el camino de recepción. record_* sólo encola."""
+
+    def __init__(self, directory, segment_rows=SEGMENT_ROWS, writer=None):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        os.makedirs(directory, exist_ok=True)
+        self.pending = collections.deque()
+        self.segment = None
+        self.rows_written = 0
+        self.lock = threading.Lock()   # flush() desde el escritor y desde close()
+        self._own_writer = writer is None
+        self.writer = writer or BackgroundWriter()
+        self.writer.add(self)
+
+    def record_frame(self, frame, now=None):
+        self.pending.append((now or time.time(), frame.speed, frame.battery, frame.heading, EV_TELEMETRY))
+
+    def record_line(self, line, now=None):
+        ev = event_of_line(line)
+        if ev is not None:
+            self.pending.append((now or time.time(), None, None, None, ev))
+
+    def record_event(self, ev, now=None):
+        self.pending.append((now or time.time(), None, None, None, ev))
+
+    def flush(self):
+        """Codifica y escribe lo pendiente (lo llama el hilo escritor)."""
+        with self.lock:
+            pending = self.pending
+            while pending:
+                if self.segment is None or self.segment.full():
+                    if self.segment is not None:
+                        self.segment.close()
+                    self.segment = SegmentWriter(self.directory, pending[0][0], self.segment_rows)
+                self.rows_written += self.segment.write(pending)
+
+    def close(self):
+        self.writer.remove(self)
+        if self._own_writer:
+            self.writer.stop()
+        self.flush()
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+
+class SegmentWriter:
+    def __init__(self, directory, first_ts, capacity):
+        self.capacity = capacity
+        self.base_ms = int(first_ts * 1000)
+        self.count = 0
+        self.sealed = False   # se cierra antes de llenarse si el tiempo sale de rango
+        self.last_ms = self.base_ms
+        self.offsets, size = column_offsets(capacity)
+        self.path = os.path.join(directory, f"seg-{self.base_ms}.vtl")
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(self.fd, size)   # preasignado (disperso): columnas de tamaño fijo
+        self._write_header()
+
+    def full(self):
+        return self.sealed or self.count >= self.capacity
+
+    def write(self, pending):
+        """Consume filas de `pending` hasta llenar el segmento; devuelve cuántas escribió."""
+        cols = {name: array.array(code) for name, code, _ in COLUMNS}
+        ts_c, sp_c, hd_c, bt_c, ev_c = (cols[n] for n, _, _ in COLUMNS)
+        base = self.base_ms
+        room = self.capacity - self.count
+        n = 0
+        while pending and n < room:
+            ts, speed, battery, heading, ev = pending[0]
+            off = int(ts * 1000) - base
+            if off < 0 or off > 0xFFFFFFFF:
+                if n == 0 and self.count == 0:
+                    off = 0
+                else:
+                    self.sealed = True   # fuera de rango: se continúa en otro segmento
+                    break
+            pending.popleft()
+            ts_c.append(off)
+            sp_c.append(NA16 if speed is None else min(NA16 - 1, max(0, int(round(speed * 100)))))
+            hd_c.append(NA16 if heading is None else int(round((heading % 360.0) * 10)))
+            bt_c.append(NA8 if battery is None else min(NA8 - 1, max(0, battery)))
+            ev_c.append(ev)
+            n += 1
+        if not n:
+            return 0
+        self.last_ms = base + ts_c[-1]
+        if sys.byteorder != "little":
+            for a in cols.values():
+                a.byteswap()
+        for name, _, size in COLUMNS:
+            os.pwrite(self.fd, cols[name].tobytes(), self.offsets[name] + self.count * size)
+        self.count += n
+        # La cabecera se actualiza después de los datos: un lector nunca ve filas a medias
+        self._write_header()
+        return n
+
+    def _write_header(self):
+        os.pwrite(self.fd, HEADER.pack(MAGIC, VERSION, 0, self.capacity, self.count, self.base_ms, self.last_ms), 0)
+
+    def close(self):
+        if self.fd is not None:
+            self._write_header()
+            os.close(self.fd)
+            self.fd = None
+
+
+class BackgroundWriter:
+    """Hilo demonio que vuelca periódicamente uno o varios Recorder."""
+
+    def __init__(self, interval=FLUSH_INTERVAL):
+        self.interval = interval
+        self.recorders = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add(self, rec):
+        with self.lock:
+            self.recorders.append(rec)
+
+    def remove(self, rec):
+        with self.lock:
+            if rec in self.recorders:
+                self.recorders.remove(rec)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                recs = list(self.recorders)
+            for rec in recs:
+                try:
+                    rec.flush()
+                except OSError as e:
+                    print(f"[recorder] error escribiendo {rec.directory}: {e}", file=sys.stderr)
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=2.0)
+
+
+class SegmentReader:
+    """Segmento mapeado en memoria; cada columna es un memoryview sin copia."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.capacity, self.count, self.base_ms, self.last_ms = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise ValueError(f"{path}: no es un segmento VTLM v{VERSION}")
+        if sys.byteorder != "little":
+            raise RuntimeError("SegmentReader requiere una plataforma little-endian")
+        offsets, _ = column_offsets(self.capacity)
+        self._mv = memoryview(self.mm)
+        for name, code, size in COLUMNS:
+            off = offsets[name]
+            setattr(self, name, self._mv[off:off + size * self.count].cast(code))
+
+    @property
+    def start(self):
+        return self.base_ms / 1000.0
+
+    @property
+    def end(self):
+        return self.last_ms / 1000.0
+
+    def index_at(self, t):
+        """Primera fila con timestamp >= t (búsqueda binaria sobre la columna mapeada)."""
+        return bisect.bisect_left(self.ts, int(t * 1000) - self.base_ms)
+
+    def row(self, i):
+        sp, hd, bt = self.speed[i], self.heading[i], self.battery[i]
+        return ((self.base_ms + self.ts[i]) / 1000.0,
+                None if sp == NA16 else sp / 100.0,
+                None if bt == NA8 else bt,
+                None if hd == NA16 else hd / 10.0,
+                self.event[i])
+
+    def close(self):
+        for name, _, _ in COLUMNS:
+            getattr(self, name).release()
+        self._mv.release()
+        self.mm.close()
+
+
+class RecordingReader:
+    """Todos los segmentos de un directorio, ordenados por tiempo."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        names = sorted((n for n in os.listdir(directory) if n.startswith("seg-") and n.endswith(".vtl")),
+                       key=lambda n: int(n[4:-4]))
+        self.segments = [SegmentReader(os.path.join(directory, n)) for n in names]
+        self.segments = [s for s in self.segments if s.count]
+        self._starts = [s.base_ms for s in self.segments]
+
+    def __len__(self):
+        return sum(s.count for s in self.segments)
+
+    @property
+    def start(self):
+        return self.segments[0].start if self.segments else None
+
+    @property
+    def end(self):
+        return self.segments[-1].end if self.segments else None
+
+    def seek(self, t):
+        """(índice de segmento, fila) de la primera fila con timestamp >= t."""
+        si = max(0, bisect.bisect_right(self._starts, int(t * 1000)) - 1)
+        while si < len(self.segments):
+            seg = self.segments[si]
+            i = seg.index_at(t)
+            if i < seg.count:
+                return si, i
+            si += 1
+        return len(self.segments), 0
+
+    def rows(self, t0=None, t1=None):
+        """Genera (ts, speed, battery, heading, event) en [t0, t1)."""
+        si, i = self.seek(t0) if t0 is not None else (0, 0)
+        while si < len(self.segments):
+            seg = self.segments[si]
+            end = seg.count if t1 is None else seg.index_at(t1)
+            while i < end:
+                yield seg.row(i)
+                i += 1
+            if end < seg.count:
+                return
+            si, i = si + 1, 0
+
+    def close(self):
+        for s in self.segments:
+            s.close()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+render.py - Planificador de redibujado del dashboard.
+Agrupa las tramas de telemetría quedándose con el último valor de cada campo,
+marca como "sucio" sólo el widget cuya entrada cambió y adapta el intervalo
+del temporizador de _poll: tope de FPS con carga, espera larga en reposo.
+"""
+
+# Widgets del dashboard y el campo de TelemetryFrame del que dependen
+WIDGETS = (("gauge", "speed"), ("battery", "battery"), ("compass", "heading"), ("label", "cardinal"))
+
+
+class RenderScheduler:
+    def __init__(self, target_fps=30, idle_ms=500):
+        self.frame_ms = max(1, int(1000 / target_fps))
+        self.idle_ms = idle_ms
+        self.interval = self.frame_ms
+
+        # Último valor confirmado de cada campo
+        self.speed = None
+        self.battery = None
+        self.heading = None
+        self.cardinal = None
+        self.dirty = set()
+        self._pending = 0   # tramas recibidas desde el último render
+
+        # Contadores
+        self.frames_in = 0
+        self.frames_coalesced = 0   # tramas superadas por otra antes de dibujarse
+        self.renders = 0
+        self.redraws = 0
+        self.redraws_skipped = 0    # redibujados evitados porque la entrada no cambió
+
+    def offer(self, frame):
+        """Registra una trama; sólo guarda el último valor de cada campo."""
+        self.frames_in += 1
+        self._pending += 1
+        self._merge(frame)
+
+    def offer_predicted(self, frame):
+        """Valores extrapolados entre tramas: marcan widgets como offer() pero
+        no cuentan como trama recibida (ni inflan frames_coalesced)."""
+        self._merge(frame)
+
+    def _merge(self, frame):
+        for widget, field in WIDGETS:
+            value = getattr(frame, field)
+            if value is None:
+                continue
+            if value != getattr(self, field):
+                setattr(self, field, value)
+                self.dirty.add(widget)
+
+    def take_dirty(self):
+        """Devuelve los widgets a redibujar en este tick y limpia las marcas."""
+        dirty = self.dirty
+        if self._pending:
+            self.renders += 1
+            self.frames_coalesced += self._pending - 1
+            self.redraws_skipped += len(WIDGETS) - len(dirty)
+            self._pending = 0
+        self.redraws += len(dirty)
+        self.dirty = set()
+        return dirty
+
+    def next_interval(self, busy):
+        """Milisegundos hasta el próximo tick: frame_ms con actividad; en reposo
+        se duplica hasta idle_ms."""
+        if busy:
+            self.interval = self.frame_ms
+        else:
+            self.interval = min(self.idle_ms, self.interval * 2)
+        return self.interval
+
+    def stats(self):
+        return {
+            "frames_in": self.frames_in,
+            "frames_coalesced": self.frames_coalesced,
+            "renders": self.renders,
+            "redraws": self.redraws,
+            "redraws_skipped": self.redraws_skipped,
+            "interval_ms": self.interval,
+        }
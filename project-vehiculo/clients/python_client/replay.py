@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+replay.py - Reproducción de sesiones grabadas (recorder.py) en el dashboard.
+ReplayClient imita a TelemetryClient (get_message_nowait, connect, close) y
+reinyecta las tramas a 1x, 10x, 100x o lo más rápido posible (speed=0), con
+búsqueda por tiempo. benchmark_render() usa la grabación para medir cuántas
+tramas/s soporta el camino de dibujo de FancyClientApp.
+Ejecutar: python3 client.py --replay DIR [--replay-speed 10] [--bench-render]
+"""
+
+import queue
+import threading
+import time
+
+from recorder import EV_TELEMETRY, EVENT_NAMES, RecordingReader
+from telemetry import TelemetryFrame
+
+SPEEDS = (1.0, 10.0, 100.0, 0.0)   # 0 = lo más rápido posible
+MAX_QUEUED = 2000                  # contrapresión en modo lo-más-rápido
+SLEEP_SLICE = 0.05                 # reacciona a seek/pausa en este intervalo
+
+
+def row_message(row):
+    """Convierte una fila (ts, speed, battery, heading, event) en un mensaje de cola."""
+    ts, speed, battery, heading, ev = row
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+    if ev == EV_TELEMETRY:
+        cardinal = None if heading is None else cardinal_of(heading)
+        parts = ["TELEMETRY"]
+        if speed is not None: parts.append(f"v={speed:.2f}")
+        if battery is not None: parts.append(f"battery={battery}")
+        if cardinal is not None: parts.append(f"dir={cardinal}")
+        parts.append(f"timestamp={stamp}")
+        return ("telemetry", TelemetryFrame(speed, battery, heading, cardinal, ts, " ".join(parts)))
+    name = EVENT_NAMES[ev] if ev < len(EVENT_NAMES) else f"EVENT{ev}"
+    return ("line", f"{name} (replay {stamp})")
+
+
+class ReplayClient:
+    def __init__(self, reader, speed=1.0):
+        if not isinstance(reader, RecordingReader):
+            reader = RecordingReader(reader)
+        self.reader = reader
+        self.speed = speed
+        self.q = queue.Queue()
+        self.position = reader.start
+        self.running = False
+        self.paused = False
+        self.thread = None
+        self._seek_to = None
+        self.frames_sent = 0
+
+    # --- interfaz de TelemetryClient ---
+    def connect(self, host=None, port=None, timeout=None):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+
+    def send_line(self, line):
+        raise RuntimeError("Reproducción: no se envían comandos")
+
+    def get_message_nowait(self):
+        try:
+            return self.q.get_nowait()
+        except queue.Empty:
+            return None
+
+    # --- controles ---
+    def set_speed(self, speed):
+        # Se aplica desde la fila siguiente a la actual para no saltar en el tiempo
+        self.speed = speed
+        if self.position is not None:
+            self._seek_to = self.position + 0.001
+
+    def seek(self, t):
+        self._seek_to = t
+
+    def _clear_queue(self):
+        with self.q.mutex:
+            self.q.queue.clear()
+
+    def _run(self):
+        if self.position is None:
+            self.q.put(("status", "Grabación vacía"))
+            self.running = False
+            return
+        start_t = self.position
+        while self.running:
+            restarted = False
+            wall0 = time.monotonic()
+            speed = self.speed
+            for row in self.reader.rows(start_t):
+                if not self.running:
+                    return
+                if self._seek_to is not None:
+                    start_t, self._seek_to = self._seek_to, None
+                    self._clear_queue()
+                    restarted = True
+                    break
+                ts = row[0]
+                if speed > 0:
+                    due = wall0 + (ts - start_t) / speed
+                    while self.running and self._seek_to is None:
+                        wait = due - time.monotonic()
+                        if wait <= 0 and not self.paused:
+                            break
+                        time.sleep(SLEEP_SLICE if self.paused else min(wait, SLEEP_SLICE))
+                        if self.paused:
+                            due += SLEEP_SLICE
+                    if self._seek_to is not None or not self.running:
+                        continue
+                else:
+                    while self.running and (self.paused or self.q.qsize() > MAX_QUEUED):
+                        time.sleep(0.001)
+                self.q.put(row_message(row))
+                self.position = ts
+                self.frames_sent += 1
+            if restarted:
+                continue
+            if self._seek_to is not None:
+                start_t, self._seek_to = self._seek_to, None
+                self._clear_queue()
+                continue
+            self.q.put(("status", "FIN DE LA REPRODUCCIÓN"))
+            # Queda a la espera de un seek para volver a reproducir
+            while self.running and self._seek_to is None:
+                time.sleep(SLEEP_SLICE)
+
+
+class ReplayControls:
+    """Ventana con velocidad (1x/10x/100x/MAX), pausa y barra de búsqueda."""
+
+    def __init__(self, master, replay):
+        import tkinter as tk
+        self.replay = replay
+        self.top = tk.Toplevel(master)
+        self.top.title("Reproducción")
+        r = replay.reader
+        for s in SPEEDS:
+            tk.Button(self.top, text="MAX" if s == 0 else f"{s:g}x",
+                      command=lambda s=s: replay.set_speed(s)).pack(side=tk.LEFT, padx=2, pady=4)
+        self.btn_pause = tk.Button(self.top, text="PAUSA", command=self._toggle_pause)
+        self.btn_pause.pack(side=tk.LEFT, padx=6)
+        self.scale = tk.Scale(self.top, from_=0, to=max(1, int((r.end or 0) - (r.start or 0))),
+                              orient=tk.HORIZONTAL, length=400, showvalue=False)
+        self.scale.pack(side=tk.LEFT, padx=6, fill=tk.X, expand=True)
+        self.scale.bind("<ButtonRelease-1>", self._on_seek)
+        self.pos_var = tk.StringVar()
+        tk.Label(self.top, textvariable=self.pos_var, width=22).pack(side=tk.LEFT)
+        self._refresh()
+
+    def _toggle_pause(self):
+        self.replay.paused = not self.replay.paused
+        self.btn_pause.config(text="SEGUIR" if self.replay.paused else "PAUSA")
+
+    def _on_seek(self, event):
+        self.replay.seek(self.replay.reader.start + self.scale.get())
+
+    def _refresh(self):
+        r = self.replay
+        if r.position is not None:
+            self.scale.set(int(r.position - r.reader.start))
+            self.pos_var.set(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r.position)))
+        self.top.after(250, self._refresh)
+
+
+def benchmark_render(app, reader, limit=None):
+    """Reproduce lo más rápido posible directamente sobre el camino de dibujo de
+    `app` y devuelve tramas/s sostenibles por función (incluye el flush de Tk).
+    Las agujas sólo fijan su objetivo en _update_gauge/_rotate_needle; el dibujo
+    (coords()) ocurre en los ticks del FrameClock, así que por cada trama se da
+    aquí un tick de 1/FPS de tiempo simulado a cada aguja."""
+    if not isinstance(reader, RecordingReader):
+        reader = RecordingReader(reader)
+    pc = time.perf_counter
+    acc = {"_handle_line": 0.0, "_update_gauge": 0.0, "_update_battery_canvas": 0.0,
+           "_rotate_needle": 0.0, "Needle.tick": 0.0, "tk update_idletasks": 0.0}
+    needles = app.clock.needles
+    step = app.clock.frame_ms / 1000.0
+    app.clock.stop()
+    n = 0
+    t_all = pc()
+    for row in reader.rows():
+        if row[4] != EV_TELEMETRY:
+            continue
+        _, frame = row_message(row)
+        t0 = pc(); app._handle_line(frame.raw); t1 = pc()
+        acc["_handle_line"] += t1 - t0
+
+        # Los campos ausentes en la trama no se tocan (como hace _render)
+        if frame.speed is not None:
+            app.speed_val = frame.speed
+            t0 = pc(); app._update_gauge(); t1 = pc()
+            acc["_update_gauge"] += t1 - t0
+        if frame.battery is not None:
+            app.battery = frame.battery
+            t0 = pc(); app._update_battery_canvas(); t1 = pc()
+            acc["_update_battery_canvas"] += t1 - t0
+        if frame.cardinal is not None or frame.heading is not None:
+            app.direction = frame.cardinal
+            app.current_heading_deg = frame.heading
+            t0 = pc(); app._rotate_needle(frame.cardinal); t1 = pc()
+            acc["_rotate_needle"] += t1 - t0
+        app.clock.stop()   # el tick lo da el benchmark, no el after() de Tk
+        t0 = pc()
+        for nd in needles:
+            nd.tick((nd.last_tick or 0.0) + step)
+        t1 = pc()
+        acc["Needle.tick"] += t1 - t0
+        t0 = pc(); app.root.update_idletasks(); t1 = pc()
+        acc["tk update_idletasks"] += t1 - t0
+        n += 1
+        if limit and n >= limit:
+            break
+    total = pc() - t_all
+    result = {name: (n / t if t else float("inf")) for name, t in acc.items()}
+    result["total"] = n / total if total else float("inf")
+    result["frames"] = n
+    return result
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+session.py - Estado de sesión reanudable y espera exponencial con jitter.
+SessionState recuerda el token de AUTH-OK, las credenciales de la última
+AUTH y el último rol de SUBSCRIBE (con el modo wire= pedido, ver wire.py)
+para repetirlos al reconectar. Backoff da
+las esperas entre reintentos ("full jitter": uniforme en [0, min(cap, base*2^n)]).
+"""
+
+import random
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+class Backoff:
+    def __init__(self, base=BACKOFF_BASE, cap=BACKOFF_CAP, rng=random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.attempt = 0
+
+    def next(self):
+        delay = self.rng.uniform(0, min(self.cap, self.base * (2 ** self.attempt)))
+        self.attempt += 1
+        return delay
+
+    def reset(self):
+        self.attempt = 0
+
+
+class SessionState:
+    """Se alimenta con las líneas enviadas (note_sent) y recibidas (note_reply)."""
+
+    def __init__(self, role=None, wire="text"):
+        self.role = role          # último SUBSCRIBE
+        self.wire = wire          # modo de transmisión que se pide en cada SUBSCRIBE
+        self.token = None         # de AUTH-OK token=...
+        self.credentials = None   # (usuario, contraseña) de la última AUTH explícita; sólo en memoria
+        self.resuming = False     # se ha repetido AUTH token= y falta la respuesta
+
+    def note_sent(self, line):
+        parts = line.split()
+        if not parts:
+            return
+        if parts[0] == "SUBSCRIBE" and len(parts) > 1:
+            self.role = parts[1].upper()
+        elif parts[0] == "AUTH" and len(parts) >= 3 and not parts[1].startswith("token="):
+            self.credentials = (parts[1], parts[2])
+
+    def note_reply(self, line):
+        """Devuelve las líneas a enviar como reacción (vacío casi siempre)."""
+        if line.startswith("AUTH-OK"):
+            for tok in line.split()[1:]:
+                if tok.startswith("token="):
+                    self.token = tok[6:]
+            self.resuming = False
+        elif line.startswith("AUTH-ERR") and self.resuming:
+            # server.c sólo acepta tokens que aún tiene otra conexión viva: si
+            # ya limpió la caída, se reautentica con las credenciales guardadas
+            self.resuming = False
+            self.token = None
+            if self.credentials:
+                user, password = self.credentials
+                return [f"AUTH {user} {password}"] + ([self.subscribe_line()] if self.role else [])
+        return []
+
+    def resume_lines(self):
+        """Líneas para restaurar la sesión en una conexión nueva (AUTH antes de SUBSCRIBE)."""
+        lines = []
+        if self.token:
+            lines.append(f"AUTH token={self.token}")
+            self.resuming = True
+        elif self.credentials:
+            lines.append("AUTH {} {}".format(*self.credentials))
+        if self.role:
+            lines.append(self.subscribe_line())
+        return lines
+
+    def subscribe_line(self):
+        return self.with_wire(f"SUBSCRIBE {self.role}")
+
+    def with_wire(self, line):
+        """Añade wire=<modo> a un SUBSCRIBE si se pidió un modo que no es texto."""
+        if self.wire != "text" and line.startswith("SUBSCRIBE") and "wire=" not in line:
+            return f"{line.rstrip()} wire={self.wire}"
+        return line
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+standin_server.py - Servidor de sustitución en Python puro para pruebas locales.
+Habla el mismo protocolo de líneas que server/server.c (AUTH / AUTH-OK token=,
+SUBSCRIBE-OK, CMD-ACK / CMD-ERR, LIST_USERS -> USERS, QUIT -> BYE, TELEMETRY)
+pero emite telemetría a un ritmo configurable (hasta ~10k mensajes/s) en vez
+de cada 10 s. Como server.c, sólo envía TELEMETRY a clientes autenticados,
+salvo con --broadcast-all. Admite el modo binario/delta de wire.py
+("SUBSCRIBE OBSERVER wire=delta").
+Ejecutar: python3 standin_server.py --port 5000 --rate 1000 --user admin --password admin
+"""
+
+import argparse
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
+
+from telemetry import cardinal_of
+from wire import WireEncoder
+
+TICK = 0.005   # periodo mínimo del broadcaster; a más ritmo se agrupan líneas por tick
+
+
+class Vehicle:
+    def __init__(self):
+        self.speed = 0.0
+        self.battery = 100
+        self.direction_deg = 0
+
+
+class Session:
+    def __init__(self, writer):
+        self.writer = writer
+        peer = writer.get_extra_info("peername") or ("?", 0)
+        self.id = f"{peer[0]}:{peer[1]}"
+        self.role = "NONE"
+        self.authenticated = False
+        self.token = ""
+        self.encoder = None   # WireEncoder si se negoció wire=bin|delta
+
+    def wire_payload(self, v, n):
+        enc, ts = self.encoder, int(time.time())
+        return b"".join(enc.encode(v.speed, v.battery, v.direction_deg, ts) for _ in range(n))
+
+    def send(self, line):
+        self.writer.write(line.encode("utf-8") + b"\n")
+
+
+class StandinServer:
+    def __init__(self, host="127.0.0.1", port=5000, rate=1.0, user="admin", password="admin",
+                 drain_period=10.0, broadcast_all=False, stamp=False):
+        self.host = host
+        self.port = port
+        self.rate = rate                  # mensajes TELEMETRY por segundo y cliente
+        self.salt = secrets.token_hex(8)
+        self.user = user
+        self.hashhex = hashlib.sha256((self.salt + password).encode()).hexdigest()
+        self.drain_period = drain_period  # la batería baja 1% por periodo en movimiento
+        self.broadcast_all = broadcast_all
+        self.stamp = stamp                # añade sent=<epoch> para medir latencias
+        self.vehicle = Vehicle()
+        self.sessions = set()
+        self.server = None
+        self.sent = 0
+
+    # ---------------- protocolo ----------------
+    def handle_line(self, s, line):
+        parts = line.split()
+        if not parts:
+            s.send("ERR invalid"); return
+        cmd = parts[0]
+        if cmd == "AUTH":
+            rest = line[4:].strip()
+            if not rest:
+                s.send("AUTH-ERR reason=missing_credentials"); return
+            if rest.startswith("token="):
+                token = rest[6:]
+                if token and any(o.token == token for o in self.sessions):
+                    s.authenticated, s.token, s.role = True, token, "ADMIN"
+                    s.send(f"AUTH-OK token={token}")
+                else:
+                    s.send("AUTH-ERR reason=invalid_token")
+                return
+            if len(parts) < 3:
+                s.send("AUTH-ERR reason=bad_format"); return
+            if parts[1] != self.user:
+                s.send("AUTH-ERR reason=invalid_user"); return
+            if hashlib.sha256((self.salt + parts[2]).encode()).hexdigest() != self.hashhex:
+                s.send("AUTH-ERR reason=invalid_password"); return
+            s.authenticated, s.role, s.token = True, "ADMIN", secrets.token_hex(16)
+            s.send(f"AUTH-OK token={s.token}")
+        elif cmd == "SUBSCRIBE":
+            if len(parts) < 2:
+                s.send("ERR missing role"); return
+            s.role = "ADMIN" if parts[1].upper() == "ADMIN" else "OBSERVER"
+            wire = "text"
+            for opt in parts[2:]:
+                if opt.lower() in ("wire=text", "wire=bin", "wire=delta"):
+                    wire = opt[5:].lower()
+            s.encoder = WireEncoder(wire) if wire != "text" else None
+            s.send(f"SUBSCRIBE-OK role={s.role}" + (f" wire={wire}" if s.encoder else ""))
+        elif cmd == "LIST_USERS":
+            if not s.authenticated or s.role != "ADMIN":
+                s.send("ERR not_authorized"); return
+            rows = [f"{o.id}:{'AUTH' if o.authenticated else 'NOAUTH'}:{o.role}" for o in self.sessions]
+            s.send(f"USERS {len(rows)}\n" + "\n".join(rows))
+        elif cmd == "CMD":
+            self.process_cmd(s, parts[1:])
+        elif cmd == "QUIT":
+            s.send("BYE")
+            s.writer.close()
+        else:
+            s.send("ERR unknown_command")
+
+    def process_cmd(self, s, words):
+        if not words:
+            s.send("ERR missing action"); return
+        action = "_".join(words).upper()
+        v = self.vehicle
+        if not s.authenticated or s.role != "ADMIN":
+            s.send(f"CMD-ERR action={action} reason=not_authorized"); return
+        if v.battery < 10:
+            s.send(f"CMD-ERR action={action} reason=battery_low"); return
+        if action == "SPEED_UP":
+            if v.speed >= 30.0:
+                s.send("CMD-ERR action=SPEED_UP reason=speed_limit"); return
+            v.speed += 2.5
+        elif action == "SLOW_DOWN":
+            v.speed = 0.0 if v.speed <= 0.0 else v.speed - 2.5
+        elif action == "TURN_LEFT":
+            v.direction_deg = (v.direction_deg + 270) % 360
+        elif action == "TURN_RIGHT":
+            v.direction_deg = (v.direction_deg + 90) % 360
+        else:
+            s.send(f"CMD-ERR action={action} reason=unknown_command"); return
+        s.send(f"CMD-ACK action={action} status=OK")
+
+    # ---------------- red ----------------
+    async def _client(self, reader, writer):
+        s = Session(writer)
+        self.sessions.add(s)
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").strip()
+                if line:
+                    self.handle_line(s, line)
+                    await writer.drain()
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(s)
+            writer.close()
+
+    def telemetry_line(self):
+        v = self.vehicle
+        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        line = f"TELEMETRY v={v.speed:.2f} battery={v.battery} dir={cardinal_of(v.direction_deg)} timestamp={ts}"
+        if self.stamp:
+            line += f" sent={time.time():.6f}"
+        return line
+
+    async def _broadcaster(self):
+        credit = 0.0
+        last = last_drain = time.monotonic()
+        period = max(TICK, 1.0 / self.rate) if self.rate > 0 else TICK
+        while True:
+            await asyncio.sleep(period)
+            now = time.monotonic()
+            if now - last_drain >= self.drain_period:
+                last_drain = now
+                if self.vehicle.speed > 0:
+                    self.vehicle.battery = max(0, self.vehicle.battery - 1)
+            credit += (now - last) * self.rate
+            last = now
+            n = int(credit)
+            if n <= 0:
+                continue
+            credit -= n
+            # Varias líneas por tick (mismo estado) en un único write por cliente
+            payload = ((self.telemetry_line() + "\n") * n).encode("utf-8")
+            for s in list(self.sessions):
+                if s.authenticated or self.broadcast_all:
+                    if s.writer.transport.get_write_buffer_size() > 4 * 1024 * 1024:
+                        continue   # cliente lento: se salta este tick en vez de acumular
+                    s.writer.write(s.wire_payload(self.vehicle, n) if s.encoder else payload)
+                    self.sent += n
+
+    async def serve(self, ready=None):
+        self.server = await asyncio.start_server(self._client, self.host, self.port, backlog=1024)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        async with self.server:
+            await asyncio.gather(self.server.serve_forever(), self._broadcaster())
+
+    def start_in_thread(self):
+        """Arranca en un hilo demonio (útil en benchmarks); devuelve el puerto."""
+        ready = threading.Event()
+        threading.Thread(target=lambda: asyncio.run(self.serve(ready)), daemon=True).start()
+        ready.wait(5.0)
+        return self.port
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Servidor de sustitución de server.c")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=5000)
+    p.add_argument("--rate", type=float, default=1.0, help="TELEMETRY por segundo y cliente (hasta ~10000)")
+    p.add_argument("--user", default="admin")
+    p.add_argument("--password", default="admin")
+    p.add_argument("--drain-period", type=float, default=10.0, help="segundos por 1%% de batería en movimiento")
+    p.add_argument("--broadcast-all", action="store_true", help="enviar TELEMETRY también a no autenticados")
+    p.add_argument("--stamp", action="store_true", help="añadir sent=<epoch> a cada TELEMETRY")
+    args = p.parse_args(argv)
+    srv = StandinServer(args.host, args.port, args.rate, args.user, args.password,
+                        args.drain_period, args.broadcast_all, args.stamp)
+    print(f"standin_server escuchando en {args.host}:{args.port} ({args.rate:g} TELEMETRY/s)", flush=True)
+    try:
+        asyncio.run(srv.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+telemetry.py - Parser de tramas TELEMETRY.
+Convierte "TELEMETRY v=12.50 battery=87 dir=E timestamp=2025-01-01T12:00:00Z"
+en un TelemetryFrame con __slots__. Pensado para ejecutarse en el hilo
+receptor, de modo que la GUI sólo recibe tramas ya interpretadas.
+"""
+
+import calendar
+import gc
+import time
+
+PREFIX = "TELEMETRY"
+
+# Rumbo estimado cuando dir= no trae grados, p. ej. "dir=E" (mismo orden de
+# prioridad que la GUI original: N, E, S, W).
+_CARDINAL_ORDER = (("N", 0.0), ("E", 90.0), ("S", 180.0), ("W", 270.0))
+_heading_cache = {}
+_day_cache = {}   # "YYYY-MM-DD" -> epoch de la medianoche UTC
+_ts_last = (None, None)   # (último timestamp, epoch); tupla para reemplazo atómico entre hilos
+
+
+class TelemetryFrame:
+    __slots__ = ("speed", "battery", "heading", "cardinal", "timestamp", "raw")
+
+    def __init__(self, speed=None, battery=None, heading=None, cardinal=None, timestamp=None, raw=""):
+        self.speed = speed          # m/s (float) o None si no vino en la trama
+        self.battery = battery      # % (int) o None
+        self.heading = heading      # grados 0=N (float) o None
+        self.cardinal = cardinal    # "N", "E", ... o None
+        self.timestamp = timestamp  # epoch (float) o None
+        self.raw = raw              # línea original, para el registro
+
+    def __repr__(self):
+        return (f"TelemetryFrame(speed={self.speed}, battery={self.battery}, heading={self.heading}, "
+                f"cardinal={self.cardinal!r}, timestamp={self.timestamp})")
+
+
+def cardinal_of(deg):
+    """Punto cardinal de un rumbo en grados (mismo criterio que dir_of_deg() en server.c)."""
+    deg %= 360
+    if deg < 45 or deg >= 315: return "N"
+    if deg < 135: return "E"
+    if deg < 225: return "S"
+    return "W"
+
+
+def _cardinal_heading(cardinal):
+    h = _heading_cache.get(cardinal)
+    if h is None:
+        h = 0.0
+        for k, deg in _CARDINAL_ORDER:
+            if k in cardinal:
+                h = deg
+                break
+        if len(_heading_cache) > 64:
+            _heading_cache.clear()
+        _heading_cache[cardinal] = h
+    return h
+
+
+def _parse_ts(ts):
+    # Formato fijo "%Y-%m-%dT%H:%M:%SZ" (UTC). Un broadcast comparte timestamp
+    # en todas las conexiones, así que se cachea el último; la medianoche de
+    # cada fecha se calcula una vez y el resto son tres enteros.
+    global _ts_last
+    last = _ts_last
+    if ts == last[0]:
+        return last[1]
+    day = _day_cache.get(ts[:10])
+    if day is None:
+        try:
+            day = float(calendar.timegm((int(ts[0:4]), int(ts[5:7]), int(ts[8:10]), 0, 0, 0, 0, 0, 0)))
+        except (ValueError, IndexError):
+            day = None
+        if day is None or len(ts) < 19 or ts[10] != "T":
+            try:
+                return float(ts)
+            except ValueError:
+                return None
+        if len(_day_cache) > 64:
+            _day_cache.clear()
+        _day_cache[ts[:10]] = day
+    try:
+        epoch = day + int(ts[11:13]) * 3600 + int(ts[14:16]) * 60 + int(ts[17:19])
+    except ValueError:
+        return None
+    _ts_last = (ts, epoch)
+    return epoch
+
+
+def _parse_dir(f, v):
+    d = v.upper()
+    i = d.find("(")
+    if i >= 0:
+        # dir=N(15.2): rumbo explícito en grados
+        f.cardinal = d[:i]
+        try: f.heading = float(d[i + 1:d.index(")", i)])
+        except ValueError: f.heading = 0.0
+    else:
+        f.cardinal = d
+        f.heading = _cardinal_heading(d)
+
+
+def _parse_generic(f, parts):
+    # Orden o campos no estándar: se interpreta clave a clave
+    for p in parts:
+        k, sep, v = p.partition("=")
+        if not sep:
+            continue
+        if k == "v":
+            try: f.speed = float(v)
+            except ValueError: f.speed = 0.0
+        elif k == "battery":
+            try: f.battery = int(float(v))
+            except ValueError: f.battery = 0
+        elif k == "dir":
+            _parse_dir(f, v)
+        elif k == "timestamp":
+            f.timestamp = _parse_ts(v)
+
+
+def parse_frame(line):
+    """Devuelve un TelemetryFrame, o None si la línea no es TELEMETRY."""
+    if not line.startswith(PREFIX):
+        return None
+    parts = line.split()
+    # Camino rápido: formato exacto de broadcast_telemetry() en server.c
+    if len(parts) == 5:
+        pv, pb, pd, pt = parts[1], parts[2], parts[3], parts[4]
+        if pv[:2] == "v=" and pb[:8] == "battery=" and pd[:4] == "dir=" and pt[:10] == "timestamp=":
+            d = pd[4:]
+            h = _heading_cache.get(d)
+            try:
+                if h is not None:
+                    return TelemetryFrame(float(pv[2:]), int(pb[8:]), h, d, _parse_ts(pt[10:]), line)
+                i = d.find("(")
+                if i > 0 and d[-1] == ")" and d.isupper():
+                    return TelemetryFrame(float(pv[2:]), int(pb[8:]), float(d[i + 1:-1]), d[:i],
+                                          _parse_ts(pt[10:]), line)
+            except ValueError:
+                pass
+    f = TelemetryFrame(None, None, None, None, None, line)
+    _parse_generic(f, parts[1:])
+    return f
+
+
+def parse_many(lines):
+    """Interpreta en bloque; devuelve sólo las tramas TELEMETRY, en orden."""
+    out = []
+    append = out.append
+    parse = parse_frame
+    # Las tramas no forman ciclos: pausar el GC evita recorrer la lista
+    # creciente en cada colección de generación 0.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for line in lines:
+            if line.startswith(PREFIX):
+                append(parse(line))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return out
+
+
+def format_frame(frame):
+    """Línea TELEMETRY equivalente a la de server.c, para registrar las tramas
+    que llegaron en binario (wire.py, raw vacío)."""
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(frame.timestamp)) if frame.timestamp is not None else ""
+    return f"{PREFIX} v={frame.speed or 0.0:.2f} battery={frame.battery} dir={frame.cardinal} timestamp={ts}"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+timeseries.py - Histórico en memoria de la telemetría con resúmenes por tiempo.
+Cada campo se guarda en anillos de capacidad fija sobre array('d'): las
+muestras crudas y resúmenes (min/max/suma/n) por cubos de 1 s (la última
+hora) y 1 min (dos días). Los anillos reservan memoria a medida que llegan
+datos: un dashboard vacío ocupa ~200 KiB, ~1 MiB tras 24 h a 1 trama cada
+10 s (server.c) y ~2.7 MiB como máximo. Una consulta elige el nivel más fino
+que cubra la ventana con no más de MAX_POINTS cubos y lo reduce a min/max por
+columna de píxel, así redibujar 24 h cuesta lo mismo tenga la ventana mil
+muestras o cien millones.
+"""
+
+import array
+
+RAW_CAPACITY = 1 << 16
+LEVELS = ((1.0, 4096), (60.0, 2 * 1440))   # (segundos por cubo, capacidad): ~1 h / 2 días
+MAX_POINTS = 4096                           # cubos recorridos como mucho por consulta
+FIELDS = ("speed", "battery")               # los que dibujan las sparklines
+INITIAL_ROWS = 1024                         # filas reservadas al crear un anillo; crece x2
+
+
+class Ring:
+    """Columnas float64 en un buffer circular; la columna 0 es el tiempo (no decreciente)."""
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0   # próxima posición de escritura
+        self.size = min(capacity, INITIAL_ROWS)   # filas reservadas (< capacity hasta que se llena)
+        self.cols = [array.array("d", bytes(8 * self.size)) for _ in range(columns)]
+
+    def grow(self):
+        # Mientras no se ha dado la vuelta, head == count: crecer por el final
+        # no mueve ninguna fila lógica
+        extra = min(self.capacity, 2 * self.size) - self.size
+        for col in self.cols:
+            col.frombytes(bytes(8 * extra))
+        self.size += extra
+
+    def push(self, *values):
+        h = self.head
+        if h == self.size: self.grow()
+        for col, v in zip(self.cols, values):
+            col[h] = v
+        self.head = (h + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def phys(self, i):
+        """Índice físico de la i-ésima fila lógica (0 = la más antigua)."""
+        return (self.head - self.count + i) % self.capacity
+
+    def last(self):
+        return (self.head - 1) % self.capacity
+
+    def bisect(self, t):
+        """Primera fila lógica con tiempo >= t."""
+        ts, cap, start = self.cols[0], self.capacity, self.head - self.count
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[(start + mid) % cap] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class Series:
+    def __init__(self, raw_capacity=RAW_CAPACITY, levels=LEVELS):
+        self.raw = Ring(raw_capacity, 2)                             # t, valor
+        self.levels = [(w, Ring(cap, 5)) for w, cap in levels]       # t0, min, max, suma, n
+        self.last = None
+
+    def add(self, t, v):
+        self.last = v
+        r = self.raw   # push() en línea: es el camino de cada trama
+        h = r.head
+        if h == r.size: r.grow()
+        r.cols[0][h] = t; r.cols[1][h] = v
+        r.head = (h + 1) % r.capacity
+        if r.count < r.capacity: r.count += 1
+        for w, ring in self.levels:
+            b = t - t % w
+            i = ring.head - 1
+            ts, mn, mx, sm, n = ring.cols
+            if ring.count and ts[i] == b:
+                if v < mn[i]: mn[i] = v
+                if v > mx[i]: mx[i] = v
+                sm[i] += v; n[i] += 1
+            else:
+                ring.push(b, v, v, v, 1)
+
+    def _pick(self, t0, t1):
+        """(anillo, es_crudo, i0, i1) del nivel más fino que cubre [t0, t1] con
+        <= MAX_POINTS filas. Un anillo lleno sin filas anteriores a t0 ya ha
+        perdido el principio de la ventana: se pasa al nivel siguiente."""
+        candidates = [(self.raw, True)] + [(ring, False) for _, ring in self.levels]
+        for ring, raw in candidates:
+            i0, i1 = ring.bisect(t0), ring.bisect(t1 + 1e-9)
+            if i1 - i0 <= MAX_POINTS and (i0 > 0 or ring.count < ring.capacity):
+                return ring, raw, i0, i1
+        # Ventana más larga que el nivel más grueso a MAX_POINTS: se toma su cola
+        return ring, raw, max(i0, i1 - MAX_POINTS), i1
+
+    def window(self, t0, t1, width):
+        """Reduce [t0, t1] a `width` columnas: lista de (x, min, max) con datos."""
+        if t1 <= t0 or width <= 0:
+            return []
+        ring, raw, i0, i1 = self._pick(t0, t1)
+        lo = [None] * width
+        hi = [None] * width
+        ts = ring.cols[0]
+        mn_col, mx_col = (ring.cols[1], ring.cols[1]) if raw else (ring.cols[1], ring.cols[2])
+        scale = width / (t1 - t0)
+        for i in range(i0, i1):
+            p = ring.phys(i)
+            x = int((ts[p] - t0) * scale)
+            if x >= width: x = width - 1
+            elif x < 0: x = 0
+            a, b = mn_col[p], mx_col[p]
+            if lo[x] is None:
+                lo[x], hi[x] = a, b
+            else:
+                if a < lo[x]: lo[x] = a
+                if b > hi[x]: hi[x] = b
+        return [(x, lo[x], hi[x]) for x in range(width) if lo[x] is not None]
+
+
+class TimeSeriesStore:
+    """Una Series por campo de TelemetryFrame; `version` cambia con cada muestra."""
+
+    def __init__(self, fields=FIELDS, raw_capacity=RAW_CAPACITY, levels=LEVELS):
+        self.series = {f: Series(raw_capacity, levels) for f in fields}
+        self.first_t = None
+        self.last_t = None
+        self.version = 0
+
+    def add_frame(self, frame, now):
+        # Hora del servidor si la trae (sirve igual en replay); nunca hacia atrás
+        t = frame.timestamp if frame.timestamp is not None else now
+        if self.last_t is not None and t < self.last_t:
+            t = self.last_t
+        for name, s in self.series.items():
+            v = getattr(frame, name)
+            if v is not None:
+                s.add(t, float(v))
+        if self.first_t is None:
+            self.first_t = t
+        self.last_t = t
+        self.version += 1
+
+    def window(self, field, seconds, width):
+        if self.last_t is None:
+            return []
+        return self.series[field].window(self.last_t - seconds, self.last_t, width)
+
+
+class Sparkline:
+    """Una polilínea min/max en un Canvas; cada redibujo es un único coords()."""
+
+    def __init__(self, canvas, color, vmin, vmax, unit=""):
+        self.canvas = canvas
+        self.vmin, self.vmax, self.unit = vmin, vmax, unit
+        w, h = int(canvas["width"]), int(canvas["height"])
+        self.width, self.height = w, h
+        self.line = canvas.create_line(0, h, 0, h, fill=color, width=1)
+        self.label = canvas.create_text(w - 4, 2, anchor="ne", fill=color, font=("Consolas", 8), text="")
+
+    def draw(self, columns, last=None):
+        h, span = self.height - 2, (self.vmax - self.vmin) or 1.0
+        y = lambda v: 1 + h - (min(self.vmax, max(self.vmin, v)) - self.vmin) / span * h
+        pts = []
+        for x, lo, hi in columns:
+            pts += (x, y(hi), x, y(lo))
+        if len(pts) < 4:
+            pts = [0, -10, 0, -10]   # sin datos: fuera de la vista
+        self.canvas.coords(self.line, *pts)
+        if columns:
+            lo = min(c[1] for c in columns); hi = max(c[2] for c in columns)
+            now = columns[-1][2] if last is None else last
+            self.canvas.itemconfig(self.label, text=f"{lo:g}–{hi:g}{self.unit}  ahora {now:g}{self.unit}")
+        else:
+            self.canvas.itemconfig(self.label, text="")
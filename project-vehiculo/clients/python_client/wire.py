@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+wire.py - Modo de transmisión compacto de TELEMETRY (binario o delta), opcional.
+Se negocia en SUBSCRIBE: "SUBSCRIBE OBSERVER wire=bin" (o wire=delta) y el
+servidor confirma con "SUBSCRIBE-OK role=OBSERVER wire=bin". Un servidor que
+no conoce la opción la ignora y contesta sin wire=: se sigue en texto, que es
+el modo por defecto. Sólo TELEMETRY cambia de formato; el resto de respuestas
+(AUTH-OK, CMD-ACK, ...) siguen siendo líneas.
+
+Tramas en orden de red. El primer byte (0xB1/0xB2) nunca puede empezar una
+línea de texto: en UTF-8 es un byte de continuación.
+  FULL   0xB1 | speed u16 (cm/s) | battery u8 | dir u16 (grados) | timestamp u32 (epoch)   10 B
+  DELTA  0xB2 | mask u8 | y sólo lo que cambió respecto a la trama anterior, en este orden:
+         speed u16 (bit 0) | battery u8 (bit 1) | dir u16 (bit 2) | dts u8 (bit 3, s)      2-10 B
+En modo delta el servidor manda FULL tras cada SUBSCRIBE, cada FULL_EVERY
+tramas y cuando dts no cabe en un byte; en modo bin sólo manda FULL.
+"""
+
+import struct
+
+from framing import LineFramer
+from telemetry import TelemetryFrame, cardinal_of
+
+MODES = ("text", "bin", "delta")
+FULL, DELTA = 0xB1, 0xB2
+FULL_FMT = struct.Struct("!BHBHI")
+FULL_EVERY = 64
+D_SPEED, D_BATTERY, D_DIR, D_TS = 1, 2, 4, 8
+
+# mask -> Struct con los campos presentes (tras los 2 bytes de cabecera)
+_DELTA_FMT = [struct.Struct("!" + "".join(c for bit, c in ((D_SPEED, "H"), (D_BATTERY, "B"), (D_DIR, "H"),
+                                                          (D_TS, "B")) if m & bit)) for m in range(16)]
+_DELTA_SIZE = [2 + f.size for f in _DELTA_FMT]
+
+
+_CARDINAL = [cardinal_of(d) for d in range(360)]
+
+
+class WireEncoder:
+    """Lado servidor (standin_server.py y benchmarks); server.c hace lo mismo en C."""
+
+    def __init__(self, mode="bin"):
+        if mode not in ("bin", "delta"):
+            raise ValueError(f"modo de transmisión desconocido: {mode}")
+        self.mode = mode
+        self.reset()
+
+    def reset(self):
+        """Tras un SUBSCRIBE: la próxima trama sale completa."""
+        self.last = None
+        self.since_full = 0
+
+    def encode(self, speed, battery, deg, ts):
+        cur = (min(max(int(round(speed * 100)), 0), 0xFFFF), min(max(battery, 0), 0xFF), deg % 360,
+               int(ts) & 0xFFFFFFFF)
+        last, self.last = self.last, cur
+        if self.mode == "delta" and last is not None and self.since_full < FULL_EVERY and 0 <= cur[3] - last[3] <= 0xFF:
+            self.since_full += 1
+            mask, vals = 0, []
+            if cur[0] != last[0]: mask |= D_SPEED; vals.append(cur[0])
+            if cur[1] != last[1]: mask |= D_BATTERY; vals.append(cur[1])
+            if cur[2] != last[2]: mask |= D_DIR; vals.append(cur[2])
+            if cur[3] != last[3]: mask |= D_TS; vals.append(cur[3] - last[3])
+            return bytes((DELTA, mask)) + _DELTA_FMT[mask].pack(*vals)
+        self.since_full = 0
+        return FULL_FMT.pack(FULL, *cur)
+
+
+class WireFramer(LineFramer):
+    """LineFramer que además reconoce tramas FULL/DELTA entre las líneas.
+    lines() devuelve una lista mezclada: str para las líneas de texto y
+    TelemetryFrame (raw vacío) para las tramas binarias ya decodificadas."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last = None      # [cm/s, battery, grados, epoch] de la trama anterior
+        self.orphans = 0      # DELTA sin trama FULL previa: descartadas
+        self.binary = 0       # tramas binarias decodificadas
+
+    def lines(self):
+        buf, end = self.buf, self.end
+        start, scan = self.start, self.scan
+        out = []
+        while start < end:
+            b = buf[start]
+            if not self.discarding and (b == FULL or b == DELTA):
+                if b == FULL:
+                    if end - start < FULL_FMT.size:
+                        break
+                    _, cms, batt, deg, ts = FULL_FMT.unpack_from(buf, start)
+                    self.last = [cms, batt, deg, ts]
+                    start += FULL_FMT.size
+                else:
+                    if end - start < 2:
+                        break
+                    mask = buf[start + 1] & 15
+                    size = _DELTA_SIZE[mask]
+                    if end - start < size:
+                        break
+                    vals = _DELTA_FMT[mask].unpack_from(buf, start + 2)
+                    start += size
+                    last = self.last
+                    if last is None:
+                        self.orphans += 1
+                        continue
+                    i = 0
+                    if mask & D_SPEED: last[0] = vals[i]; i += 1
+                    if mask & D_BATTERY: last[1] = vals[i]; i += 1
+                    if mask & D_DIR: last[2] = vals[i]; i += 1
+                    if mask & D_TS: last[3] += vals[i]
+                    cms, batt, deg, ts = last
+                out.append(TelemetryFrame(cms / 100.0, batt, float(deg), _CARDINAL[deg % 360], float(ts), ""))
+                self.binary += 1
+                scan = start
+                continue
+            nl = buf.find(b"\n", scan if scan > start else start, end)
+            if nl < 0:
+                scan = end
+                break
+            if self.discarding:
+                self.discarding = False
+            else:
+                try:
+                    out.append(str(self.view[start:nl], "utf-8").strip())
+                except UnicodeDecodeError:
+                    pass
+            start = scan = nl + 1
+        if start == end:
+            start = end = scan = 0
+        elif end - start > self.max_line:
+            if not self.discarding:
+                self.oversized += 1
+            self.discarding = True
+            start = end = scan = 0
+        self.start, self.end, self.scan = start, end, scan
+        return out
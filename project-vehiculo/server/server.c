@@ -27,9 +27,11 @@
 #include <signal.h>
 #include <stdarg.h>
 #include <stdbool.h>
+#include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <strings.h>
 #ifdef _WIN32
 #include <winsock2.h>
 #include <ws2tcpip.h>
@@ -45,12 +47,41 @@
 
 typedef enum { ROLE_NONE=0, ROLE_OBSERVER, ROLE_ADMIN } role_t;
 
+/* Wire mode for TELEMETRY, negotiated with "SUBSCRIBE <role> wire=bin|delta".
+   Text stays the default; other replies are always text lines.
+   FULL  0xB1 speed u16 (cm/s) battery u8 dir u16 (deg) timestamp u32 (epoch)   10 bytes
+   DELTA 0xB2 mask u8 + only the fields that changed since the previous frame:
+         speed u16 (bit 0) battery u8 (bit 1) dir u16 (bit 2) dts u8 (bit 3)
+   All integers in network byte order. A FULL frame goes out after every
+   SUBSCRIBE, every WIRE_FULL_EVERY frames and whenever dts does not fit. */
+typedef enum { WIRE_TEXT=0, WIRE_BIN, WIRE_DELTA } wire_t;
+
+#define WIRE_FULL 0xB1
+#define WIRE_DELTA_TAG 0xB2
+#define WIRE_FULL_LEN 10
+#define WIRE_FULL_EVERY 64
+#define D_SPEED 1
+#define D_BATTERY 2
+#define D_DIR 4
+#define D_TS 8
+
+typedef struct {
+    uint16_t speed_cms;
+    uint8_t battery;
+    uint16_t deg;
+    uint32_t ts;
+} wire_frame_t;
+
 typedef struct client {
     int fd;
     struct sockaddr_in addr;
     role_t role;
     bool authenticated;
     char token[TOKEN_LEN];
+    wire_t wire;
+    bool wire_have_last;     // last frame sent in binary (delta base)
+    wire_frame_t wire_last;
+    int wire_since_full;
     pthread_t thread;
     struct client *next;
 } client_t;
@@ -79,13 +110,16 @@ static vehicle_t vehicle;
 static char *logs_path = NULL;
 
 /* UTIL: ISO8601 timestamp */
-static void now_iso8601(char *buf, size_t n) {
-    time_t t = time(NULL);
+static void iso8601_of(time_t t, char *buf, size_t n) {
     struct tm tm;
     gmtime_r(&t, &tm);
     strftime(buf, n, "%Y-%m-%dT%H:%M:%SZ", &tm);
 }
 
+static void now_iso8601(char *buf, size_t n) {
+    iso8601_of(time(NULL), buf, n);
+}
+
 /* Logging (console + file) */
 static void log_msg(const char *fmt, ...) {
     char ts[64];
@@ -250,16 +284,61 @@ static const char* dir_of_deg(int deg) {
     return "W";
 }
 
+static const char* wire_name(wire_t w) {
+    return w == WIRE_BIN ? "bin" : w == WIRE_DELTA ? "delta" : "text";
+}
+
+static size_t put_u16(uint8_t *p, uint16_t v) { p[0] = v >> 8; p[1] = v & 0xFF; return 2; }
+
+/* encode frame f for client c (binary modes only); returns bytes written to out */
+static size_t wire_encode(client_t *c, const wire_frame_t *f, uint8_t *out) {
+    const wire_frame_t *l = &c->wire_last;
+    uint32_t dts = f->ts - l->ts;
+    size_t n = 0;
+    if (c->wire == WIRE_DELTA && c->wire_have_last && c->wire_since_full < WIRE_FULL_EVERY
+        && f->ts >= l->ts && dts <= 0xFF) {
+        uint8_t mask = 0;
+        out[n++] = WIRE_DELTA_TAG;
+        n++; // mask, filled below
+        if (f->speed_cms != l->speed_cms) { mask |= D_SPEED; n += put_u16(out + n, f->speed_cms); }
+        if (f->battery != l->battery) { mask |= D_BATTERY; out[n++] = f->battery; }
+        if (f->deg != l->deg) { mask |= D_DIR; n += put_u16(out + n, f->deg); }
+        if (dts) { mask |= D_TS; out[n++] = (uint8_t)dts; }
+        out[1] = mask;
+        c->wire_since_full++;
+    } else {
+        out[n++] = WIRE_FULL;
+        n += put_u16(out + n, f->speed_cms);
+        out[n++] = f->battery;
+        n += put_u16(out + n, f->deg);
+        uint32_t ts = htonl(f->ts);
+        memcpy(out + n, &ts, 4); n += 4;
+        c->wire_since_full = 0;
+    }
+    c->wire_last = *f;
+    c->wire_have_last = true;
+    return n;
+}
+
 /* Broadcast telemetry to all */
 static void broadcast_telemetry() {
     char ts[64], msg[MAXLINE];
+    uint8_t bin[WIRE_FULL_LEN];
     pthread_mutex_lock(&vehicle.lock);
     double v = vehicle.speed;
     int b = vehicle.battery;
     int deg = vehicle.direction_deg;
     pthread_mutex_unlock(&vehicle.lock);
-    now_iso8601(ts, sizeof(ts));
+    time_t now = time(NULL);
+    iso8601_of(now, ts, sizeof(ts));
     snprintf(msg, sizeof(msg), "TELEMETRY v=%.2f battery=%d dir=%s timestamp=%s", v, b, dir_of_deg(deg), ts);
+    long cms = (long)(v * 100.0 + 0.5);
+    wire_frame_t frame = {
+        .speed_cms = cms < 0 ? 0 : cms > 0xFFFF ? 0xFFFF : (uint16_t)cms,
+        .battery = b < 0 ? 0 : b > 0xFF ? 0xFF : (uint8_t)b,
+        .deg = (uint16_t)(((deg % 360) + 360) % 360),
+        .ts = (uint32_t)now,
+    };
 
     pthread_mutex_lock(&clients_lock);
     client_t *it = clients;
@@ -267,7 +346,8 @@ static void broadcast_telemetry() {
     while (it) {
         // only send to authenticated subscribers (both roles get telemetry)
         if (it->authenticated) {
-            ssize_t n = send(it->fd, msg, strlen(msg), 0);
+            size_t blen = it->wire != WIRE_TEXT ? wire_encode(it, &frame, bin) : 0;
+            ssize_t n = blen ? send(it->fd, bin, blen, 0) : send(it->fd, msg, strlen(msg), 0);
             if (n <= 0) {
                 // mark removal
                 client_t *to_remove = it;
@@ -278,6 +358,9 @@ static void broadcast_telemetry() {
                 close(to_remove->fd);
                 free(to_remove);
                 continue;
+            } else if (blen) {
+                char id[64]; client_idstr(it, id, sizeof(id));
+                log_msg("-> %s  [%s %zu B] %s", id, wire_name(it->wire), blen, msg);
             } else {
                 // send newline and log
                 send(it->fd, "\n", 1, 0);
@@ -451,15 +534,28 @@ static void handle_line(client_t *c, const char *line) {
             send_line(c, "AUTH-ERR reason=invalid_password");
         }
     } else if (strcmp(cmd, "SUBSCRIBE")==0) {
-        // SUBSCRIBE ADMIN | OBSERVER
+        // SUBSCRIBE ADMIN | OBSERVER [wire=text|bin|delta]
         char *role = strtok(NULL, " \r\n");
         if (!role) { send_line(c, "ERR missing role"); return; }
+        wire_t wire = WIRE_TEXT;
+        char *opt;
+        while ((opt = strtok(NULL, " \r\n")) != NULL) {
+            if (strcasecmp(opt, "wire=bin")==0) wire = WIRE_BIN;
+            else if (strcasecmp(opt, "wire=delta")==0) wire = WIRE_DELTA;
+            else if (strcasecmp(opt, "wire=text")==0) wire = WIRE_TEXT;
+        }
+        // the broadcaster reads the wire state under clients_lock
+        pthread_mutex_lock(&clients_lock);
+        c->wire = wire;
+        c->wire_have_last = false; // next frame goes out FULL
+        pthread_mutex_unlock(&clients_lock);
+        const char *wtag = wire == WIRE_TEXT ? "" : wire == WIRE_BIN ? " wire=bin" : " wire=delta";
         if (strcasecmp(role, "ADMIN")==0) {
             c->role = ROLE_ADMIN; // but must auth to perform admin actions
-            send_line(c, "SUBSCRIBE-OK role=ADMIN");
+            send_line(c, "SUBSCRIBE-OK role=ADMIN%s", wtag);
         } else {
             c->role = ROLE_OBSERVER;
-            send_line(c, "SUBSCRIBE-OK role=OBSERVER");
+            send_line(c, "SUBSCRIBE-OK role=OBSERVER%s", wtag);
         }
         c->authenticated = c->authenticated; // no change
     } else if (strcmp(cmd, "LIST_USERS")==0) {